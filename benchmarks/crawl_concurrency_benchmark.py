@@ -0,0 +1,70 @@
+"""
+Benchmark the crawler against a local stand-in HTTP server.
+
+The server exposes a synthetic catalog where every page links to a few child products
+and answers after a fixed latency, so the crawl is bound by round trips like a
+real store. Run with:
+
+    python -m benchmarks.crawl_concurrency_benchmark
+"""
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from src.infrastructure.services import BSCrawlingWebService, PolitenessScheduler
+
+PAGES = 400
+LINKS_PER_PAGE = 4
+LATENCY = 0.02
+
+class CatalogHandler(BaseHTTPRequestHandler):
+    """
+    Serve /products/<n> pages linking to their children in a catalog tree.
+    """
+
+    def do_GET(self):
+        time.sleep(LATENCY)
+        page = int(self.path.rstrip('/').split('/')[-1] or 0)
+        links = ''.join(
+            f'<a href="/products/{(page * LINKS_PER_PAGE + step) % PAGES}">product</a>'
+            for step in range(1, LINKS_PER_PAGE + 1)
+        )
+        body = f'<html><body>{links}</body></html>'.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def main():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), CatalogHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+
+    def new_service() -> BSCrawlingWebService:
+        # A new service per crawl, so no crawl reads the pages cached by the previous one.
+        # The local server has no politeness limits to respect.
+        service = BSCrawlingWebService(PolitenessScheduler(max_concurrency=64, requests_per_second=100000))
+        service.start_url = f'{base_url}/products/0'
+        service.prefix = f'{base_url}/products/'
+        return service
+
+    start = time.perf_counter()
+    new_service().crawling_web()
+    baseline = PAGES / (time.perf_counter() - start)
+    print(f'sync: {baseline:.1f} pages/s')
+
+    for concurrency in (1, 2, 4, 8, 16, 32):
+        service = new_service()
+        start = time.perf_counter()
+        service.crawling_web_async(concurrency)
+        rate = PAGES / (time.perf_counter() - start)
+        print(f'async x{concurrency}: {rate:.1f} pages/s ({rate / baseline:.1f}x)')
+
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
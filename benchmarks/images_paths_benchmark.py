@@ -0,0 +1,81 @@
+"""
+Benchmark ImagesFactoryService.create_paths_table on a synthetic table of product images.
+
+Every product has 5 images and 4 variations, like the tables of the scraping stage, and
+its images are created as empty files in a temporary folder, so the folders and the
+renames are real. The per-row parent lookup of the previous implementation is measured
+on some of the rows for comparison. Pass the number of images, 100000 by default. Run with:
+
+    python -m benchmarks.images_paths_benchmark [images]
+"""
+import os
+import sys
+import time
+import shutil
+import logging
+import tempfile
+import pandas as pd
+from unittest.mock import patch
+from src.application.services import ImagesFactoryService
+
+IMAGES_PER_PRODUCT = 5
+VARIATIONS = 4
+SAMPLE_ROWS = 500
+
+def synthetic_table(images: int) -> pd.DataFrame:
+    """
+    Generate the product table of the products with the given number of images, as read from the CSV.
+    """
+    rows = []
+    for product in range(images // IMAGES_PER_PRODUCT):
+        image_names = [f'product_image_{n}.jpg' for n in range(1, IMAGES_PER_PRODUCT + 1)]
+        rows.append({'name': f'Product {product}', 'image_id/gallery_image_ids': ', '.join(image_names),
+                     'sku': f'sku{product}', 'parent_id': float('nan')})
+        rows.extend({'name': f'Product {product} - {n} kg', 'image_id/gallery_image_ids': image_names[n + 1],
+                     'sku': f'sku{product}-{n}', 'parent_id': f'sku{product}'} for n in range(VARIATIONS))
+    return pd.DataFrame(rows)
+
+def create_images(table: pd.DataFrame, images_path: str) -> None:
+    for _, row in table[table['parent_id'].isna()].iterrows():
+        product_path = os.path.join(images_path, row['name'].replace(' ', '_'))
+        os.makedirs(product_path)
+        for image_name in row['image_id/gallery_image_ids'].split(', '):
+            open(os.path.join(product_path, image_name), 'wb').close()
+
+def per_row_parent_lookup(paths_df: pd.DataFrame, rows: int) -> None:
+    """
+    The parent lookup of the previous implementation: a scan of the table for every variation.
+    """
+    for index, row in paths_df.head(rows).iterrows():
+        if row['parent_id'] != '':
+            parent_name = paths_df.loc[paths_df['sku'] == row['parent_id'], 'name'].values
+            if len(parent_name) > 0:
+                paths_df.at[index, 'name'] = parent_name[0]
+
+def main():
+    images = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    table = synthetic_table(images)
+    images_path = tempfile.mkdtemp()
+    try:
+        create_images(table, images_path)
+        print(f'{len(table)} rows, {images} images')
+
+        start = time.perf_counter()
+        per_row_parent_lookup(table.copy(), SAMPLE_ROWS)
+        baseline = (time.perf_counter() - start) * len(table) / SAMPLE_ROWS
+        print(f'per-row parent lookup alone: {baseline:.1f} s (estimated from {SAMPLE_ROWS} rows)')
+
+        with patch('src.application.services.images_factory_service.pd.read_csv', return_value=table), \
+                patch('src.application.services.images_factory_service.files_output_path', return_value=images_path):
+            service = ImagesFactoryService()
+        logging.disable(logging.INFO)
+        start = time.perf_counter()
+        paths_df = service.create_paths_table()
+        seconds = time.perf_counter() - start
+        renamed = sum(1 for _, _, files in os.walk(images_path) for name in files if '_sku' in name)
+        print(f'create_paths_table: {seconds:.2f} s, {len(paths_df)} paths, {renamed} images renamed ({baseline / seconds:.0f}x)')
+    finally:
+        shutil.rmtree(images_path)
+
+if __name__ == '__main__':
+    main()
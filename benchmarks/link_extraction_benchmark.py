@@ -0,0 +1,70 @@
+"""
+Compare the link extraction of the crawler against BeautifulSoup parsing.
+
+Pass a directory with saved pages (*.html) to benchmark a real corpus; without
+arguments a synthetic corpus of product-listing-like pages is generated. Run with:
+
+    python -m benchmarks.link_extraction_benchmark [pages_directory]
+"""
+import os
+import sys
+import time
+from bs4 import BeautifulSoup, SoupStrainer
+from src.infrastructure.services.bs_crawling_service import extract_hrefs
+
+ROUNDS = 3
+
+def synthetic_corpus(pages: int = 200) -> list:
+    """
+    Generate pages with the typical weight of a store listing: a lot of markup and scripts around the links.
+    """
+    corpus = []
+    for page in range(pages):
+        products = ''.join(
+            f'<div class="product-card"><a href="/collections/all/products/product-{page}-{n}">'
+            f'<img src="//cdn.example.com/p{n}.jpg" alt="Product {n}"></a>'
+            f'<h3 class="title">Product {n}</h3><div class="money">$ {n}.00</div>'
+            f'<form><select>{"".join(f"<option>{o}</option>" for o in range(5))}</select></form></div>'
+            for n in range(40)
+        )
+        scripts = '<script>' + 'var x = {"a": 1, "b": [1, 2, 3]};' * 200 + '</script>'
+        corpus.append(f'<html><head>{scripts}</head><body><nav>{products}</nav></body></html>'.encode('utf-8'))
+    return corpus
+
+def load_corpus(directory: str) -> list:
+    corpus = []
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith('.html'):
+            with open(os.path.join(directory, filename), 'rb') as page:
+                corpus.append(page.read())
+    return corpus
+
+def full_parse(content: bytes) -> list:
+    soup = BeautifulSoup(content, 'html.parser')
+    return [a.get('href') for a in soup.find_all('a', href=True)]
+
+def strained_parse(content: bytes) -> list:
+    soup = BeautifulSoup(content, 'html.parser', parse_only=SoupStrainer('a', href=True))
+    return [a.get('href') for a in soup.find_all('a', href=True)]
+
+def pages_per_second(extractor, corpus: list) -> float:
+    best = float('inf')
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for content in corpus:
+            extractor(content)
+        best = min(best, time.perf_counter() - start)
+    return len(corpus) / best
+
+def main():
+    corpus = load_corpus(sys.argv[1]) if len(sys.argv) > 1 else synthetic_corpus()
+    print(f'{len(corpus)} pages, {sum(map(len, corpus)) / 1e6:.1f} MB')
+
+    baseline = pages_per_second(full_parse, corpus)
+    print(f'BeautifulSoup full parse: {baseline:.1f} pages/s')
+    for name, extractor in (('BeautifulSoup + SoupStrainer', strained_parse), ('extract_hrefs tokenizer', extract_hrefs)):
+        rate = pages_per_second(extractor, corpus)
+        print(f'{name}: {rate:.1f} pages/s ({rate / baseline:.1f}x)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Compare the JSON-first product extraction against parsing the page with the selectors.
+
+Pass 'archive' to benchmark the pages of the response archive of the scraping stage,
+or a directory with saved product pages (*.html); without arguments a synthetic corpus
+of store-like product pages is generated. Run with:
+
+    python -m benchmarks.product_parse_benchmark [archive | pages_directory]
+"""
+import sys
+import json
+from benchmarks.link_extraction_benchmark import load_corpus, pages_per_second
+from src.infrastructure.services.bs_scraping_service import BSScrapingService
+from src.infrastructure.services.response_archive import ResponseArchive
+
+def synthetic_corpus(pages: int = 100) -> list:
+    """
+    Generate product pages with the weight of a store theme: navigation, related products and scripts.
+    """
+    corpus = []
+    for page in range(pages):
+        product = {
+            "product": {
+                "title": f"Product {page}",
+                "vendor": "Brand",
+                "description": "<p>" + "Great product. " * 50 + "</p>",
+                "compare_at_price": 19900,
+                "tags": ["tag1", "tag2"],
+                "options": ["Size"],
+                "images": [f"//cdn.example.com/p{page}-{n}.jpg" for n in range(4)],
+                "variants": [{"sku": f"sku{page}-{n}", "public_title": f"{n} kg", "compare_at_price": 19900} for n in range(4)]
+            }
+        }
+        navigation = ''.join(f'<li><a href="/collections/c{n}">Category {n}</a></li>' for n in range(150))
+        related = ''.join(
+            f'<div class="product-card"><a href="/products/p{n}"><img data-rimg="lazy" src="//cdn.example.com/r{n}.jpg"></a>'
+            f'<h3>Related {n}</h3><div class="money">$ {n}.00</div></div>'
+            for n in range(40)
+        )
+        details = (
+            '<div id="shopify-section-static-product"><section><article><div class="product-main"><div class="product-details">'
+            f'<h1>Product {page}</h1><div class="product-vendor"><a title="Brand">Brand</a></div></div></div>'
+            f'<div class="product-description rte">{"Great product. " * 50}</div></article></section></div>'
+            '<div class="full_block_nb medic_price price--compare-at"><div class="money">$199.00</div></div>'
+            '<label class="form-field-title">Size</label>'
+        )
+        scripts = '<script>' + 'var x = {"a": 1, "b": [1, 2, 3]};' * 200 + '</script>'
+        product_script = f'<script data-section-type="static-product">{json.dumps(product)}</script>'
+        corpus.append(
+            f'<html><head>{scripts}</head><body><nav>{navigation}</nav>{details}{product_script}{related}</body></html>'.encode('utf-8')
+        )
+    return corpus
+
+def main():
+    if len(sys.argv) == 1:
+        corpus = synthetic_corpus()
+    elif sys.argv[1] == 'archive':
+        corpus = [record.content for record in ResponseArchive().iter_latest()]
+    else:
+        corpus = load_corpus(sys.argv[1])
+    print(f'{len(corpus)} pages, {sum(map(len, corpus)) / 1e6:.1f} MB')
+
+    baseline = pages_per_second(lambda content: BSScrapingService.parse_product(content, 'selectors'), corpus)
+    print(f'selectors: {baseline:.1f} pages/s')
+    rate = pages_per_second(lambda content: BSScrapingService.parse_product(content, 'json'), corpus)
+    print(f'json-first: {rate:.1f} pages/s ({rate / baseline:.1f}x)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Compare building the product table from records against concatenating one-row DataFrames.
+
+The concatenation is how the tables were built before the record builder: a one-row
+DataFrame per record, concatenated to the table of the product. Pass the number of
+rows to build, 50000 by default. Run with:
+
+    python -m benchmarks.table_build_benchmark [rows]
+"""
+import os
+import sys
+import time
+import logging
+import warnings
+import pandas as pd
+from unittest.mock import patch
+from src.config.config import WOOC_SAMPLE
+from src.application.services import TablesFactoryService
+from src.domain.tables import ProductSchema
+
+VARIANTS = 5
+
+def synthetic_products(products: int) -> list:
+    """
+    Generate the arguments of create_tables for products with VARIANTS variants each.
+    """
+    return [(
+        {"product": {"variants": [
+            {"sku": f"sku{product}-{n}", "compare_at_price": 19900 + n, "public_title": f"{n} kg"} for n in range(VARIANTS)
+        ]}},
+        f"Product {product}", "199.00", "<p>Great product.</p>", "Brand", ["tag1", "tag2"],
+        [f"product_image_{n}.jpg" for n in range(1, VARIANTS + 1)], "Size"
+    ) for product in range(products)]
+
+def concat_table(service: TablesFactoryService, records: list) -> pd.DataFrame:
+    """
+    Build the table concatenating a one-row DataFrame per record.
+    """
+    columns = list(service.schema.columns)
+    table_df = pd.DataFrame(columns=columns)
+    for record in records:
+        table_df = pd.concat([table_df, pd.DataFrame([record])], ignore_index=True)
+    return table_df.fillna('').infer_objects()[columns]
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    # The schema is the sample CSV of the repository, read without the Windows paths of files_output_path
+    schema = ProductSchema.from_columns(pd.read_csv(os.path.join('files', 'tables', WOOC_SAMPLE), encoding='utf-8', nrows=0).columns)
+    with patch('src.application.services.tables_factory_service.TableDefinitions.product_schema', return_value=schema):
+        service = TablesFactoryService()
+    logging.disable(logging.INFO)
+    warnings.simplefilter('ignore', FutureWarning)
+    products = synthetic_products(rows // VARIANTS)
+    records = [record for product in products for record in service.create_records(*product)]
+    print(f'{len(products)} products, {len(records)} rows, {len(schema.columns)} columns')
+
+    # The concatenation is quadratic in the rows of a table, so it is measured on the tables of the products
+    sample = products[:max(1, len(products) // 20)]
+    sample_seconds = timed(lambda: [concat_table(service, service.create_records(*product)) for product in sample])
+    baseline = sample_seconds * len(products) / len(sample)
+    print(f'one-row concatenation, per product: {baseline:.2f} s (estimated from {len(sample)} products)')
+    seconds = timed(lambda: [service.create_tables(*product) for product in products])
+    print(f'records, per product: {seconds:.2f} s ({baseline / seconds:.1f}x)')
+    seconds = timed(lambda: service.create_table([record for product in products for record in service.create_records(*product)]))
+    print(f'records, one batch: {seconds:.2f} s ({baseline / seconds:.1f}x)')
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 import pandas as pd
 from src.common.utils import files_output_path
 from src.domain.abstractions import DataPreparationServiceProtocol
+from src.domain.tables import TableDefinitions
 
 class DataPreparationService(DataPreparationServiceProtocol):
     """
@@ -76,7 +77,8 @@ class DataPreparationService(DataPreparationServiceProtocol):
         df = pd.concat([prod_df, desc_df], axis=1)
         cols = list(df.columns)
         description_column_index = len(cols) - 1
-        desired_position = 8
+        # The descriptions are saved apart, they go back to their column of the product schema
+        desired_position = TableDefinitions.product_schema().columns.index('description')
         cols.insert(desired_position, cols.pop(description_column_index))
 
         df = df[cols]
@@ -47,9 +47,9 @@ class ImagesFactoryService(ImagesFactoryServiceProtocol):
 
         The function:
         1. Copies relevant columns from the WooCommerce DataFrame.
-        2. Adjusts 'name' values for rows with 'parent_id'.
-        3. Splits 'image_id/gallery_image_ids' into separate rows.
-        4. Creates the 'route' column with the image paths.
+        2. Adjusts 'name' values for rows with 'parent_id', through a SKU to name index.
+        3. Splits 'image_id/gallery_image_ids' into separate stripped names, dropping the rows without images.
+        4. Creates the 'route' column with the image paths, creating the folder of every product once.
         5. Renames images and updates the 'route' column.
         6. Removes duplicate paths and returns the updated DataFrame.
         """
@@ -57,32 +57,63 @@ class ImagesFactoryService(ImagesFactoryServiceProtocol):
         self.logger.info("Creating paths table.")
         paths_df = self.wooc_df[['name', 'image_id/gallery_image_ids', 'sku', 'parent_id']].copy()
 
-        for index, row in paths_df.iterrows():
-            if row['parent_id'] != '':
-                parent_name = paths_df.loc[paths_df['sku'] == row['parent_id'], 'name'].values
-                if len(parent_name) > 0:
-                    paths_df.at[index, 'name'] = parent_name[0]
-                    self.logger.debug(f"Updated name for SKU {row['sku']} to parent name {parent_name[0]}.")
+        # The variations take the name of their parent, looked up by SKU
+        has_sku = paths_df['sku'].notna() & (paths_df['sku'] != '')
+        sku_to_name = paths_df.loc[has_sku].drop_duplicates(subset=['sku']).set_index('sku')['name']
+        has_parent = paths_df['parent_id'].notna() & (paths_df['parent_id'] != '')
+        parent_names = paths_df.loc[has_parent, 'parent_id'].map(sku_to_name).dropna()
+        paths_df.loc[parent_names.index, 'name'] = parent_names
+        self.logger.info(f"Updated the name of {len(parent_names)} variations to their parent name.")
 
         paths_df = paths_df.assign(image_id=paths_df['image_id/gallery_image_ids'].str.split(',')).explode('image_id')
-        paths_df['route'] = paths_df.apply(lambda row: os.path.join(self.create_product_path(row['name'].replace(' ', '_')), row['image_id'].strip()), axis=1)
+        # The gallery is joined with ', ', so the names after the first start with a space
+        paths_df['image_id'] = paths_df['image_id'].str.strip()
+        paths_df = paths_df[paths_df['image_id'].notna() & (paths_df['image_id'] != '')]
+        product_paths = {name: self.create_product_path(name.replace(' ', '_')) for name in paths_df['name'].unique()}
+        product_path_column = paths_df['name'].map(product_paths)
+        paths_df['route'] = [os.path.join(product_path, image_id)
+                             for product_path, image_id in zip(product_path_column, paths_df['image_id'])]
         paths_df = paths_df.drop_duplicates(subset=['route'], keep='last').reset_index(drop=True)
 
-        for index, row in paths_df.iterrows():
-            old_path = row['route']
-            new_image_name = f"{os.path.splitext(row['image_id'])[0]}_{row['sku']}.jpg"
-            new_path = os.path.join(self.create_product_path(row['name'].replace(' ', '_')), new_image_name)
+        product_path_column = paths_df['name'].map(product_paths)
+        new_paths = [os.path.join(product_path, f"{os.path.splitext(image_id)[0]}_{sku}.jpg")
+                     for product_path, image_id, sku in zip(product_path_column, paths_df['image_id'], paths_df['sku'])]
+        paths_df['route'] = self._rename_images(paths_df['route'].tolist(), new_paths)
+
+        self.logger.info("Paths table created successfully.")
+        return paths_df
+
+    def _rename_images(self, old_paths: List[str], new_paths: List[str]) -> List[str]:
+        """
+        Renames the images to their new paths.
+
+        Expected input:
+        - old_paths (List[str]): The current paths of the images.
+        - new_paths (List[str]): The paths to rename the images to.
+
+        Expected output:
+        - List[str]: The path of every image after renaming: the new path, or the old one if it could not be renamed.
+        """
+        routes = []
+        renamed = 0
+        for old_path, new_path in zip(old_paths, new_paths):
             try:
                 os.rename(old_path, new_path)
-                paths_df.at[index, 'route'] = new_path
-                self.logger.debug(f"Renamed image {old_path} to {new_path}.")
+                routes.append(new_path)
+                renamed += 1
             except FileNotFoundError as e:
-                self.logger.error(f"Error renaming image {old_path} to {new_path}: {e}")
+                if os.path.exists(new_path):
+                    # Renamed by a previous run of the stage
+                    routes.append(new_path)
+                else:
+                    self.logger.error(f"Error renaming image {old_path} to {new_path}: {e}")
+                    routes.append(old_path)
             except Exception as e:
                 self.logger.error(f"Unexpected error: {e}")
+                routes.append(old_path)
 
-        self.logger.info("Paths table created successfully.")
-        return paths_df
+        self.logger.info(f"Renamed {renamed} of {len(old_paths)} images.")
+        return routes
 
     def update_wc_table(self, paths_df: pd.DataFrame, image_urls: List[str]) -> pd.DataFrame:
         """
@@ -90,28 +121,34 @@ class ImagesFactoryService(ImagesFactoryServiceProtocol):
 
         Expected input:
         - paths_df (pd.DataFrame): DataFrame containing columns 'name', 'image_id', 'sku', 'parent_id', 'route'.
-        - image_urls (List[str]): List of image URLs.
+        - image_urls (List[tuple]): (index, URL) pairs of the uploaded images, by index of paths_df. The URL
+          is None if the upload failed. The images without a pair were not uploaded.
 
         Expected output:
         - pd.DataFrame: Updated WooCommerce DataFrame with new image URLs.
 
         The function:
         1. Copies the WooCommerce DataFrame.
-        2. Adds image URLs to the paths DataFrame.
-        3. Maps SKUs to their respective URLs.
-        4. Updates the 'image_id/gallery_image_ids' column in the original DataFrame with the new URLs.
+        2. Adds image URLs to the paths DataFrame, by index.
+        3. Maps SKUs to their respective URLs, in the order of the paths.
+        4. Updates the 'image_id/gallery_image_ids' column in one pass over the SKUs of the original DataFrame.
+           The SKUs without uploaded images keep their value.
         5. Returns the updated DataFrame.
         """
         self.logger.info("Updating WooCommerce table with image URLs.")
         df = self.wooc_df.copy()
-        paths_df['image_url'] = [url for _, url in sorted(image_urls, key=lambda x: x[0])]
-        sku_to_urls = paths_df.groupby('sku')['image_url'].apply(lambda urls: ', '.join(filter(None, urls))).to_dict()
+        results = pd.Series(dict(image_urls), dtype=object)
+        paths_df['image_url'] = results.reindex(paths_df.index)
+
+        uploaded_df = paths_df.loc[paths_df.index.isin(results.index), ['sku', 'image_url']]
+        # The SKUs whose uploads all failed are left without images
+        sku_to_urls = (uploaded_df.dropna(subset=['image_url']).groupby('sku', sort=False)['image_url'].agg(', '.join)
+                       .reindex(uploaded_df['sku'].dropna().unique(), fill_value=''))
 
-        for sku, urls in sku_to_urls.items():
-            df.loc[df['sku'] == sku, 'image_id/gallery_image_ids'] = urls
-            self.logger.debug(f"Updated SKU {sku} with URLs: {urls}")
+        urls = df['sku'].map(sku_to_urls)
+        df['image_id/gallery_image_ids'] = urls.where(urls.notna(), df['image_id/gallery_image_ids'])
 
-        self.logger.info("WooCommerce table updated successfully.")
+        self.logger.info(f"WooCommerce table updated successfully: {len(sku_to_urls)} SKUs updated.")
         return df    
 
     def save_updated_csv(self, df: pd.DataFrame) -> None:
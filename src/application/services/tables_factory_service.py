@@ -1,26 +1,30 @@
+import json
 import pandas as pd
+from typing import List
+from itertools import islice
 from src.domain.tables import TableDefinitions 
-from src.config.config import SCRAPED_PRODUCTS_CSV, LOGGING_SCRAPING_FILE, SCRAPED_DESCRIPTIONS_CSV
+from src.config.config import (SCRAPED_PRODUCTS_CSV, LOGGING_SCRAPING_FILE, SCRAPED_DESCRIPTIONS_CSV, SCRAPED_PRODUCTS_JSONL,
+                               SCRAPE_MERGE_CHUNK_ROWS)
 from src.common.utils import files_output_path, setup_logging
 
 class TablesFactoryService:
     
     def __init__(self):
         """
-        Initializes the TablesFactoryService by loading the product DataFrame template.
+        Initializes the TablesFactoryService with the schema of the product table.
         
         Expected input:
         - None
         
         Expected output:
-        - None (initializes self.product_df)
+        - None (initializes self.schema)
         """
         self.logger = setup_logging(LOGGING_SCRAPING_FILE)
-        self.product_df = TableDefinitions.product_table()
+        self.schema = TableDefinitions.product_schema()
 
-    def _create_variant_df(self, variant, title, brand, tags, parent_sku, image_name, attribute_name) -> pd.DataFrame:
+    def _variant_record(self, variant, title, brand, tags, parent_sku, image_name, attribute_name) -> dict:
         """
-        Creates a DataFrame for a product variant.
+        Creates the record of a product variant.
 
         Expected input:
         - variant (dict): The variant data.
@@ -32,14 +36,13 @@ class TablesFactoryService:
         - attribute_name (str): The attribute name.
 
         Expected output:
-        - pd.DataFrame: DataFrame containing the variant product information.
+        - dict: The values of the variant by column of the product table.
         """
-        variant_df = self.product_df.copy()
         sku = variant["sku"]
         price = variant["compare_at_price"] / 100  # Convert from cents
         variant_title = variant["public_title"]
 
-        new_product = {
+        return {
             'type': 'variation',
             'featured': False,
             'catalog_visibility': 'visible',
@@ -62,24 +65,9 @@ class TablesFactoryService:
             'attributes.2': 1
         }
 
-        for column in variant_df.columns:
-            if column not in new_product:
-                new_product[column] = ''
-
-        # Create a DataFrame with a single row using new_product
-        new_product_df = pd.DataFrame([new_product])
-
-        # Use concat only if variant_df is not empty
-        if not variant_df.empty:
-            variant_df = pd.concat([variant_df, new_product_df], ignore_index=True)
-        else:
-            variant_df = new_product_df
-
-        return variant_df
-
-    def _create_parent_df(self, title, sku, price, description, brand, tags, attribute_name, attribute_values, gallery_images) -> pd.DataFrame:
+    def _parent_record(self, title, sku, price, description, brand, tags, attribute_name, attribute_values, gallery_images) -> dict:
         """
-        Creates a DataFrame for a parent product.
+        Creates the record of a parent product.
 
         Expected input:
         - title (str): The product title.
@@ -93,11 +81,9 @@ class TablesFactoryService:
         - gallery_images (list): The gallery images.
 
         Expected output:
-        - pd.DataFrame: DataFrame containing the parent product information.
+        - dict: The values of the parent product by column of the product table.
         """
-        parent_df = self.product_df.copy()
-
-        new_product = {
+        return {
             'type': 'variable',
             'featured': True,
             'catalog_visibility': 'visible',
@@ -121,24 +107,9 @@ class TablesFactoryService:
             'attributes.2': 1
         }
 
-        for column in parent_df.columns:
-            if column not in new_product:
-                new_product[column] = ''
-
-        # Create a DataFrame with a single row using new_product
-        new_product_df = pd.DataFrame([new_product])
-
-        # Use concat only if parent_df is not empty
-        if not parent_df.empty:
-            parent_df = pd.concat([parent_df, new_product_df], ignore_index=True)
-        else:
-            parent_df = new_product_df
-
-        return parent_df
-
-    def _create_simple_df(self, title, sku, price, description, brand, tags, image_name, gallery_images) -> pd.DataFrame:
+    def _simple_record(self, title, sku, price, description, brand, tags, image_name, gallery_images) -> dict:
         """
-        Creates a DataFrame for a simple product.
+        Creates the record of a simple product.
 
         Expected input:
         - title (str): The product title.
@@ -151,11 +122,9 @@ class TablesFactoryService:
         - gallery_images (list): The gallery images.
 
         Expected output:
-        - pd.DataFrame: DataFrame containing the simple product information.
+        - dict: The values of the simple product by column of the product table.
         """
-        simple_df = self.product_df.copy()
-
-        new_product = {
+        return {
             'type': 'simple',
             'featured': True,
             'catalog_visibility': 'visible',
@@ -176,20 +145,47 @@ class TablesFactoryService:
             'reviews_allowed': 1
         }
 
-        for column in simple_df.columns:
-            if column not in new_product:
-                new_product[column] = ''
+    def create_records(self, product_data, title, price, description, brand, tags, image_names, attribute_name) -> List[dict]:
+        """
+        Creates the records of a product: the parent and its variants, or the simple product.
 
-        # Create a DataFrame with a single row using new_product
-        new_product_df = pd.DataFrame([new_product])
+        Expected input:
+        - The same as create_tables.
 
-        # Use concat only if simple_df is not empty
-        if not simple_df.empty:
-            simple_df = pd.concat([simple_df, new_product_df], ignore_index=True)
+        Expected output:
+        - List[dict]: The rows of the product, as values by column of the product table.
+        """
+        variants = product_data["product"].get("variants") or []
+        if len(variants) > 1:
+            attribute_values = [variant["public_title"] for variant in variants if variant["public_title"]]
+            parent_sku = variants[0]["sku"]
+            records = [self._parent_record(title, parent_sku, price, description, brand, tags, attribute_name, attribute_values, image_names)]
+            for idx, variant in enumerate(variants[1:]):  # Start from the second variant
+                image_name = image_names[idx + 1] if (idx + 1) < len(image_names) else None
+                records.append(self._variant_record(variant, title, brand, tags, parent_sku, image_name, attribute_name))
+            self.logger.info(f"Processed {len(variants) - 1} variants.")
         else:
-            simple_df = new_product_df
+            # Single product without variants, which may have no variant at all
+            sku = variants[0]["sku"] if variants else ''
+            image_name = image_names[0] if len(image_names) > 0 else None
+            records = [self._simple_record(title, sku, price, description, brand, tags, image_name, image_names)]
+            self.logger.info("Processed single product without variants.")
+        return records
+
+    def create_table(self, records: List[dict]) -> pd.DataFrame:
+        """
+        Creates the product table of a batch of records, with the exported header of the product schema.
+
+        The rows are laid out as plain lists and the DataFrame is created once, so the cost
+        grows with the number of rows instead of copying the table for every row.
+
+        Expected input:
+        - records (List[dict]): The records, as returned by create_records. Missing columns are left empty.
 
-        return simple_df        
+        Expected output:
+        - pd.DataFrame: DataFrame containing the product information.
+        """
+        return pd.DataFrame([self.schema.row(record) for record in records], columns=list(self.schema.header))
 
     def create_tables(self, product_data, title, price, description, brand, tags, image_names, attribute_name) -> pd.DataFrame:
         """
@@ -209,43 +205,7 @@ class TablesFactoryService:
         - pd.DataFrame: DataFrame containing the product information.
         """
         self.logger.info("Starting to create tables for product.")
-        # Process product
-        if "variants" in product_data["product"] and len(product_data["product"]["variants"]) > 1:
-            attribute_values = [variant["public_title"] for variant in product_data["product"]["variants"] if variant["public_title"]]
-            parent_sku = product_data["product"]["variants"][0]["sku"]
-            wooc_df = self._create_parent_df(title, parent_sku, price, description, brand, tags, attribute_name, attribute_values, image_names)
-            for idx, variant in enumerate(product_data["product"]["variants"][1:]):  # Start from the second variant
-                image_name = image_names[idx + 1] if (idx + 1) < len(image_names) else None
-                variant_df = self._create_variant_df(variant, title, brand, tags, parent_sku, image_name, attribute_name)
-                wooc_df = pd.concat([wooc_df, variant_df], ignore_index=True)
-                self.logger.info(f"Processed variant {idx + 1}/{len(product_data['product']['variants']) - 1}.")
-        else:
-            # Single product without variants
-            variant = product_data["product"]["variants"][0]
-            sku = variant["sku"]
-            image_name = image_names[0] if len(image_names) > 0 else None
-            wooc_df = self._create_simple_df(title, sku, price, description, brand, tags, image_name, image_names)
-            self.logger.info("Processed single product without variants.")
-
-        # Ensure all original CSV columns are in the DataFrame
-        for column in self.product_df.columns:
-            if column not in wooc_df.columns:
-                wooc_df[column] = ''
-
-        # Replace NaN with empty strings
-        wooc_df = wooc_df.fillna('')
-
-        # Infer objects to avoid future warnings
-        wooc_df = wooc_df.infer_objects(copy=False)
-
-        # Reorder columns to match the sample CSV
-        wooc_df = wooc_df[self.product_df.columns]
-
-        # Replace .1, .2, and .3 in column names
-        wooc_df.columns = wooc_df.columns.str.replace(r'\.1', '', regex=True)
-        wooc_df.columns = wooc_df.columns.str.replace(r'\.2', '', regex=True)
-        wooc_df.columns = wooc_df.columns.str.replace(r'\.3', '', regex=True)
-        
+        wooc_df = self.create_table(self.create_records(product_data, title, price, description, brand, tags, image_names, attribute_name))
         self.logger.info("Finished creating tables for product.")
         return wooc_df
     
@@ -272,4 +232,85 @@ class TablesFactoryService:
         print(f'{len(df)} products have been saved to {df_output_path}')
 
         self.logger.info(f'\n{len(df)} product descriptions have been saved to {df_desc_output_path}')
-        print(f'{len(df)} product descriptions have been saved to {df_desc_output_path}')        
\ No newline at end of file
+        print(f'{len(df)} product descriptions have been saved to {df_desc_output_path}')
+
+    def start_products_stream(self, offset: int = 0) -> None:
+        """
+        Starts a new stream of scraped products, or resumes the stream of an interrupted run.
+
+        The products are appended to a JSONL file as they are scraped, so they are not
+        kept in memory until the end of the scraping.
+
+        Expected input:
+        - offset (int): The size of the stream to keep, as returned by append_products for the
+          last product completed by the interrupted run. 0 deletes the products of the last run.
+
+        Expected output:
+        - None (truncates the JSONL file in files/tables).
+        """
+        stream_path = files_output_path('files\\tables', SCRAPED_PRODUCTS_JSONL)
+        with open(stream_path, 'a', encoding='utf-8') as stream:
+            stream.truncate(offset)
+        self.logger.info(f'Streaming the scraped products to {stream_path}')
+
+    def append_products(self, df: pd.DataFrame) -> int:
+        """
+        Appends the table of a product to the stream of scraped products.
+
+        The first line of the stream holds the columns, and every other line the values of
+        a row, as JSON arrays, since the product table has several columns with the same name.
+
+        Expected input:
+        - df (pd.DataFrame): The table of the product, as created by create_tables.
+
+        Expected output:
+        - int: The size of the stream after the product (appends the rows to the JSONL file).
+        """
+        stream_path = files_output_path('files\\tables', SCRAPED_PRODUCTS_JSONL)
+        rows = json.loads(df.to_json(orient='values', double_precision=15, force_ascii=False))
+        with open(stream_path, 'a', encoding='utf-8') as stream:
+            if stream.tell() == 0:
+                stream.write(json.dumps(list(df.columns), ensure_ascii=False) + '\n')
+            stream.writelines(json.dumps(row, ensure_ascii=False) + '\n' for row in rows)
+            return stream.tell()
+
+    def save_products_stream(self, chunk_rows: int = SCRAPE_MERGE_CHUNK_ROWS) -> int:
+        """
+        Saves the stream of scraped products to the products and descriptions CSV files.
+
+        The stream is read and written chunk_rows rows at a time, so the memory used does not
+        depend on the number of products. The CSV files are the same save_products_csv writes.
+
+        Expected input:
+        - chunk_rows (int): The number of rows written at a time.
+
+        Expected output:
+        - int: The number of rows saved (saves the CSV files).
+        """
+        stream_path = files_output_path('files\\tables', SCRAPED_PRODUCTS_JSONL)
+        df_output_path = files_output_path('files\\tables', SCRAPED_PRODUCTS_CSV)
+        df_desc_output_path = files_output_path('files\\tables', SCRAPED_DESCRIPTIONS_CSV)
+
+        saved_rows = 0
+        with open(stream_path, encoding='utf-8') as stream:
+            header_line = stream.readline()
+            if not header_line:
+                self.logger.info(f'\nNo products to save in {stream_path}')
+                return 0
+            columns = json.loads(header_line)
+            while True:
+                rows = [json.loads(line) for line in islice(stream, chunk_rows)]
+                if not rows:
+                    break
+                df = pd.DataFrame(rows, columns=columns)
+                mode, header = ('w', True) if saved_rows == 0 else ('a', False)
+                df[['description']].to_csv(df_desc_output_path, index=False, encoding='utf-8', mode=mode, header=header)
+                df.drop(columns=['description']).to_csv(df_output_path, index=False, encoding='utf-8', mode=mode, header=header)
+                saved_rows += len(df)
+
+        self.logger.info(f'\n{saved_rows} products have been saved to {df_output_path}')
+        print(f'{saved_rows} products have been saved to {df_output_path}')
+
+        self.logger.info(f'\n{saved_rows} product descriptions have been saved to {df_desc_output_path}')
+        print(f'{saved_rows} product descriptions have been saved to {df_desc_output_path}')
+        return saved_rows
@@ -1 +1,2 @@
-from .utils import files_output_path, setup_logging 
\ No newline at end of file
+from .utils import files_output_path, setup_logging, canonicalize_url
+from .visited_index import url_fingerprint, FingerprintIndex, BloomFilterIndex, create_visited_index
\ No newline at end of file
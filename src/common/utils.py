@@ -1,5 +1,8 @@
 import os
+import time
 import logging
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 
 def files_output_path(directory: str, filename: str) -> str:
     """
@@ -35,4 +38,58 @@ def setup_logging(service_name: str):
         logger.addHandler(handler)
         logger.setLevel(logging.DEBUG)
 
-    return logger
\ No newline at end of file
+    return logger
+
+def canonicalize_url(url: str, ignored_params: tuple = (), lowercase_path: bool = False) -> str:
+    """
+    Normalize a URL so the different spellings of the same page compare equal.
+
+    The scheme and host are lowercased, default ports, fragments, ignored query
+    parameters and the trailing slash of the path are removed, and the remaining
+    query parameters are sorted.
+
+    Args:
+        url (str): The URL to normalize.
+        ignored_params (tuple): Query parameters that do not change the page (e.g. 'variant', 'utm_source').
+            Parameters ending with '*' match by prefix.
+        lowercase_path (bool): Whether the path is case insensitive and must be lowercased. Only for sites
+            that serve the same page whatever the case of the path.
+
+    Returns:
+        str: The canonical URL.
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme, netloc.rsplit(':', 1)[-1]) in (('http', '80'), ('https', '443')):
+        netloc = netloc.rsplit(':', 1)[0]
+
+    path = parts.path.lower() if lowercase_path else parts.path
+    if len(path) > 1:
+        path = path.rstrip('/') or '/'
+
+    def ignored(name):
+        return any(name.startswith(param[:-1]) if param.endswith('*') else name == param for param in ignored_params)
+
+    query = urlencode(sorted((name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True) if not ignored(name)))
+    return urlunsplit((scheme, netloc, path or '/', query, ''))
+
+def parse_retry_after(response):
+    """
+    Parse the Retry-After header (seconds or HTTP date) of a response.
+
+    Args:
+        response (requests.Response): The response of a throttled or failed request.
+
+    Returns:
+        float: The seconds to wait, or None if the header is missing or invalid.
+    """
+    value = response.headers.get('Retry-After')
+    if not isinstance(value, str):
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
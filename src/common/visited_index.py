@@ -0,0 +1,95 @@
+import math
+import hashlib
+
+def url_fingerprint(url: str) -> int:
+    """
+    Compute a 64-bit fingerprint of a URL.
+
+    Args:
+        url (str): The URL.
+
+    Returns:
+        int: The fingerprint, an unsigned 64-bit integer.
+    """
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'big')
+
+class FingerprintIndex:
+    """
+    A set of URLs that only keeps their 64-bit fingerprints instead of the URL strings.
+
+    Membership is exact in practice: a collision needs billions of URLs to become likely.
+    """
+
+    def __init__(self):
+        self._fingerprints = set()
+
+    def add(self, url: str) -> None:
+        self._fingerprints.add(url_fingerprint(url))
+
+    def __contains__(self, url: str) -> bool:
+        return url_fingerprint(url) in self._fingerprints
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+class BloomFilterIndex:
+    """
+    A set of URLs backed by a Bloom filter, which uses a fixed amount of memory.
+
+    The filter is sized for a capacity and a false positive rate: a URL never added
+    may be reported as present with that probability (the crawler would skip it),
+    but an added URL is always reported as present.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        """
+        Initialize the BloomFilterIndex.
+
+        Args:
+            capacity (int): The number of URLs the filter is sized for.
+            error_rate (float): The false positive rate expected at full capacity.
+        """
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self._count = 0
+
+    def _positions(self, url: str):
+        # Double hashing: the k positions are derived from the two halves of a 128-bit digest
+        digest = hashlib.blake2b(url.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, url: str) -> None:
+        added = False
+        for position in self._positions(url):
+            byte, bit = divmod(position, 8)
+            if not self._bits[byte] & (1 << bit):
+                self._bits[byte] |= 1 << bit
+                added = True
+        self._count += added
+
+    def __contains__(self, url: str) -> bool:
+        return all(self._bits[position // 8] & (1 << position % 8) for position in self._positions(url))
+
+    def __len__(self) -> int:
+        return self._count
+
+def create_visited_index(kind: str = 'fingerprint', capacity: int = 1000000, error_rate: float = 0.0001):
+    """
+    Create the index used to remember the visited URLs of a crawl.
+
+    Args:
+        kind (str): 'fingerprint' for an exact set of fingerprints, 'bloom' for a fixed-size Bloom filter.
+        capacity (int): The number of URLs a Bloom filter is sized for.
+        error_rate (float): The false positive rate of a Bloom filter at full capacity.
+
+    Returns:
+        FingerprintIndex | BloomFilterIndex: An empty index.
+    """
+    if kind == 'bloom':
+        return BloomFilterIndex(capacity, error_rate)
+    if kind == 'fingerprint':
+        return FingerprintIndex()
+    raise ValueError(f"Unknown visited index '{kind}', use 'fingerprint' or 'bloom'.")
@@ -1,15 +1,74 @@
+import os
+
 # URLS.
 CRAWL_URL = 'your_url_to_crawl'
 CATEGORIES_URL = 'reference_prefix_to_scrape'
 
+# Crawling configurations.
+CRAWL_MODE = 'sync'  # 'sync' fetches one page at a time, 'async' keeps several fetches in flight, 'sharded' runs CRAWL_SHARDS processes.
+CRAWL_CONCURRENCY = 16
+CRAWL_SHARDS = os.cpu_count() or 1  # Worker processes of the sharded crawl, each one fetches the URLs that hash to its shard.
+CRAWL_SHARD_IDS = None  # Shards run by this machine, None runs all of them. Split them between machines sharing CRAWL_SHARD_DB.
+CRAWL_SHARD_BATCH = 16  # URLs claimed from the shared queue at a time by a shard worker.
+CRAWL_SHARD_LEASE = 300  # Seconds without claiming or completing URLs before a shard worker is considered dead and its URLs are taken over.
+CRAWL_RESUME = True  # Resume an interrupted crawl from its last checkpoint.
+CRAWL_CHECKPOINT_INTERVAL = 500  # Pages fetched between checkpoints.
+CRAWL_USE_SITEMAP = True  # Discover the URLs from the sitemap and crawl only if there is no sitemap.
+CRAWL_IGNORED_QUERY_PARAMS = ('variant', 'utm_*', 'ref', '_pos', '_sid', '_ss', 'fbclid', 'gclid')  # Dropped from the crawled URLs.
+CRAWL_LOWERCASE_PATHS = False  # Treat URL paths as case insensitive when comparing URLs. Only for sites whose paths are.
+CRAWL_VISITED_INDEX = 'fingerprint'  # 'fingerprint' keeps 64-bit hashes, 'bloom' keeps a fixed-size Bloom filter.
+CRAWL_BLOOM_CAPACITY = 1000000
+CRAWL_BLOOM_ERROR_RATE = 0.0001
+CRAWL_MAX_DEPTH = None  # Links followed from CRAWL_URL to the deepest page fetched, None for no limit.
+CRAWL_MAX_PAGES = None  # Pages fetched before the crawl stops, None for no limit.
+CRAWL_PRIORITIZE_PRODUCTS = True  # Fetch the pages under CATEGORIES_URL before the listing and pagination pages.
+
+# Politeness configurations, applied to every host the crawler and scraper contact.
+HOST_MAX_CONCURRENCY = 8
+HOST_REQUESTS_PER_SECOND = 10
+HOST_MAX_RETRIES = 3
+HOST_MAX_BACKOFF = 60
+
+# HTTP client configurations, shared by all the network services.
+HTTP_TIMEOUT = (5, 30)  # Seconds to connect and to read a response.
+HTTP_POOL_HOSTS = 10  # Hosts whose keep-alive connections are pooled.
+HTTP_POOL_MAXSIZE = HOST_MAX_CONCURRENCY  # Keep-alive connections per host.
+HTTP_HOST_POOL_SIZES = {}  # Connections for specific hosts, e.g. {'www.example.com': 32}.
+HTTP_DNS_CACHE_TTL = 300  # Seconds a DNS resolution is reused, 0 to disable.
+HTTP_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Scraping configurations.
+SCRAPE_INCREMENTAL = True  # Scrape again only the products that changed since the last run.
+SCRAPE_RESUME = True  # Resume an interrupted scraping run, skipping the products and images it completed.
+SCRAPE_WORKERS = 8  # Product pages scraped at the same time, results keep the order of the URLs.
+SCRAPE_PARSE_PROCESSES = os.cpu_count() or 1  # Processes that parse the fetched pages, 0 to parse in the fetching threads.
+SCRAPE_IMAGE_WORKERS = 16  # Images downloaded at the same time, shared by all the products.
+SCRAPE_IMAGE_CHUNK_SIZE = 64 * 1024  # Bytes of an image written to disk at a time.
+SCRAPE_ARCHIVE = True  # Keep every fetched product page in a compressed archive.
+SCRAPE_REPLAY = False  # Scrape the pages of the archive instead of fetching them, without any network request.
+SCRAPE_EXTRACTION = 'json'  # 'json' reads the product JSON of the page, 'endpoint' fetches /products/<handle>.js, 'selectors' parses the page.
+SCRAPE_MERGE_CHUNK_ROWS = 5000  # Rows of the scraped products stream written to the CSV files at a time.
+
 # Files to save the product information.
 PRODUCT_URLS_CSV = 'products_urls.csv'
 WOOC_SAMPLE = 'wc-importer-sample-products.csv'
 TEST_SCRAPE_URLS = 'test_products_urls.csv'
 SCRAPED_DESCRIPTIONS_CSV = 'wc-products-descriptions.csv'
 SCRAPED_PRODUCTS_CSV = 'wc-products.csv'
+SCRAPED_PRODUCTS_JSONL = 'wc-products.jsonl'
 UPDATED_PRODUCTS_CSV = 'updated-wc_products.csv'
 
+# Files to save the state of the stages.
+CRAWL_STATE_DB = 'crawl_state.sqlite3'
+CRAWL_SHARD_DB = 'crawl_shards.sqlite3'
+PRODUCT_STATE_DB = 'product_state.sqlite3'
+SCRAPE_LEDGER_DB = 'scrape_ledger.sqlite3'
+WP_UPLOAD_MANIFEST_DB = 'upload_manifest.sqlite3'
+
+# Files of the archive of fetched product pages.
+RESPONSE_ARCHIVE_FILE = 'product_pages.warc.gz'
+RESPONSE_ARCHIVE_INDEX = 'product_pages_index.sqlite3'
+
 # Logs.
 LOGGING_CRAWLING_FILE = 'crawling_stage.log'
 LOGGING_SCRAPING_FILE = 'scraping_stage.log'
@@ -21,6 +80,14 @@ WP_URL = 'your_wordpress_url'
 WP_USERNAME = 'your_username'
 WP_PASSWORD = 'your_password'
 
+# Wordpress images upload configurations.
+WP_UPLOAD_CONCURRENCY = 8  # Images uploaded at the same time. Above HTTP_POOL_MAXSIZE, size the pool of the host in HTTP_HOST_POOL_SIZES.
+WP_UPLOAD_TIMEOUT = (5, 60)  # Seconds to connect and to read the response of an upload.
+WP_UPLOAD_RETRIES = 3  # Attempts of an upload failed by a network error, a 429 or a 5xx response.
+WP_UPLOAD_BACKOFF = 2  # Seconds before the first retry of an upload, doubled on every retry.
+WP_UPLOAD_RESUME = True  # Skip the images already uploaded with the same content, as recorded in the upload manifest.
+WP_RECONCILE_MEDIA = False  # List the WordPress media library once and reuse the media matching the images by file name and size.
+
 # Woocommerce credentials and configurations.
 WC_URL = 'your_woocommerce_url'
 WC_KEY = 'your_consumer_key'
@@ -1,6 +1,6 @@
 # Import services from the application and infrastructure layers
 from src.application.services import TablesFactoryService, URLsFactoryService, ImagesFactoryService, DataPreparationService
-from src.infrastructure.services import BSScrapingService, WPImagesService, BSCrawlingWebService, WCUploadService
+from src.infrastructure.services import BSScrapingService, WPImagesService, BSCrawlingWebService, WCUploadService, PolitenessScheduler, CrawlFrontierStore, SitemapDiscoveryService, ProductStateStore, CrawlShardQueue, HttpClient, ResponseArchive, ScrapeLedger, ImageDownloader, UploadManifest
 from src.config.ioc import IoCContainer
 
 def ioc_config():
@@ -13,14 +13,29 @@ def ioc_config():
     """
     # Create an instance of the IoC container
     container = IoCContainer()
+
+    # The crawler and the scraper share the scheduler so their requests count against the same per-host limits
+    scheduler = PolitenessScheduler()
+    # The network services share the HTTP client so they reuse the same keep-alive connections
+    http_client = HttpClient()
     
     # Register services in the IoC container
+    container.register('politeness_scheduler', scheduler)
+    container.register('http_client', http_client)
     container.register('tables_factory_service', TablesFactoryService())
-    container.register('scraping_service', BSScrapingService())
+    container.register('scraping_service', BSScrapingService(scheduler, http_client))
+    container.register('product_state_store', ProductStateStore())
+    container.register('response_archive', ResponseArchive())
+    container.register('scrape_ledger', ScrapeLedger())
+    container.register('image_downloader', ImageDownloader(http_client))
     container.register('urls_factory_service', URLsFactoryService())
-    container.register('crawling_web_service', BSCrawlingWebService())
+    container.register('sitemap_discovery_service', SitemapDiscoveryService(scheduler, http_client))
+    container.register('crawl_frontier_store', CrawlFrontierStore())
+    container.register('crawl_shard_queue', CrawlShardQueue())
+    container.register('crawling_web_service', BSCrawlingWebService(scheduler, container.config('crawl_frontier_store'), container.config('crawl_shard_queue'), http_client))
     container.register('images_factory_service', ImagesFactoryService())
-    container.register('wp_images_service', WPImagesService())
+    container.register('upload_manifest', UploadManifest())
+    container.register('wp_images_service', WPImagesService(http_client, container.config('upload_manifest')))
     container.register('data_preparation_service', DataPreparationService())
     container.register('wc_upload_service', WCUploadService())
     
@@ -10,4 +10,14 @@ from .wp_images_protocol import WPImagesServiceProtocol
 from .images_upload_pipeline_protocol import ImagesUploadPipelineProtocol
 from .products_uploading_pipeline_protocol import ProductsUploadingPipelineProtocol
 from .website_crawling_pipeline_protocol import WebsiteCrawlingPipelineProtocol
-from .website_scraping_pipeline_protocol import WebsiteScrapingPipelineProtocol
\ No newline at end of file
+from .website_scraping_pipeline_protocol import WebsiteScrapingPipelineProtocol
+from .politeness_scheduler_protocol import PolitenessSchedulerProtocol
+from .crawl_frontier_store_protocol import CrawlFrontierStoreProtocol
+from .sitemap_discovery_protocol import SitemapDiscoveryServiceProtocol
+from .product_state_store_protocol import ProductStateStoreProtocol
+from .crawl_shard_queue_protocol import CrawlShardQueueProtocol
+from .http_client_protocol import HttpClientProtocol
+from .response_archive_protocol import ResponseArchiveProtocol
+from .scrape_ledger_protocol import ScrapeLedgerProtocol
+from .image_downloader_protocol import ImageDownloaderProtocol
+from .upload_manifest_protocol import UploadManifestProtocol
\ No newline at end of file
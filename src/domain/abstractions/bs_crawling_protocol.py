@@ -1,4 +1,4 @@
-from typing import Protocol, List
+from typing import Protocol, List, Optional
 
 class BSCrawlingWebServiceProtocol(Protocol):
     def __init__(self) -> None:
@@ -7,8 +7,26 @@ class BSCrawlingWebServiceProtocol(Protocol):
     def url_validator(self, url: str, domain: str, prefix: str) -> bool:
         ...
 
+    def fetch_links(self, url: str) -> Optional[List[str]]:
+        ...
+
     def crawling_web(self) -> List[str]:
         ...
 
+    def crawling_web_async(self, concurrency: int) -> List[str]:
+        ...
+
+    def crawling_web_sharded(self, shards: int, shard_ids: Optional[List[int]] = None) -> List[str]:
+        ...
+
+    def clear_page_cache(self) -> None:
+        ...
+
+    def clear_checkpoint(self) -> None:
+        ...
+
     def update_prefix(self) -> None:
+        ...
+
+    def restore_prefix(self, sharded: bool = False) -> bool:
         ...
\ No newline at end of file
@@ -1,29 +1,40 @@
 from typing import Protocol
+from bs4 import BeautifulSoup
+from src.domain.scraping import ScrapeResult
 
 class BSScrapingServiceProtocol(Protocol):
     def __init__(self) -> None:
         ...
 
-    def scrape(self, URL: str) -> dict:
+    def fetch_product(self, URL: str, validators: dict = None) -> ScrapeResult:
         ...
 
-    def scrape_title(self) -> str:
+    def parse_product(self, content: bytes, extraction: str = 'json') -> dict:
         ...
 
-    def scrape_price(self) -> str:
+    def parse_product_page(self, content: bytes) -> dict:
         ...
 
-    def scrape_brand(self) -> str:
+    def scrape_product(self, URL: str, validators: dict = None) -> ScrapeResult:
         ...
 
-    def scrape_description(self) -> str:
+    def scrape_title(self, soup: BeautifulSoup) -> str:
         ...
 
-    def scrape_data_tags(self) -> tuple:
+    def scrape_price(self, soup: BeautifulSoup) -> str:
         ...
 
-    def scrape_attribute(self) -> str:
+    def scrape_brand(self, soup: BeautifulSoup) -> str:
         ...
 
-    def scrape_images(self) -> list:
+    def scrape_description(self, soup: BeautifulSoup) -> str:
+        ...
+
+    def scrape_data_tags(self, soup: BeautifulSoup) -> tuple:
+        ...
+
+    def scrape_attribute(self, soup: BeautifulSoup) -> str:
+        ...
+
+    def scrape_images(self, soup: BeautifulSoup) -> list:
         ...
\ No newline at end of file
@@ -0,0 +1,15 @@
+from typing import Protocol, Optional
+from src.domain.crawling import CrawlState
+
+class CrawlFrontierStoreProtocol(Protocol):
+    def load(self, start_url: str, prefix: str, visited_index=None, seen_index=None, key=None) -> Optional[CrawlState]:
+        ...
+
+    def saved_prefix(self, start_url: str) -> Optional[str]:
+        ...
+
+    def save(self, state: CrawlState) -> None:
+        ...
+
+    def clear(self) -> None:
+        ...
\ No newline at end of file
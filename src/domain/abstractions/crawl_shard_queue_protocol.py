@@ -0,0 +1,28 @@
+from typing import Protocol, List, Optional, Tuple
+
+class CrawlShardQueueProtocol(Protocol):
+    db_path: str
+
+    def start(self, start_url: str, prefix: str, shards: int, resume: bool = True, start_key: str = None) -> bool:
+        ...
+
+    def crawl(self) -> Optional[dict]:
+        ...
+
+    def release(self, shard: int) -> None:
+        ...
+
+    def claim(self, shard: int, limit: int) -> List[Tuple[str, str]]:
+        ...
+
+    def complete(self, url_key: str, links: List[Tuple[str, str]], shards: int) -> None:
+        ...
+
+    def has_pending(self) -> bool:
+        ...
+
+    def collected_urls(self) -> List[str]:
+        ...
+
+    def clear(self) -> None:
+        ...
\ No newline at end of file
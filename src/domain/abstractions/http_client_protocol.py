@@ -0,0 +1,15 @@
+from typing import Protocol
+import requests
+
+class HttpClientProtocol(Protocol):
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        ...
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        ...
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        ...
+
+    def close(self) -> None:
+        ...
\ No newline at end of file
@@ -0,0 +1,12 @@
+from typing import Protocol
+from concurrent.futures import Future
+
+class ImageDownloaderProtocol(Protocol):
+    def submit(self, url: str, path: str) -> Future:
+        ...
+
+    def download(self, url: str, path: str) -> str:
+        ...
+
+    def close(self) -> None:
+        ...
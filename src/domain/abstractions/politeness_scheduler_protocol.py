@@ -0,0 +1,9 @@
+from typing import Protocol, Callable
+import requests
+
+class PolitenessSchedulerProtocol(Protocol):
+    def request(self, url: str, send: Callable[[], requests.Response]) -> requests.Response:
+        ...
+
+    def record_response(self, url: str, response: requests.Response) -> float:
+        ...
\ No newline at end of file
@@ -0,0 +1,12 @@
+from typing import Protocol, Optional
+import pandas as pd
+
+class ProductStateStoreProtocol(Protocol):
+    def get(self, url: str) -> Optional[dict]:
+        ...
+
+    def save(self, url: str, df: pd.DataFrame, lastmod: str = None, etag: str = None, last_modified: str = None) -> None:
+        ...
+
+    def touch(self, url: str, lastmod: str = None) -> None:
+        ...
\ No newline at end of file
@@ -0,0 +1,12 @@
+from typing import Protocol, Iterator, Optional
+from src.domain.scraping import ScrapeResult
+
+class ResponseArchiveProtocol(Protocol):
+    def append(self, url: str, content: bytes, etag: str = None, last_modified: str = None, status_code: int = 200) -> None:
+        ...
+
+    def latest(self, url: str) -> Optional[ScrapeResult]:
+        ...
+
+    def iter_latest(self) -> Iterator[ScrapeResult]:
+        ...
\ No newline at end of file
@@ -0,0 +1,23 @@
+from typing import Protocol, Optional
+
+class ScrapeLedgerProtocol(Protocol):
+    def start(self, run_key: str, resume: bool = True) -> bool:
+        ...
+
+    def completed_urls(self) -> set:
+        ...
+
+    def stream_offset(self) -> int:
+        ...
+
+    def complete(self, url: str, stream_offset: int) -> None:
+        ...
+
+    def image_source(self, path: str) -> Optional[str]:
+        ...
+
+    def record_image(self, path: str, src: str) -> None:
+        ...
+
+    def clear(self) -> None:
+        ...
@@ -0,0 +1,14 @@
+from typing import Protocol, Iterator, List, Tuple, Optional, Dict
+
+class SitemapDiscoveryServiceProtocol(Protocol):
+    def sitemap_locations(self, start_url: str) -> List[str]:
+        ...
+
+    def iter_sitemap_entries(self, start_url: str) -> Iterator[Tuple[str, Optional[str]]]:
+        ...
+
+    def discover_entries(self, start_url: str) -> Dict[str, Optional[str]]:
+        ...
+
+    def discover_urls(self, start_url: str) -> List[str]:
+        ...
\ No newline at end of file
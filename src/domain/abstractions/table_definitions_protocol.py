@@ -8,6 +8,15 @@ class TableDefinitionsProtocol(Protocol):
     creating product and URL tables as pandas DataFrames.
     """
 
+    def product_schema(self):
+        """
+        Get the schema of the product table, loaded once.
+
+        Returns:
+            ProductSchema: The columns, their defaults and the exported header of the product table.
+        """
+        ...
+
     def product_table(self) -> pd.DataFrame:
         """
         Create an empty product table DataFrame.
@@ -5,13 +5,19 @@ class TablesFactoryServiceProtocol(Protocol):
     def __init__(self) -> None:
         ...
 
-    def _create_variant_df(self, variant, title: str, brand: str, tags: List[str], parent_sku: str, image_name: str, attribute_name: str) -> pd.DataFrame:
+    def _variant_record(self, variant, title: str, brand: str, tags: List[str], parent_sku: str, image_name: str, attribute_name: str) -> dict:
         ...
 
-    def _create_parent_df(self, title: str, sku: str, price: float, description: str, brand: str, tags: List[str], attribute_name: str, attribute_values: List[str], gallery_images: List[str]) -> pd.DataFrame:
+    def _parent_record(self, title: str, sku: str, price: float, description: str, brand: str, tags: List[str], attribute_name: str, attribute_values: List[str], gallery_images: List[str]) -> dict:
         ...
 
-    def _create_simple_df(self, title: str, sku: str, price: float, description: str, brand: str, tags: List[str], image_name: str, gallery_images: List[str]) -> pd.DataFrame:
+    def _simple_record(self, title: str, sku: str, price: float, description: str, brand: str, tags: List[str], image_name: str, gallery_images: List[str]) -> dict:
+        ...
+
+    def create_records(self, product_data: dict, title: str, price: float, description: str, brand: str, tags: List[str], image_names: List[str], attribute_name: str) -> List[dict]:
+        ...
+
+    def create_table(self, records: List[dict]) -> pd.DataFrame:
         ...
 
     def create_tables(self, product_data: dict, title: str, price: float, description: str, brand: str, tags: List[str], image_names: List[str], attribute_name: str) -> pd.DataFrame:
@@ -19,3 +25,12 @@ class TablesFactoryServiceProtocol(Protocol):
 
     def save_products_csv(self, df: pd.DataFrame) -> None:
         ...
+
+    def start_products_stream(self, offset: int = 0) -> None:
+        ...
+
+    def append_products(self, df: pd.DataFrame) -> int:
+        ...
+
+    def save_products_stream(self, chunk_rows: int = ...) -> int:
+        ...
\ No newline at end of file
@@ -0,0 +1,8 @@
+from typing import Protocol, Optional, Tuple
+
+class UploadManifestProtocol(Protocol):
+    def uploaded_media(self, sha256: str) -> Optional[Tuple[Optional[int], str]]:
+        ...
+
+    def record_upload(self, path: str, sha256: str, media_id: Optional[int], source_url: str) -> None:
+        ...
@@ -2,4 +2,7 @@ from typing import Protocol
 
 class WPImagesServiceProtocol(Protocol):
     def upload_image(self, image_path: str) -> str:
+        ...
+
+    def reconcile_library(self, per_page: int = 100) -> int:
         ...
\ No newline at end of file
@@ -0,0 +1,2 @@
+from .crawl_state import CrawlState
+from .crawl_frontier import CrawlFrontier, FrontierEntry
\ No newline at end of file
@@ -0,0 +1,55 @@
+import heapq
+from itertools import count
+from typing import Iterable, List, NamedTuple
+
+class FrontierEntry(NamedTuple):
+    """
+    A URL pending to fetch, with the depth it was found at and its priority (lower is fetched first).
+    """
+    url: str
+    depth: int = 0
+    priority: int = 0
+
+class CrawlFrontier:
+    """
+    The URLs pending to fetch, ordered by priority, then by depth, then by insertion.
+
+    When every URL has the same priority the order is the breadth-first order of a FIFO queue.
+    """
+
+    def __init__(self, entries: Iterable[tuple] = ()):
+        """
+        Initialize the CrawlFrontier.
+
+        Args:
+            entries (Iterable[tuple]): Initial entries, as FrontierEntry or (url, depth, priority) tuples.
+        """
+        self._heap = []
+        self._counter = count()
+        for entry in entries:
+            self.push(*entry)
+
+    def push(self, url: str, depth: int = 0, priority: int = 0) -> None:
+        """
+        Add a URL to the frontier.
+        """
+        heapq.heappush(self._heap, (priority, depth, next(self._counter), url))
+
+    def pop(self) -> FrontierEntry:
+        """
+        Remove and return the next entry to fetch.
+        """
+        priority, depth, _, url = heapq.heappop(self._heap)
+        return FrontierEntry(url, depth, priority)
+
+    def entries(self) -> List[FrontierEntry]:
+        """
+        The entries of the frontier in the order they will be fetched.
+        """
+        return [FrontierEntry(url, depth, priority) for priority, depth, _, url in sorted(self._heap)]
+
+    def __iter__(self):
+        return (entry.url for entry in self.entries())
+
+    def __len__(self) -> int:
+        return len(self._heap)
@@ -0,0 +1,133 @@
+from typing import Callable, Iterable, List
+from src.common.visited_index import FingerprintIndex
+from src.domain.crawling.crawl_frontier import CrawlFrontier, FrontierEntry
+
+class CrawlState:
+    """
+    The state of a crawl: the frontier of URLs to fetch, the visited URLs and the collected URLs.
+
+    The URLs are deduplicated by a key, e.g. their canonical form, while the frontier
+    and the collected URLs keep the URLs as found. The keys of the visited URLs and of
+    the URLs seen so far (visited or in the frontier) are kept in compact indexes
+    (fingerprints or a Bloom filter), so the state only holds the strings of the
+    frontier and of the collected URLs, each URL once. When
+    the state is persistent it also keeps track of the changes made since the last
+    checkpoint, so it can be saved incrementally, and of the URLs being fetched, so
+    they are fetched again if the crawl is resumed before they finish.
+    """
+
+    def __init__(self, start_url: str, prefix: str, frontier: Iterable[tuple] = None,
+                 visited: Iterable[str] = None, urls: Iterable[str] = None, finished: bool = False,
+                 visited_index=None, persistent: bool = False, seen_index=None, key: Callable[[str], str] = None):
+        """
+        Initialize the CrawlState.
+
+        Args:
+            start_url (str): The URL where the crawl starts.
+            prefix (str): The prefix the collected URLs must have.
+            frontier (Iterable[tuple]): Entries pending to fetch, as (url, depth, priority). Defaults to the start URL.
+            visited (Iterable[str]): Keys of the URLs already fetched.
+            urls (Iterable[str]): URLs already collected.
+            finished (bool): Whether the crawl already finished.
+            visited_index (FingerprintIndex | BloomFilterIndex): Empty index for the visited URLs.
+                Defaults to a FingerprintIndex.
+            persistent (bool): Whether the changes since the last checkpoint must be tracked.
+            seen_index (FingerprintIndex | BloomFilterIndex): Empty index for the URLs seen so far.
+                Defaults to a FingerprintIndex.
+            key (Callable[[str], str]): Function giving the key URLs are deduplicated by. Defaults to the URL itself.
+        """
+        self.start_url = start_url
+        self.prefix = prefix
+        self.key = key or str
+        self.frontier = CrawlFrontier([FrontierEntry(start_url)] if frontier is None else frontier)
+        self.visited = FingerprintIndex() if visited_index is None else visited_index
+        self.seen = FingerprintIndex() if seen_index is None else seen_index
+        for url_key in visited or ():
+            self.visited.add(url_key)
+            self.seen.add(url_key)
+        self.urls = list(urls or ())
+        for url in self.urls:
+            self.seen.add(self.key(url))
+        for url in self.frontier:
+            self.seen.add(self.key(url))
+        self.finished = finished
+        self.persistent = persistent
+        self.in_progress = {}
+        self.new_visited = []
+        self.saved_urls = len(self.urls)
+
+    def next_entry(self) -> FrontierEntry:
+        """
+        Pop the next entry to fetch from the frontier.
+        """
+        return self.frontier.pop()
+
+    def mark_visited(self, entry: FrontierEntry) -> bool:
+        """
+        Mark the URL of a frontier entry as being fetched.
+
+        Returns:
+            bool: False if the URL was already visited, True otherwise.
+        """
+        url_key = self.key(entry.url)
+        if url_key in self.visited:
+            return False
+        self.visited.add(url_key)
+        self.in_progress[entry.url] = entry
+        return True
+
+    def complete(self, url: str) -> None:
+        """
+        Mark a URL as fetched and processed.
+        """
+        self.in_progress.pop(url, None)
+        if self.persistent:
+            self.new_visited.append(self.key(url))
+
+    def add_url(self, url: str, depth: int = 0, priority: int = 0, fetch: bool = True, url_key: str = None) -> bool:
+        """
+        Collect a URL and add it to the frontier, unless a URL with the same key was already seen.
+
+        Args:
+            url (str): The URL found.
+            depth (int): The number of links followed from the start URL to find it.
+            priority (int): The fetch priority, lower is fetched first.
+            fetch (bool): Whether the URL is added to the frontier, or only collected.
+            url_key (str): The key of the URL, if already computed.
+
+        Returns:
+            bool: True if the URL was added, False if it was already seen.
+        """
+        url_key = self.key(url) if url_key is None else url_key
+        if url_key in self.seen:
+            return False
+        self.seen.add(url_key)
+        if fetch:
+            self.frontier.push(url, depth, priority)
+        self.urls.append(url)
+        return True
+
+    def pending_frontier(self) -> List[FrontierEntry]:
+        """
+        The entries that still have to be fetched, including the ones being fetched right now.
+        """
+        return list(self.in_progress.values()) + self.frontier.entries()
+
+    def unsaved_visited(self) -> List[str]:
+        """
+        The keys of the URLs visited since the last checkpoint.
+        """
+        return self.new_visited
+
+    def unsaved_urls(self) -> List[str]:
+        """
+        The URLs collected since the last checkpoint.
+        """
+        return self.urls[self.saved_urls:]
+
+    def mark_saved(self) -> None:
+        """
+        Mark the current state as persisted.
+        """
+        self.new_visited = []
+        self.saved_urls = len(self.urls)
\ No newline at end of file
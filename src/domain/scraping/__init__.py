@@ -0,0 +1 @@
+from .scrape_result import ScrapeResult
\ No newline at end of file
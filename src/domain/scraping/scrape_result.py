@@ -0,0 +1,22 @@
+from typing import NamedTuple, Optional
+
+class ScrapeResult(NamedTuple):
+    """
+    The result of scraping a product page.
+
+    Attributes:
+        url (str): The URL of the product page.
+        data (dict): The scraped product data, None if the page was not modified.
+        etag (str): The ETag header of the response, to make conditional requests later.
+        last_modified (str): The Last-Modified header of the response.
+        not_modified (bool): Whether a conditional request returned 304.
+        content (bytes): The raw HTML of the page, when it was fetched but not parsed yet.
+        status_code (int): The HTTP status of the response the content came with.
+    """
+    url: str
+    data: Optional[dict] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    not_modified: bool = False
+    content: Optional[bytes] = None
+    status_code: int = 200
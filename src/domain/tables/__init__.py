@@ -1 +1,2 @@
-from .table_definitions import TableDefinitions
\ No newline at end of file
+from .table_definitions import TableDefinitions
+from .product_schema import ProductSchema
\ No newline at end of file
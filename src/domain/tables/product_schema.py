@@ -0,0 +1,43 @@
+import re
+from typing import Iterable, List, NamedTuple, Tuple
+
+# pandas suffixes the repeated columns of the sample CSV with .1, .2 and .3
+REPEATED_COLUMN_SUFFIX = re.compile(r'\.[123]')
+
+class ProductSchema(NamedTuple):
+    """
+    The columns of the product table, as defined by the WooCommerce sample CSV.
+
+    Attributes:
+        columns (tuple): The unique names of the columns, in order, as read by pandas (e.g. 'attributes.1').
+            The product records are keyed by these names.
+        defaults (tuple): The value of the cells left empty, by column.
+        header (tuple): The exported header, where the repeated columns keep their repeated names (e.g. 'attributes').
+    """
+    columns: Tuple[str, ...]
+    defaults: Tuple[object, ...]
+    header: Tuple[str, ...]
+
+    @classmethod
+    def from_columns(cls, columns: Iterable[str]) -> 'ProductSchema':
+        """
+        Create the schema of the columns read from the sample CSV.
+        """
+        columns = tuple(columns)
+        return cls(columns, ('',) * len(columns), tuple(REPEATED_COLUMN_SUFFIX.sub('', column) for column in columns))
+
+    def row(self, record: dict) -> List[object]:
+        """
+        Lay out a product record as a row of the table.
+
+        Args:
+            record (dict): The values of the product by column. Missing and null values take the default of the column.
+
+        Returns:
+            List[object]: The values of the row, in the order of the columns.
+        """
+        row = []
+        for column, default in zip(self.columns, self.defaults):
+            value = record.get(column)
+            row.append(default if value is None or value != value else value)
+        return row
@@ -1,8 +1,10 @@
 import pandas as pd
 from typing import List
+from functools import lru_cache
 from src.config.config import WOOC_SAMPLE
 from src.common.utils import files_output_path
 from src.domain.abstractions import TableDefinitionsProtocol
+from src.domain.tables.product_schema import ProductSchema
 
 class TableDefinitions(TableDefinitionsProtocol):
     """
@@ -11,24 +13,35 @@ class TableDefinitions(TableDefinitionsProtocol):
     """
 
     @staticmethod
-    def product_table() -> pd.DataFrame:
+    @lru_cache(maxsize=None)
+    def product_schema() -> ProductSchema:
         """
-        Create an empty product table DataFrame with the same columns
-        as a sample CSV file.
+        Get the schema of the product table, with the columns of a sample CSV file.
+
+        The sample CSV file is read once; the schema is immutable, so it is shared by
+        every caller.
 
         Returns:
-            pd.DataFrame: An empty DataFrame with columns matching the sample CSV.
+            ProductSchema: The columns, their defaults and the exported header of the product table.
         """
         # Define the path to the sample CSV file.
         sample_csv_path = files_output_path('files\\tables', WOOC_SAMPLE)
         
-        # Read the sample CSV file to get column definitions.
-        sample_df = pd.read_csv(sample_csv_path, encoding='utf-8')
-        
-        # Create an empty DataFrame with the same columns as the sample CSV.
-        product_df = pd.DataFrame(columns=sample_df.columns)
+        # Read only the header of the sample CSV file to get column definitions.
+        sample_df = pd.read_csv(sample_csv_path, encoding='utf-8', nrows=0)
         
-        return product_df
+        return ProductSchema.from_columns(sample_df.columns)
+
+    @staticmethod
+    def product_table() -> pd.DataFrame:
+        """
+        Create an empty product table DataFrame with the same columns
+        as a sample CSV file.
+
+        Returns:
+            pd.DataFrame: An empty DataFrame with columns matching the sample CSV.
+        """
+        return pd.DataFrame(columns=list(TableDefinitions.product_schema().columns))
 
     @staticmethod
     def urls_table(urls: List[str]) -> pd.DataFrame:
@@ -1,4 +1,14 @@
 from .bs_crawling_service import BSCrawlingWebService
 from .bs_scraping_service import BSScrapingService
 from .wp_images_service import WPImagesService
-from .wc_upload_service import WCUploadService
\ No newline at end of file
+from .wc_upload_service import WCUploadService
+from .politeness_scheduler import PolitenessScheduler
+from .crawl_frontier_store import CrawlFrontierStore
+from .sitemap_discovery_service import SitemapDiscoveryService
+from .product_state_store import ProductStateStore
+from .crawl_shard_queue import CrawlShardQueue
+from .http_client import HttpClient
+from .response_archive import ResponseArchive
+from .scrape_ledger import ScrapeLedger
+from .image_downloader import ImageDownloader
+from .upload_manifest import UploadManifest
\ No newline at end of file
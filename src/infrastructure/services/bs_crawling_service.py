@@ -1,23 +1,115 @@
+import time
+import asyncio
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-from collections import deque
-from src.config.config import CRAWL_URL, CATEGORIES_URL, LOGGING_CRAWLING_FILE
-from src.common.utils import setup_logging
-from src.domain.abstractions import BSCrawlingWebServiceProtocol
+from itertools import repeat
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlparse, urldefrag
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from src.config.config import (CRAWL_URL, CATEGORIES_URL, LOGGING_CRAWLING_FILE, CRAWL_CONCURRENCY, CRAWL_RESUME, CRAWL_CHECKPOINT_INTERVAL,
+                               CRAWL_IGNORED_QUERY_PARAMS, CRAWL_VISITED_INDEX, CRAWL_BLOOM_CAPACITY, CRAWL_BLOOM_ERROR_RATE,
+                               CRAWL_SHARDS, CRAWL_SHARD_BATCH, HOST_MAX_CONCURRENCY, HOST_REQUESTS_PER_SECOND,
+                               CRAWL_MAX_DEPTH, CRAWL_MAX_PAGES, CRAWL_PRIORITIZE_PRODUCTS, CRAWL_LOWERCASE_PATHS)
+from src.common.utils import setup_logging, canonicalize_url
+from src.common.visited_index import create_visited_index
+from src.domain.abstractions import (BSCrawlingWebServiceProtocol, PolitenessSchedulerProtocol, CrawlFrontierStoreProtocol,
+                                     CrawlShardQueueProtocol, HttpClientProtocol)
+from src.domain.crawling import CrawlState
+from src.infrastructure.services.politeness_scheduler import PolitenessScheduler
+from src.infrastructure.services.crawl_shard_queue import CrawlShardQueue
+from src.infrastructure.services.http_client import HttpClient
+
+SHARD_IDLE_WAIT = 0.5
+
+class AnchorHrefParser(HTMLParser):
+    """
+    A streaming HTML tokenizer that only collects the href of the anchor tags.
+
+    It is much faster than building a BeautifulSoup tree, since no node is
+    created for the rest of the document.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.hrefs = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            for name, value in attrs:
+                if name == 'href':
+                    self.hrefs.append(value or '')
+                    break
+
+def extract_hrefs(content: bytes) -> list:
+    """
+    Extract the href of all the anchor tags of an HTML document.
+
+    Args:
+        content (bytes): The HTML document.
+
+    Returns:
+        list: The hrefs, in document order.
+    """
+    parser = AnchorHrefParser()
+    parser.feed(content.decode('utf-8', errors='replace'))
+    parser.close()
+    return parser.hrefs
+
+def run_crawl_shard(db_path: str, shard: int, local_shards: int) -> int:
+    """
+    Entry point of the worker process of a shard.
+
+    The per-host limits are split between the shards run by this machine, so the
+    sharded crawl is as polite as a crawl run by a single process.
+
+    Args:
+        db_path (str): Path of the shared shard queue.
+        shard (int): The shard fetched by this worker.
+        local_shards (int): The number of shards run by this machine.
+
+    Returns:
+        int: The number of pages fetched by the worker.
+    """
+    scheduler = PolitenessScheduler(max_concurrency=max(1, HOST_MAX_CONCURRENCY // local_shards),
+                                    requests_per_second=HOST_REQUESTS_PER_SECOND / local_shards)
+    return BSCrawlingWebService(scheduler).crawl_shard(CrawlShardQueue(db_path), shard)
 
 class BSCrawlingWebService(BSCrawlingWebServiceProtocol):
     """
     A service class for crawling web pages and extracting URLs that match certain criteria.
     """
 
-    def __init__(self):
+    def __init__(self, scheduler: PolitenessSchedulerProtocol = None, frontier_store: CrawlFrontierStoreProtocol = None,
+                 shard_queue: CrawlShardQueueProtocol = None, http_client: HttpClientProtocol = None):
         """
         Initialize the BSCrawlingWebService with the starting URL and URL prefix.
+
+        Args:
+            scheduler (PolitenessSchedulerProtocol): Scheduler that rate limits the requests to each host.
+                A private one is created if not provided.
+            frontier_store (CrawlFrontierStoreProtocol): Store where the crawl is checkpointed to be resumed
+                after a failure. The crawl is kept only in memory if not provided.
+            shard_queue (CrawlShardQueueProtocol): Queue shared by the workers of the sharded crawl.
+                Defaults to a CrawlShardQueue in files/state.
+            http_client (HttpClientProtocol): Pooled HTTP client used to fetch the pages.
+                A private one is created if not provided.
         """
         self.logger = setup_logging(LOGGING_CRAWLING_FILE)
         self.start_url = CRAWL_URL
         self.prefix = CATEGORIES_URL
+        self.scheduler = scheduler or PolitenessScheduler()
+        self.frontier_store = frontier_store
+        self.shard_queue = shard_queue
+        self.http_client = http_client or HttpClient()
+        self.resume = CRAWL_RESUME
+        self.checkpoint_interval = CRAWL_CHECKPOINT_INTERVAL
+        self.ignored_query_params = CRAWL_IGNORED_QUERY_PARAMS
+        self.lowercase_paths = CRAWL_LOWERCASE_PATHS
+        self.visited_index = CRAWL_VISITED_INDEX
+        self.max_depth = CRAWL_MAX_DEPTH
+        self.max_pages = CRAWL_MAX_PAGES
+        self.prioritize_products = CRAWL_PRIORITIZE_PRODUCTS
+        self.product_prefix = CATEGORIES_URL
+        self.page_cache = {}
 
     def url_validator(self, url: str, domain: str, prefix: str) -> bool:
         """
@@ -35,6 +127,162 @@ class BSCrawlingWebService(BSCrawlingWebServiceProtocol):
         self.logger.debug(f"URL Validation - URL: {url}, Domain: {domain}, Prefix: {prefix}, Is Valid: {is_valid}")
         return is_valid
 
+    def fetch_links(self, url: str) -> list:
+        """
+        Fetch a page and extract the absolute URLs of all its links.
+
+        The links of every fetched page are cached until clear_page_cache is called, so
+        crawling again with a broader prefix only fetches the pages not seen before.
+
+        Args:
+            url (str): The URL of the page to fetch.
+
+        Returns:
+            list: The absolute URLs found in the page, or None if the page could not be fetched.
+        """
+        links = self.page_cache.get(url)
+        if links is not None:
+            self.logger.debug(f"Links of URL {url} taken from the page cache")
+            return links
+
+        try:
+            response = self.scheduler.request(url, lambda: self.http_client.get(url))
+            response.raise_for_status()
+            self.logger.debug(f"Fetched URL: {url} with status code: {response.status_code}")
+        except requests.RequestException as e:
+            self.logger.error(f"Error processing URL {url}: {e}")
+            return None
+
+        links = []
+        for href in extract_hrefs(response.content):
+            full_url = urljoin(self.start_url, href)
+            self.logger.debug(f"Extracted href: {href}, Full URL: {full_url}")
+            links.append(full_url)
+
+        self.page_cache[url] = links
+        return links
+
+    def clear_page_cache(self) -> None:
+        """
+        Forget the links of the pages fetched so far.
+        """
+        self.page_cache = {}
+
+    def _load_state(self) -> CrawlState:
+        """
+        Load the checkpoint of an interrupted crawl with the same start URL and prefix, or start a new crawl.
+
+        Returns:
+            CrawlState: The state to continue crawling from.
+        """
+        visited_index = create_visited_index(self.visited_index, CRAWL_BLOOM_CAPACITY, CRAWL_BLOOM_ERROR_RATE)
+        seen_index = create_visited_index(self.visited_index, CRAWL_BLOOM_CAPACITY, CRAWL_BLOOM_ERROR_RATE)
+        if self.frontier_store is None:
+            return CrawlState(self.start_url, self.prefix, visited_index=visited_index, seen_index=seen_index, key=self.url_key)
+
+        if self.resume:
+            state = self.frontier_store.load(self.start_url, self.prefix, visited_index, seen_index, self.url_key)
+            if state is not None:
+                print(f'Resuming crawl: {len(state.visited)} pages visited, {len(state.frontier)} pending.')
+                self.logger.info(f'Resuming crawl: {len(state.visited)} pages visited, {len(state.frontier)} pending.')
+                return state
+
+        self.frontier_store.clear()
+        return CrawlState(self.start_url, self.prefix, visited_index=visited_index, persistent=True,
+                          seen_index=seen_index, key=self.url_key)
+
+    def _checkpoint(self, state: CrawlState) -> None:
+        """
+        Save the crawl state if a frontier store is configured.
+        """
+        if self.frontier_store is not None:
+            self.frontier_store.save(state)
+            self.logger.debug(f'Checkpoint saved: {len(state.visited)} pages visited.')
+
+    def url_key(self, url: str) -> str:
+        """
+        Get the key a URL is deduplicated by: its canonical form, so the variants of the same URL are visited only once.
+        """
+        return canonicalize_url(url, self.ignored_query_params, self.lowercase_paths)
+
+    def _canonical_prefix(self) -> str:
+        """
+        Canonicalize the prefix like the URL keys, keeping its trailing slash so it only matches the URLs under it.
+        """
+        prefix = canonicalize_url(self.prefix, (), self.lowercase_paths)
+        return prefix + '/' if self.prefix.endswith('/') and not prefix.endswith('/') else prefix
+
+    def _valid_links(self, links: list, domain: str):
+        """
+        Yield the links found in a page that match the domain and prefix, with their keys.
+
+        The keys are compared against the domain and the canonical prefix, while the
+        links are kept as found, without their fragment, to be fetched and collected.
+
+        Yields:
+            tuple: The key and the URL of every valid link.
+        """
+        prefix = self._canonical_prefix()
+        for link in links:
+            url_key = self.url_key(link)
+            if self.url_validator(url_key, domain, prefix):
+                yield url_key, urldefrag(link).url
+
+    def _priority(self, url: str) -> int:
+        """
+        Get the fetch priority of a URL: 0 for likely product pages, 1 for listing and pagination pages.
+        """
+        if not self.prioritize_products:
+            return 0
+        # The pages under the original prefix are the products, paginated listings have a query string
+        is_product = url.startswith(self.product_prefix) and not urlparse(url).query
+        return 0 if is_product else 1
+
+    def _budget_spent(self, state: CrawlState) -> bool:
+        """
+        Check if the crawl already fetched CRAWL_MAX_PAGES pages.
+        """
+        return self.max_pages is not None and len(state.visited) >= self.max_pages
+
+    def _collect_links(self, state: CrawlState, links: list, domain: str, depth: int = 0) -> None:
+        """
+        Collect the valid links found in a page and add them to the frontier.
+
+        The links found in a page at the maximum depth are collected, but not fetched.
+        """
+        fetch = self.max_depth is None or depth < self.max_depth
+        for url_key, full_url in self._valid_links(links, domain):
+            # The URLs already visited or in the frontier are seen, so every URL is queued once
+            if state.add_url(full_url, depth + 1, self._priority(full_url), fetch, url_key):
+                self.logger.debug(f"Added URL: {full_url}")
+
+    def _log_budget(self, state: CrawlState) -> None:
+        """
+        Report that the crawl stopped because it fetched CRAWL_MAX_PAGES pages.
+        """
+        if self._budget_spent(state):
+            print(f'Page budget of {self.max_pages} pages reached, {len(state.frontier)} URLs left unfetched.')
+            self.logger.info(f'Page budget of {self.max_pages} pages reached, {len(state.frontier)} URLs left unfetched.')
+
+    def _log_progress(self, processed_count: int, state: CrawlState) -> None:
+        """
+        Report the progress every 500 pages and checkpoint every CRAWL_CHECKPOINT_INTERVAL pages.
+        """
+        if processed_count % 500 == 0:
+            print(f'-{processed_count} URLs processed.')
+            self.logger.info(f'{processed_count} URLs processed.')
+        if processed_count % self.checkpoint_interval == 0:
+            self._checkpoint(state)
+
+    def clear_checkpoint(self) -> None:
+        """
+        Delete the saved crawl state, so the next crawl starts from the beginning.
+        """
+        if self.frontier_store is not None:
+            self.frontier_store.clear()
+        if self.shard_queue is not None:
+            self.shard_queue.clear()
+
     def crawling_web(self) -> list:
         """
         Crawl web pages starting from the initial URL and collect all URLs that match the criteria.
@@ -45,47 +293,213 @@ class BSCrawlingWebService(BSCrawlingWebServiceProtocol):
         print(f'Getting URLs from {self.prefix}...\n')
         self.logger.info(f'Getting URLs from {self.prefix}...')
 
-        domain = urlparse(self.start_url).netloc
-        queue = deque([self.start_url])
-        visited = set()
-        urls = []
+        domain = urlparse(canonicalize_url(self.start_url)).netloc
+        state = self._load_state()
         processed_count = 0
 
-        while queue:
-            url = queue.popleft()
-            if url in visited:
-                continue
+        try:
+            while state.frontier and not state.finished and not self._budget_spent(state):
+                entry = state.next_entry()
+                if not state.mark_visited(entry):
+                    continue
 
-            visited.add(url)
-            processed_count += 1
-            try:
-                response = requests.get(url)
-                response.raise_for_status()
-                self.logger.debug(f"Fetched URL: {url} with status code: {response.status_code}")
-            except requests.RequestException as e:
-                self.logger.error(f"Error processing URL {url}: {e}")
-                continue
+                processed_count += 1
+                links = self.fetch_links(entry.url)
+                if links is not None:
+                    self._collect_links(state, links, domain, entry.depth)
+                state.complete(entry.url)
+
+                self._log_progress(processed_count, state)
+            self._log_budget(state)
+            state.finished = True
+        finally:
+            self._checkpoint(state)
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+        self.logger.info(f"Crawling finished. Total URLs collected: {len(state.urls)}")
+        return state.urls
 
-            for a in soup.find_all('a', href=True):
-                href = a.get('href')
-                full_url = urljoin(self.start_url, href)
-                self.logger.debug(f"Extracted href: {href}, Full URL: {full_url}")
-                if self.url_validator(full_url, domain, self.prefix) and full_url not in visited:
-                    queue.append(full_url)
-                    urls.append(full_url)
-                    self.logger.debug(f"Added URL: {full_url}")
+    def crawling_web_async(self, concurrency: int = CRAWL_CONCURRENCY) -> list:
+        """
+        Crawl web pages like crawling_web, but keeping several fetches in flight at once.
 
-            if processed_count % 500 == 0:
-                print(f'-{processed_count} URLs processed.')
-                self.logger.info(f'{processed_count} URLs processed.')
+        Args:
+            concurrency (int): The maximum number of pages fetched at the same time.
 
-        self.logger.info(f"Crawling finished. Total URLs collected: {len(urls)}")
+        Returns:
+            list: A list of collected URLs.
+        """
+        print(f'Getting URLs from {self.prefix} with {concurrency} concurrent fetches...\n')
+        self.logger.info(f'Getting URLs from {self.prefix} with {concurrency} concurrent fetches...')
+
+        state = self._load_state()
+        try:
+            asyncio.run(self._crawl_async(state, concurrency))
+            self._log_budget(state)
+            state.finished = True
+        finally:
+            self._checkpoint(state)
+
+        self.logger.info(f"Crawling finished. Total URLs collected: {len(state.urls)}")
+        return state.urls
+
+    async def _crawl_async(self, state: CrawlState, concurrency: int) -> None:
+        """
+        Run the concurrent crawl: a pool of workers shares the frontier and the visited set of the state.
+
+        Fetching and link extraction run in a thread pool so the event loop only
+        schedules work and updates the shared state.
+
+        Args:
+            state (CrawlState): The state to continue crawling from.
+            concurrency (int): The number of workers and threads.
+        """
+        domain = urlparse(canonicalize_url(self.start_url)).netloc
+        loop = asyncio.get_running_loop()
+        frontier_changed = asyncio.Condition()
+        processed_count = 0
+
+        async def worker():
+            nonlocal processed_count
+            while True:
+                async with frontier_changed:
+                    # Wait while the frontier is empty but pages in flight may still add URLs to it.
+                    await frontier_changed.wait_for(lambda: state.frontier or not state.in_progress)
+                    if not state.frontier or self._budget_spent(state):
+                        frontier_changed.notify_all()
+                        return
+                    entry = state.next_entry()
+                    if not state.mark_visited(entry):
+                        continue
+
+                links = await loop.run_in_executor(executor, self.fetch_links, entry.url)
+
+                async with frontier_changed:
+                    if links is not None:
+                        self._collect_links(state, links, domain, entry.depth)
+                    state.complete(entry.url)
+                    processed_count += 1
+                    self._log_progress(processed_count, state)
+                    frontier_changed.notify_all()
+
+        if state.finished:
+            return
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    def crawling_web_sharded(self, shards: int = CRAWL_SHARDS, shard_ids: list = None) -> list:
+        """
+        Crawl web pages like crawling_web, but splitting the URLs between several worker processes.
+
+        Every URL is fetched by the worker of the shard its hash belongs to, and the
+        workers share the frontier through the shard queue. Other machines with access
+        to the queue database can run the remaining shards of the same crawl.
+
+        The workers fetch every URL under the prefix in the order the queue hands them
+        out: CRAWL_MAX_PAGES, CRAWL_MAX_DEPTH and CRAWL_PRIORITIZE_PRODUCTS are not applied.
+
+        Args:
+            shards (int): The total number of shards of the crawl.
+            shard_ids (list): The shards run by this machine. Defaults to all of them.
+
+        Returns:
+            list: A list of collected URLs.
+        """
+        shard_ids = list(range(shards)) if shard_ids is None else list(shard_ids)
+        if self.max_pages is not None or self.max_depth is not None:
+            message = (f'CRAWL_MAX_PAGES ({self.max_pages}) and CRAWL_MAX_DEPTH ({self.max_depth}) are not applied '
+                       f'in sharded mode, every URL under the prefix is fetched.')
+            print(message)
+            self.logger.warning(message)
+        if self.prioritize_products:
+            self.logger.info('The product pages are not fetched first in sharded mode.')
+        print(f'Getting URLs from {self.prefix} with {len(shard_ids)} of {shards} shards...\n')
+        self.logger.info(f'Getting URLs from {self.prefix} with shards {shard_ids} of {shards}...')
+
+        if self.shard_queue is None:
+            self.shard_queue = CrawlShardQueue()
+        if self.shard_queue.start(self.start_url, self.prefix, shards, self.resume, self.url_key(self.start_url)):
+            print('Joining the sharded crawl already in the queue.')
+            self.logger.info('Joining the sharded crawl already in the queue.')
+
+        with ProcessPoolExecutor(max_workers=len(shard_ids)) as executor:
+            processed = sum(executor.map(run_crawl_shard, repeat(self.shard_queue.db_path), shard_ids, repeat(len(shard_ids))))
+
+        # Another machine may still be fetching its shards
+        while self.shard_queue.has_pending():
+            time.sleep(SHARD_IDLE_WAIT)
+
+        urls = self.shard_queue.collected_urls()
+        self.logger.info(f"Crawling finished. {processed} pages fetched by this machine, total URLs collected: {len(urls)}")
         return urls
 
+    def crawl_shard(self, queue: CrawlShardQueueProtocol, shard: int) -> int:
+        """
+        Fetch the URLs of a shard until no shard has URLs pending.
+
+        Args:
+            queue (CrawlShardQueueProtocol): The queue shared by the workers.
+            shard (int): The shard fetched by this worker.
+
+        Returns:
+            int: The number of pages fetched.
+        """
+        crawl = queue.crawl()
+        self.start_url, self.prefix, shards = crawl['start_url'], crawl['prefix'], crawl['shards']
+        domain = urlparse(canonicalize_url(self.start_url)).netloc
+        # The URLs claimed by a previous run of this shard were not completed
+        queue.release(shard)
+        processed_count = 0
+
+        while True:
+            urls = queue.claim(shard, CRAWL_SHARD_BATCH)
+            if not urls:
+                if not queue.has_pending():
+                    break
+                # The other shards may still enqueue URLs for this one
+                time.sleep(SHARD_IDLE_WAIT)
+                continue
+
+            for url_key, url in urls:
+                links = self.fetch_links(url)
+                queue.complete(url_key, list(self._valid_links(links or [], domain)), shards)
+                processed_count += 1
+                if processed_count % 500 == 0:
+                    print(f'-Shard {shard}: {processed_count} URLs processed.')
+                    self.logger.info(f'Shard {shard}: {processed_count} URLs processed.')
+
+        self.logger.info(f"Shard {shard} finished, {processed_count} pages fetched.")
+        return processed_count
+
     def update_prefix(self):
         """
         Update the prefix by removing the last segment.
         """
-        self.prefix = '/'.join(self.prefix.rstrip('/').split('/')[:-1]) + '/'
\ No newline at end of file
+        self.prefix = '/'.join(self.prefix.rstrip('/').split('/')[:-1]) + '/'
+
+    def restore_prefix(self, sharded: bool = False) -> bool:
+        """
+        Continue from the prefix of the interrupted crawl of the start URL, when it is a fallback of the current prefix.
+
+        A crawl interrupted after update_prefix is saved with the broader prefix, so the next
+        run resumes it instead of crawling the original prefix again and replacing its state.
+
+        Args:
+            sharded (bool): Whether the crawl is resumed from the shard queue instead of the frontier store.
+
+        Returns:
+            bool: True if the prefix was restored.
+        """
+        if not self.resume:
+            return False
+        if sharded:
+            crawl = self.shard_queue.crawl() if self.shard_queue is not None else None
+            prefix = crawl['prefix'] if crawl is not None and crawl['start_url'] == self.start_url else None
+        else:
+            prefix = self.frontier_store.saved_prefix(self.start_url) if self.frontier_store is not None else None
+        # Only the fallbacks of the current prefix are restored, not the crawls of another configuration
+        if prefix is None or prefix == self.prefix or not self.prefix.startswith(prefix):
+            return False
+        print(f'Resuming the crawl of the fallback prefix {prefix}.')
+        self.logger.info(f'Resuming the crawl of the fallback prefix {prefix}.')
+        self.prefix = prefix
+        return True
@@ -1,119 +1,346 @@
-import requests
 from bs4 import BeautifulSoup
+import re
 import json
-from src.domain.abstractions import BSScrapingServiceProtocol
+from html.parser import HTMLParser
+from src.config.config import SCRAPE_EXTRACTION
+from src.domain.abstractions import BSScrapingServiceProtocol, PolitenessSchedulerProtocol, HttpClientProtocol
+from src.domain.scraping import ScrapeResult
+from src.infrastructure.services.politeness_scheduler import PolitenessScheduler
+from src.infrastructure.services.http_client import HttpClient
+
+PRODUCT_JSON_PATTERN = re.compile(
+    rb'<script[^>]*data-section-type=["\']static-product["\'][^>]*>(.*?)</script>', re.DOTALL | re.IGNORECASE
+)
+
+# The endpoint has no page to run the selectors on, so its missing fields are left empty as the selectors leave them
+ENDPOINT_DEFAULTS = {"title": "", "price": "", "brand": "", "description": "", "images": []}
+
+class _TextExtractor(HTMLParser):
+    """
+    Collect the text of an HTML fragment, like the .text of a BeautifulSoup element.
+    """
 
-class BSScrapingService(BSScrapingServiceProtocol):
     def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+
+    def handle_data(self, data):
+        self.parts.append(data)
+
+def html_text(html: str) -> str:
+    """
+    Get the text of an HTML fragment.
+
+    Args:
+        html (str): The HTML fragment.
+
+    Returns:
+        str: The text, without the tags.
+    """
+    extractor = _TextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    return ''.join(extractor.parts)
+
+def extract_product_json(content: bytes):
+    """
+    Find and decode the product JSON of a product page, without parsing the HTML.
+
+    Args:
+        content (bytes): The HTML of the product page.
+
+    Returns:
+        dict: The decoded JSON of the static-product script, or None if the page does not have it.
+    """
+    match = PRODUCT_JSON_PATTERN.search(content)
+    if match is None:
+        return None
+    try:
+        return json.loads(match.group(1))
+    except ValueError:
+        return None
+
+def product_json_fields(product: dict) -> dict:
+    """
+    Take the scraped fields from the product JSON.
+
+    Args:
+        product (dict): The 'product' object of the product JSON.
+
+    Returns:
+        dict: The title, price, brand, description, attribute and images of the product,
+        None for the fields the JSON does not have.
+    """
+    options = product.get('options') or [None]
+    # The product page JSON lists the option names, the /products/<handle>.js endpoint lists option objects
+    attribute = options[0].get('name') if isinstance(options[0], dict) else options[0]
+    images = [image if isinstance(image, str) else image.get('src') for image in product.get('images') or []]
+    # The price shown on the page is the compare-at price, in cents in the JSON
+    compare_at_price = product.get('compare_at_price')
+    return {
+        "title": product['title'].strip() if product.get('title') else None,
+        "price": f"{compare_at_price / 100:.2f}" if compare_at_price else None,
+        "brand": product.get('vendor') or None,
+        "description": html_text(product['description']).strip() if product.get('description') else None,
+        "attribute": attribute,
+        "images": [{'src': src} for src in images if src] or None
+    }
+
+class BSScrapingService(BSScrapingServiceProtocol):
+    def __init__(self, scheduler: PolitenessSchedulerProtocol = None, http_client: HttpClientProtocol = None):
+        self.scheduler = scheduler or PolitenessScheduler()
+        self.http_client = http_client or HttpClient()
+        self.extraction = SCRAPE_EXTRACTION
         self.HEADERS = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
 
-    def scrape(self, url):
-        self.response = requests.get(url, headers=self.HEADERS)
-        self.soup = BeautifulSoup(self.response.content, 'html.parser')
-        
-        tags, product_data = self.scrape_data_tags()
-        
-        data = {
-            "title": self.scrape_title(),
-            "price": self.scrape_price(),
-            "brand": self.scrape_brand(),
-            "description": self.scrape_description(),
+    def fetch_product(self, url, validators=None) -> ScrapeResult:
+        """
+        Fetch a product page without parsing it.
+
+        Args:
+            url (str): The URL of the product page.
+            validators (dict): The 'etag' and 'last_modified' of a previous response. When given,
+                the request is conditional and the result is marked as not modified if the page did not change.
+
+        Returns:
+            ScrapeResult: The raw HTML of the page in 'content' and the validators of the response.
+
+        Raises:
+            requests.exceptions.HTTPError: If the response is a 4xx or 5xx error.
+        """
+        headers = dict(self.HEADERS)
+        if validators:
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+
+        if self.extraction == 'endpoint':
+            # The store serves the product JSON alone, much lighter than the product page
+            url = url.rstrip('/') + '.js'
+        response = self.scheduler.request(url, lambda: self.http_client.get(url, headers=headers))
+        etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+        if response.status_code == 304:
+            return ScrapeResult(url, etag=etag, last_modified=last_modified, not_modified=True)
+        # An error page (or a host still throttling after the retries) is not a product page
+        response.raise_for_status()
+        return ScrapeResult(url, etag=etag, last_modified=last_modified, content=response.content,
+                            status_code=response.status_code)
+
+    @staticmethod
+    def parse_product(content: bytes, extraction: str = SCRAPE_EXTRACTION) -> dict:
+        """
+        Parse the product data from the HTML of a product page.
+
+        By default the data is taken from the product JSON of the page, found without
+        parsing the HTML; the page is only parsed, and the selectors run, for the fields
+        the JSON does not have or if the page has no product JSON. The JSON of the product
+        endpoint has no page to fall back to: a product not on sale takes its regular price
+        and the other missing fields are left empty.
+
+        It only depends on its arguments, so it can run in a process pool; the HTML is
+        handed over as the bytes received, without decoding it first.
+
+        Args:
+            content (bytes): The HTML of the product page, or the JSON of the product endpoint.
+            extraction (str): 'json' to read the product JSON first, 'endpoint' if the content is
+                the JSON of /products/<handle>.js, 'selectors' to parse the page with the selectors only.
+
+        Returns:
+            dict: The scraped product data.
+        """
+        if extraction == 'endpoint':
+            product_data = {"product": json.loads(content)}
+        elif extraction == 'json':
+            product_data = extract_product_json(content)
+        else:
+            product_data = None
+        if product_data is None:
+            return BSScrapingService.parse_product_page(content)
+
+        data = product_json_fields(product_data["product"])
+        missing = [field for field, value in data.items() if value is None]
+        if missing and extraction == 'endpoint':
+            # The products not on sale have no compare-at price, their price is the regular one
+            price = product_data["product"].get('price')
+            if data["price"] is None and price:
+                data["price"] = f"{price / 100:.2f}"
+            if data["attribute"] is None:
+                raise ValueError("Attribute name not found in the product JSON.")
+            for field in missing:
+                if data[field] is None:
+                    data[field] = ENDPOINT_DEFAULTS[field]
+        elif missing:
+            soup = BeautifulSoup(content, 'html.parser')
+            for field in missing:
+                data[field] = getattr(BSScrapingService, f'scrape_{field}')(soup)
+
+        data["tags"] = product_data["product"]["tags"]
+        data["product_data"] = product_data
+        return data
+
+    @staticmethod
+    def parse_product_page(content: bytes) -> dict:
+        """
+        Parse the product data from the HTML of a product page with the selectors.
+
+        Args:
+            content (bytes): The HTML of the product page.
+
+        Returns:
+            dict: The scraped product data.
+        """
+        soup = BeautifulSoup(content, 'html.parser')
+
+        tags, product_data = BSScrapingService.scrape_data_tags(soup)
+
+        return {
+            "title": BSScrapingService.scrape_title(soup),
+            "price": BSScrapingService.scrape_price(soup),
+            "brand": BSScrapingService.scrape_brand(soup),
+            "description": BSScrapingService.scrape_description(soup),
             "tags": tags,
             "product_data": product_data,
-            "attribute": self.scrape_attribute(),
-            "images": self.scrape_images()
+            "attribute": BSScrapingService.scrape_attribute(soup),
+            "images": BSScrapingService.scrape_images(soup)
         }
-        
-        return data
 
-    def scrape_title(self):
+    def scrape_product(self, url, validators=None) -> ScrapeResult:
+        """
+        Scrape the product data from a product page.
+
+        The service keeps no state between calls, so it can scrape several pages at once from different threads.
+
+        Args:
+            url (str): The URL of the product page.
+            validators (dict): The 'etag' and 'last_modified' of a previous response. When given,
+                the request is conditional and the result is marked as not modified if the page did not change.
+
+        Returns:
+            ScrapeResult: The scraped product data and the validators of the response.
+        """
+        result = self.fetch_product(url, validators)
+        if result.not_modified:
+            return result
+        return result._replace(data=self.parse_product(result.content, self.extraction), content=None)
+
+    @staticmethod
+    def scrape_title(soup):
         """
         Scrape the product title from the web page.
 
+        Args:
+            soup (BeautifulSoup): The parsed product page.
+
         Returns:
             str: The product title.
         """
         title_selector = '#shopify-section-static-product > section > article > div.product-main > div.product-details > h1'
-        title_element = self.soup.select_one(title_selector)
+        title_element = soup.select_one(title_selector)
         if title_element:
             return title_element.text.strip()
         return ""
 
-    def scrape_price(self):
+    @staticmethod
+    def scrape_price(soup):
         """
         Scrape the product price from the web page.
 
+        Args:
+            soup (BeautifulSoup): The parsed product page.
+
         Returns:
             str: The product price without currency symbols or commas.
         """
         simple_price_selector = 'div.full_block_nb.medic_price.price--compare-at > div.money'
-        price_element = self.soup.select_one(simple_price_selector)
+        price_element = soup.select_one(simple_price_selector)
         if price_element:
             return price_element.text.strip().replace('$', '').replace(',', '')
         return ""
     
-    def scrape_brand(self):
+    @staticmethod
+    def scrape_brand(soup):
         """
         Scrape the product brand from the web page.
 
+        Args:
+            soup (BeautifulSoup): The parsed product page.
+
         Returns:
             str: The product brand.
         """
         brand_selector = '#shopify-section-static-product > section > article > div.product-main > div.product-details > div.product-vendor > a'
-        brand_element = self.soup.select_one(brand_selector)
+        brand_element = soup.select_one(brand_selector)
         if brand_element:
             return brand_element['title']
         return ""
     
-    def scrape_description(self):
+    @staticmethod
+    def scrape_description(soup):
         """
         Scrape the product description from the web page.
 
+        Args:
+            soup (BeautifulSoup): The parsed product page.
+
         Returns:
             str: The product description.
         """
         description_selector = '#shopify-section-static-product > section > article > div.product-description.rte'
-        description_element = self.soup.select_one(description_selector)
+        description_element = soup.select_one(description_selector)
         if description_element:
             return description_element.text.strip()
         return ""
     
-    def scrape_data_tags(self):
+    @staticmethod
+    def scrape_data_tags(soup):
         """
         Scrape the product tags and data from the web page.
 
+        Args:
+            soup (BeautifulSoup): The parsed product page.
+
         Returns:
             tuple: A tuple containing the product tags (list) and product data (dict).
         """
-        script_tag = self.soup.find("script", {"data-section-type": "static-product"})
+        script_tag = soup.find("script", {"data-section-type": "static-product"})
         product_data = json.loads(script_tag.string)
         tags = product_data["product"]["tags"]
         return tags, product_data
     
-    def scrape_attribute(self):
+    @staticmethod
+    def scrape_attribute(soup):
         """
         Scrape the product attribute name from the web page.
 
+        Args:
+            soup (BeautifulSoup): The parsed product page.
+
         Returns:
             str: The product attribute name.
 
         Raises:
             ValueError: If the attribute name cannot be found.
         """
-        label_tag = self.soup.find("label", {"class": "form-field-title"})
+        label_tag = soup.find("label", {"class": "form-field-title"})
         attribute_name = label_tag.text.strip() if label_tag else None
         if attribute_name is None:
             raise ValueError("No se pudo encontrar el nombre del atributo dinámicamente en la página.")
         return attribute_name
     
-    def scrape_images(self):
+    @staticmethod
+    def scrape_images(soup):
         """
         Scrape the product images from the web page.
 
+        Args:
+            soup (BeautifulSoup): The parsed product page.
+
         Returns:
-            list: A list of image elements.
+            list: The attributes ('src', ...) of the image elements, as dicts.
         """
-        imgs = self.soup.find_all('img', {'data-rimg': 'lazy'})
-        return imgs
\ No newline at end of file
+        imgs = soup.find_all('img', {'data-rimg': 'lazy'})
+        # Plain dicts, unlike the elements, are cheap to send back from the parsing processes
+        return [dict(img.attrs) for img in imgs]
\ No newline at end of file
@@ -0,0 +1,135 @@
+import sqlite3
+from src.config.config import CRAWL_STATE_DB
+from src.common.utils import files_output_path
+from src.domain.abstractions import CrawlFrontierStoreProtocol
+from src.domain.crawling import CrawlState
+
+class CrawlFrontierStore(CrawlFrontierStoreProtocol):
+    """
+    A SQLite store that checkpoints the state of a crawl so it can be resumed after a failure.
+
+    Visited and collected URLs are append-only, so each checkpoint only writes the
+    URLs added since the previous one; the frontier is rewritten on every checkpoint.
+    """
+
+    def __init__(self, db_path: str = None):
+        """
+        Initialize the CrawlFrontierStore and create its tables if needed.
+
+        Args:
+            db_path (str): Path of the SQLite database. Defaults to CRAWL_STATE_DB in files/state.
+        """
+        self.db_path = db_path or files_output_path('files\\state', CRAWL_STATE_DB)
+        connection = self._connect()
+        try:
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS crawl_meta (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE IF NOT EXISTS frontier (position INTEGER PRIMARY KEY, url TEXT, depth INTEGER DEFAULT 0, priority INTEGER DEFAULT 0);
+                CREATE TABLE IF NOT EXISTS visited (url TEXT PRIMARY KEY);
+                CREATE TABLE IF NOT EXISTS collected (position INTEGER PRIMARY KEY, url TEXT);
+            """)
+            # Stores created before the priority frontier only saved the URL of the frontier entries
+            columns = [row[1] for row in connection.execute('PRAGMA table_info(frontier)')]
+            for column in ('depth', 'priority'):
+                if column not in columns:
+                    connection.execute(f'ALTER TABLE frontier ADD COLUMN {column} INTEGER DEFAULT 0')
+            connection.commit()
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+    def load(self, start_url: str, prefix: str, visited_index=None, seen_index=None, key=None) -> CrawlState:
+        """
+        Load the saved crawl state if it belongs to the same start URL and prefix.
+
+        Args:
+            start_url (str): The URL where the crawl starts.
+            prefix (str): The prefix the collected URLs must have.
+            visited_index (FingerprintIndex | BloomFilterIndex): Empty index to load the visited URLs into.
+            seen_index (FingerprintIndex | BloomFilterIndex): Empty index to load the URLs seen so far into.
+            key (Callable[[str], str]): Function giving the key URLs are deduplicated by.
+
+        Returns:
+            CrawlState: The saved state, or None if there is no state saved for this crawl.
+        """
+        connection = self._connect()
+        try:
+            meta = dict(connection.execute('SELECT key, value FROM crawl_meta'))
+            if meta.get('start_url') != start_url or meta.get('prefix') != prefix:
+                return None
+            # The visited URLs are streamed into the index, so they are never all in memory as strings
+            return CrawlState(
+                start_url, prefix,
+                frontier=connection.execute('SELECT url, depth, priority FROM frontier ORDER BY position'),
+                visited=(url for url, in connection.execute('SELECT url FROM visited')),
+                urls=(url for url, in connection.execute('SELECT url FROM collected ORDER BY position')),
+                finished=meta.get('finished') == '1',
+                visited_index=visited_index,
+                persistent=True,
+                seen_index=seen_index,
+                key=key
+            )
+        finally:
+            connection.close()
+
+    def saved_prefix(self, start_url: str) -> str:
+        """
+        Get the prefix of the crawl saved for a start URL.
+
+        Args:
+            start_url (str): The URL where the crawl starts.
+
+        Returns:
+            str: The prefix of the saved crawl, or None if there is no crawl saved for the start URL.
+        """
+        connection = self._connect()
+        try:
+            meta = dict(connection.execute('SELECT key, value FROM crawl_meta'))
+        finally:
+            connection.close()
+        return meta.get('prefix') if meta.get('start_url') == start_url else None
+
+    def save(self, state: CrawlState) -> None:
+        """
+        Checkpoint the crawl state.
+
+        Args:
+            state (CrawlState): The state to save.
+        """
+        connection = self._connect()
+        try:
+            with connection:
+                meta = dict(connection.execute('SELECT key, value FROM crawl_meta'))
+                if meta.get('start_url') != state.start_url or meta.get('prefix') != state.prefix:
+                    # The state of a different crawl is replaced
+                    self._delete_all(connection)
+                connection.executemany('INSERT OR REPLACE INTO crawl_meta VALUES (?, ?)', [
+                    ('start_url', state.start_url),
+                    ('prefix', state.prefix),
+                    ('finished', '1' if state.finished else '0')
+                ])
+                connection.execute('DELETE FROM frontier')
+                connection.executemany('INSERT INTO frontier (url, depth, priority) VALUES (?, ?, ?)', state.pending_frontier())
+                connection.executemany('INSERT OR IGNORE INTO visited VALUES (?)', ((url,) for url in state.unsaved_visited()))
+                connection.executemany('INSERT INTO collected (url) VALUES (?)', ((url,) for url in state.unsaved_urls()))
+        finally:
+            connection.close()
+        state.mark_saved()
+
+    def clear(self) -> None:
+        """
+        Delete the saved crawl state.
+        """
+        connection = self._connect()
+        try:
+            with connection:
+                self._delete_all(connection)
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _delete_all(connection: sqlite3.Connection) -> None:
+        for table in ('crawl_meta', 'frontier', 'visited', 'collected'):
+            connection.execute(f'DELETE FROM {table}')
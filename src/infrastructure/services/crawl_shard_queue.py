@@ -0,0 +1,257 @@
+import time
+import sqlite3
+from src.config.config import CRAWL_SHARD_DB, CRAWL_SHARD_LEASE
+from src.common.utils import files_output_path
+from src.common.visited_index import url_fingerprint
+from src.domain.abstractions import CrawlShardQueueProtocol
+
+PENDING, CLAIMED, DONE = 0, 1, 2
+
+class CrawlShardQueue(CrawlShardQueueProtocol):
+    """
+    A SQLite queue shared by the workers of a sharded crawl.
+
+    Every URL belongs to the shard given by the fingerprint of its key (e.g. its
+    canonical form), and only the worker of that shard fetches it. The key is the
+    primary key of the queue, so a URL found by several workers, or spelled in several
+    ways, is enqueued once; the URL is kept as found to be fetched and collected.
+
+    The workers hold a lease on their shard, renewed every time they claim or complete
+    URLs. When a worker stops renewing it (the process or its machine died), its lease
+    expires and the other workers take over the URLs of its shard, including the ones
+    it claimed, so the crawl always finishes.
+
+    The workers can run in several processes of the same machine, or in several
+    machines if the database is on shared storage whose file locks work (e.g. NFSv4
+    with locking). The database keeps the default rollback journal, as the WAL journal
+    does not work on network filesystems, and the leases rely on the clocks of the
+    machines agreeing within a fraction of the lease.
+    """
+
+    def __init__(self, db_path: str = None, lease: float = CRAWL_SHARD_LEASE):
+        """
+        Initialize the CrawlShardQueue and create its tables if needed.
+
+        Args:
+            db_path (str): Path of the SQLite database. Defaults to CRAWL_SHARD_DB in files/state.
+            lease (float): Seconds a worker keeps its shard without renewing its lease.
+        """
+        self.db_path = db_path or files_output_path('files\\state', CRAWL_SHARD_DB)
+        self.lease = lease
+        connection = self._connect()
+        try:
+            columns = [column for _, column, *_ in connection.execute('PRAGMA table_info(urls)')]
+            if columns and 'fetch_url' not in columns:
+                # The queues of the previous schema only kept the canonical URLs, their crawl is restarted
+                connection.executescript('DROP TABLE urls; DROP TABLE collected; DELETE FROM shard_meta;')
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS shard_meta (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, shard INTEGER, status INTEGER, fetch_url TEXT);
+                CREATE INDEX IF NOT EXISTS urls_shard_status ON urls (shard, status);
+                CREATE TABLE IF NOT EXISTS collected (url TEXT PRIMARY KEY, fetch_url TEXT);
+                CREATE TABLE IF NOT EXISTS leases (shard INTEGER PRIMARY KEY, renewed REAL);
+            """)
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # The workers write to the queue at the same time, so they wait for the lock instead of failing
+        return sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+
+    @staticmethod
+    def shard_of(url_key: str, shards: int) -> int:
+        """
+        Get the shard a URL belongs to.
+
+        Args:
+            url_key (str): The key of the URL.
+            shards (int): The number of shards of the crawl.
+
+        Returns:
+            int: The shard of the URL, from 0 to shards - 1.
+        """
+        return url_fingerprint(url_key) % shards
+
+    def start(self, start_url: str, prefix: str, shards: int, resume: bool = True, start_key: str = None) -> bool:
+        """
+        Start a crawl, or join the crawl already in the queue if it has the same start URL, prefix and shards.
+
+        Args:
+            start_url (str): The URL where the crawl starts.
+            prefix (str): The prefix the collected URLs must have.
+            shards (int): The number of shards of the crawl.
+            resume (bool): Whether a crawl with the same parameters is joined instead of restarted.
+            start_key (str): The key of the start URL. Defaults to the start URL itself.
+
+        Returns:
+            bool: True if an existing crawl was joined, False if a new one was started.
+        """
+        meta = {'start_url': start_url, 'prefix': prefix, 'shards': str(shards)}
+        connection = self._connect()
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            if resume and dict(connection.execute('SELECT key, value FROM shard_meta')) == meta:
+                connection.execute('COMMIT')
+                return True
+            self._delete_all(connection)
+            connection.executemany('INSERT INTO shard_meta VALUES (?, ?)', meta.items())
+            start_key = start_url if start_key is None else start_key
+            connection.execute('INSERT INTO urls VALUES (?, ?, ?, ?)', (start_key, self.shard_of(start_key, shards), PENDING, start_url))
+            # Every shard gets a lease, so the shards no worker ever joins are taken over when it expires
+            now = time.time()
+            connection.executemany('INSERT INTO leases VALUES (?, ?)', ((shard, now) for shard in range(shards)))
+            connection.execute('COMMIT')
+            return False
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        finally:
+            connection.close()
+
+    def crawl(self) -> dict:
+        """
+        Get the parameters of the crawl in the queue.
+
+        Returns:
+            dict: The 'start_url', 'prefix' and 'shards' of the crawl, or None if the queue is empty.
+        """
+        connection = self._connect()
+        try:
+            meta = dict(connection.execute('SELECT key, value FROM shard_meta'))
+        finally:
+            connection.close()
+        if not meta:
+            return None
+        return {'start_url': meta['start_url'], 'prefix': meta['prefix'], 'shards': int(meta['shards'])}
+
+    def release(self, shard: int) -> None:
+        """
+        Put back in the queue the URLs of a shard claimed by a worker that did not complete them.
+
+        Args:
+            shard (int): The shard whose worker is (re)starting.
+        """
+        connection = self._connect()
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            self._renew(connection, shard)
+            connection.execute('UPDATE urls SET status = ? WHERE shard = ? AND status = ?', (PENDING, shard, CLAIMED))
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        finally:
+            connection.close()
+
+    def claim(self, shard: int, limit: int) -> list:
+        """
+        Claim the next pending URLs of a shard, renewing the lease of the worker.
+
+        When the shard has no pending URL, the worker takes over the URLs left, pending
+        or claimed, by the workers whose lease expired; they belong to its shard from then on.
+
+        Args:
+            shard (int): The shard of the worker.
+            limit (int): The maximum number of URLs to claim.
+
+        Returns:
+            list: The key and the URL of the claimed URLs, empty if the shard has no pending URL and no lease expired.
+        """
+        connection = self._connect()
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            now = self._renew(connection, shard)
+            urls = connection.execute(
+                'SELECT url, fetch_url FROM urls WHERE shard = ? AND status = ? LIMIT ?', (shard, PENDING, limit)).fetchall()
+            if not urls:
+                urls = connection.execute(
+                    'SELECT url, fetch_url FROM urls WHERE status != ? AND shard IN (SELECT shard FROM leases WHERE renewed < ?) LIMIT ?',
+                    (DONE, now - self.lease, limit)).fetchall()
+            connection.executemany('UPDATE urls SET shard = ?, status = ? WHERE url = ?', ((shard, CLAIMED, url_key) for url_key, _ in urls))
+            connection.execute('COMMIT')
+            return urls
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        finally:
+            connection.close()
+
+    def complete(self, url_key: str, links: list, shards: int) -> None:
+        """
+        Mark a URL as fetched and enqueue the links collected from it, renewing the lease of its worker.
+
+        Both happen in the same transaction, so the other workers never see the queue
+        empty while the links of a fetched page are not enqueued yet.
+
+        Args:
+            url_key (str): The key of the fetched URL.
+            links (list): The key and the URL of the valid links found in the page.
+            shards (int): The number of shards of the crawl.
+        """
+        connection = self._connect()
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.executemany('INSERT OR IGNORE INTO urls VALUES (?, ?, ?, ?)',
+                                   ((link_key, self.shard_of(link_key, shards), PENDING, link) for link_key, link in links))
+            connection.executemany('INSERT OR IGNORE INTO collected VALUES (?, ?)', links)
+            connection.execute('UPDATE urls SET status = ? WHERE url = ?', (DONE, url_key))
+            connection.execute('UPDATE leases SET renewed = ? WHERE shard = (SELECT shard FROM urls WHERE url = ?)',
+                               (time.time(), url_key))
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        finally:
+            connection.close()
+
+    def has_pending(self) -> bool:
+        """
+        Check if any shard still has URLs to fetch or being fetched.
+        """
+        connection = self._connect()
+        try:
+            return connection.execute('SELECT 1 FROM urls WHERE status != ? LIMIT 1', (DONE,)).fetchone() is not None
+        finally:
+            connection.close()
+
+    def collected_urls(self) -> list:
+        """
+        Get the URLs collected by all the workers.
+
+        Returns:
+            list: The collected URLs, as found.
+        """
+        connection = self._connect()
+        try:
+            return [url for url, in connection.execute('SELECT fetch_url FROM collected ORDER BY rowid')]
+        finally:
+            connection.close()
+
+    def clear(self) -> None:
+        """
+        Delete the crawl in the queue.
+        """
+        connection = self._connect()
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            self._delete_all(connection)
+            connection.execute('COMMIT')
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _renew(connection: sqlite3.Connection, shard: int) -> float:
+        """
+        Renew the lease of the worker of a shard.
+
+        Returns:
+            float: The time of the renewal.
+        """
+        now = time.time()
+        connection.execute('INSERT OR REPLACE INTO leases VALUES (?, ?)', (shard, now))
+        return now
+
+    @staticmethod
+    def _delete_all(connection: sqlite3.Connection) -> None:
+        for table in ('shard_meta', 'urls', 'collected', 'leases'):
+            connection.execute(f'DELETE FROM {table}')
@@ -0,0 +1,212 @@
+import time
+import socket
+import threading
+import importlib.util
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+from urllib3.util.timeout import _DEFAULT_TIMEOUT
+from src.config.config import (HTTP_TIMEOUT, HTTP_POOL_HOSTS, HTTP_POOL_MAXSIZE, HTTP_HOST_POOL_SIZES, HTTP_DNS_CACHE_TTL,
+                               HTTP_USER_AGENT)
+from src.domain.abstractions import HttpClientProtocol
+
+# urllib3 decodes brotli responses only when one of these packages is installed
+BROTLI_AVAILABLE = any(importlib.util.find_spec(name) is not None for name in ('brotli', 'brotlicffi'))
+
+class DNSCache:
+    """
+    A cache of the DNS resolutions of a client, so every new connection to a host
+    does not pay for a lookup again.
+
+    It keeps every address a host resolves to and connects to them in turn, like
+    urllib3 does; TLS still verifies the certificate against the host name.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._addresses = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, host: str, port: int) -> list:
+        """
+        Get the addresses of a host, as returned by socket.getaddrinfo, resolving it only
+        if it is not cached or the cache expired.
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._addresses.get((host, port))
+            if cached and cached[1] > now:
+                return cached[0]
+        addresses = socket.getaddrinfo(host, port, allowed_gai_family(), socket.SOCK_STREAM)
+        with self._lock:
+            self._addresses[(host, port)] = (addresses, now + self.ttl)
+        return addresses
+
+    def forget(self, host: str, port: int) -> None:
+        """
+        Drop the cached addresses of a host, so the next connection resolves it again.
+        """
+        with self._lock:
+            self._addresses.pop((host, port), None)
+
+    def create_connection(self, address: tuple, timeout=_DEFAULT_TIMEOUT, source_address: tuple = None,
+                          socket_options: list = None) -> socket.socket:
+        """
+        Open a socket to the first cached address of a host that accepts the connection.
+
+        Args:
+            address (tuple): The (host, port) to connect to.
+            timeout (float): Timeout of the socket.
+            source_address (tuple): The (host, port) the socket binds to, if any.
+            socket_options (list): Options set on the socket before connecting.
+
+        Returns:
+            socket.socket: The connected socket.
+
+        Raises:
+            OSError: If no address of the host accepts the connection.
+        """
+        host, port = address
+        if host.startswith('['):
+            host = host.strip('[]')
+        error = None
+        for family, socket_type, proto, _, socket_address in self.resolve(host, port):
+            sock = None
+            try:
+                sock = socket.socket(family, socket_type, proto)
+                for option in socket_options or []:
+                    sock.setsockopt(*option)
+                if timeout is not _DEFAULT_TIMEOUT:
+                    sock.settimeout(timeout)
+                if source_address:
+                    sock.bind(source_address)
+                sock.connect(socket_address)
+                return sock
+            except OSError as exception:
+                error = exception
+                if sock is not None:
+                    sock.close()
+        # None of the addresses answered, they may have changed
+        self.forget(host, port)
+        raise error if error is not None else OSError(f'{host} did not resolve to any address')
+
+class _CachedDNSConnection:
+    """
+    Open the sockets of a urllib3 connection through the DNS cache of its client.
+    """
+    dns_cache: DNSCache = None
+
+    def _new_conn(self) -> socket.socket:
+        try:
+            return self.dns_cache.create_connection((self._dns_host, self.port), self.timeout,
+                                                    source_address=self.source_address,
+                                                    socket_options=self.socket_options)
+        except socket.gaierror as exception:
+            raise NameResolutionError(self.host, self, exception) from exception
+        except socket.timeout as exception:
+            raise ConnectTimeoutError(
+                self, f'Connection to {self.host} timed out. (connect timeout={self.timeout})') from exception
+        except OSError as exception:
+            raise NewConnectionError(self, f'Failed to establish a new connection: {exception}') from exception
+
+class DNSCacheAdapter(HTTPAdapter):
+    """
+    An HTTPAdapter whose connections resolve the hosts through a DNS cache.
+    """
+
+    def __init__(self, dns_cache: DNSCache = None, **kwargs):
+        """
+        Initialize the DNSCacheAdapter.
+
+        Args:
+            dns_cache (DNSCache): The cache the connections resolve the hosts through, None to resolve them every time.
+            **kwargs: Arguments of requests.adapters.HTTPAdapter.
+        """
+        # HTTPAdapter creates its pool manager while it initializes
+        self.dns_cache = dns_cache
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        if self.dns_cache is None:
+            return
+        pool_classes = {}
+        for scheme, pool_class in self.poolmanager.pool_classes_by_scheme.items():
+            connection_class = type(f'CachedDNS{pool_class.ConnectionCls.__name__}',
+                                    (_CachedDNSConnection, pool_class.ConnectionCls), {'dns_cache': self.dns_cache})
+            pool_classes[scheme] = type(f'CachedDNS{pool_class.__name__}', (pool_class,),
+                                        {'ConnectionCls': connection_class})
+        # The pool manager looks its pool classes up on itself, so only this adapter's connections use the cache
+        self.poolmanager.pool_classes_by_scheme = pool_classes
+
+class HttpClient(HttpClientProtocol):
+    """
+    An HTTP client shared by the network services, so they reuse their connections.
+
+    It keeps a pool of keep-alive connections per host (sized per host if needed),
+    asks for compressed responses, caches the DNS resolutions and applies the same
+    timeouts to every request.
+    """
+
+    def __init__(self, timeout=HTTP_TIMEOUT, pool_hosts: int = HTTP_POOL_HOSTS, pool_maxsize: int = HTTP_POOL_MAXSIZE,
+                 host_pool_sizes: dict = None, dns_cache_ttl: float = HTTP_DNS_CACHE_TTL):
+        """
+        Initialize the HttpClient.
+
+        Args:
+            timeout (float | tuple): Default timeout of the requests, in seconds, or (connect, read) timeouts.
+            pool_hosts (int): Number of hosts whose connection pools are kept.
+            pool_maxsize (int): Number of connections kept per host.
+            host_pool_sizes (dict): Number of connections kept for specific hosts, by host name.
+                Defaults to HTTP_HOST_POOL_SIZES.
+            dns_cache_ttl (float): Seconds a DNS resolution is reused, 0 to disable the DNS cache.
+        """
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': HTTP_USER_AGENT,
+            'Accept-Encoding': 'gzip, deflate, br' if BROTLI_AVAILABLE else 'gzip, deflate',
+            'Connection': 'keep-alive'
+        })
+        self.dns_cache = DNSCache(dns_cache_ttl) if dns_cache_ttl else None
+        adapter = DNSCacheAdapter(self.dns_cache, pool_connections=pool_hosts, pool_maxsize=pool_maxsize)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        for host, size in (HTTP_HOST_POOL_SIZES if host_pool_sizes is None else host_pool_sizes).items():
+            host_adapter = DNSCacheAdapter(self.dns_cache, pool_connections=1, pool_maxsize=size)
+            self.session.mount(f'http://{host}/', host_adapter)
+            self.session.mount(f'https://{host}/', host_adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request through the pooled session.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The requested URL.
+            **kwargs: Arguments of requests.Session.request. The timeout defaults to the client's timeout.
+
+        Returns:
+            requests.Response: The response.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Send a GET request through the pooled session.
+        """
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """
+        Send a POST request through the pooled session.
+        """
+        return self.request('POST', url, **kwargs)
+
+    def close(self) -> None:
+        """
+        Close the pooled connections.
+        """
+        self.session.close()
@@ -0,0 +1,197 @@
+import os
+import shutil
+import hashlib
+import threading
+import contextlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from src.config.config import SCRAPE_IMAGE_WORKERS, SCRAPE_IMAGE_CHUNK_SIZE
+from src.domain.abstractions import ImageDownloaderProtocol
+from src.infrastructure.services.http_client import HttpClient
+
+DOWNLOADED, LINKED, SKIPPED = 'downloaded', 'linked', 'skipped'
+
+class ImageDownloader(ImageDownloaderProtocol):
+    """
+    Downloads the product images concurrently, streaming them to disk, and stores every image once.
+
+    An image URL shared by several products is downloaded once, and an image with the
+    same content as one already stored is not written again: the other products get a
+    hard link to the stored file (a copy where hard links are not supported). A file
+    already on disk with the size of the response is kept without reading the body.
+    """
+
+    def __init__(self, http_client=None, workers: int = SCRAPE_IMAGE_WORKERS, chunk_size: int = SCRAPE_IMAGE_CHUNK_SIZE):
+        """
+        Initialize the ImageDownloader.
+
+        Args:
+            http_client (HttpClientProtocol): Client the images are downloaded with. A new HttpClient is created if not given.
+            workers (int): Number of images downloaded at the same time.
+            chunk_size (int): Size of the chunks the images are written in, in bytes.
+        """
+        self.http_client = http_client or HttpClient()
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._executor = None
+        self._lock = threading.Lock()
+        self._by_url = {}
+        self._by_hash = {}
+
+    def submit(self, url: str, path: str) -> Future:
+        """
+        Download an image in the background.
+
+        Args:
+            url (str): The URL of the image.
+            path (str): The path of the image file.
+
+        Returns:
+            Future: The result of download(), raising its exception if the download failed.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers)
+            return self._executor.submit(self.download, url, path)
+
+    def download(self, url: str, path: str) -> str:
+        """
+        Download an image, unless it is already stored.
+
+        Args:
+            url (str): The URL of the image.
+            path (str): The path of the image file.
+
+        Returns:
+            str: 'downloaded' if the image was written, 'linked' if it was linked to a stored
+            copy and 'skipped' if the file was already on disk.
+        """
+        with self._lock:
+            stored = self._by_url.get(url)
+            if stored is None:
+                stored = self._by_url[url] = Future()
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            # Another download of the URL is running or done, so it is not requested again
+            stored_path, _ = stored.result()
+            return self._link(stored_path, path)
+
+        try:
+            result, stored_path, digest = self._fetch(url, path)
+        except BaseException as e:
+            with self._lock:
+                # A later product retries the URL
+                del self._by_url[url]
+            stored.set_exception(e)
+            raise
+        stored.set_result((stored_path, digest))
+        return result
+
+    def _fetch(self, url: str, path: str):
+        """
+        Stream an image to a temporary file while hashing it, then store it or link it to the copy with the same content.
+        """
+        response = self.http_client.get(url, stream=True)
+        with response:
+            response.raise_for_status()
+            length = response.headers.get('Content-Length')
+            if (os.path.exists(path) and length is not None and 'Content-Encoding' not in response.headers
+                    and int(length) == os.path.getsize(path)):
+                # The body is not read, the file on disk is hashed instead
+                digest = self._hash_file(path)
+                result, stored_path = self._store(digest, path)
+                return result, stored_path, digest
+
+            sha256 = hashlib.sha256()
+            part_path = f'{path}.part'
+            try:
+                with open(part_path, 'wb') as handler:
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        sha256.update(chunk)
+                        handler.write(chunk)
+            except BaseException:
+                # A failed cleanup must not hide the error of the download
+                with contextlib.suppress(OSError):
+                    os.remove(part_path)
+                raise
+
+        digest = sha256.hexdigest()
+        result, stored_path = self._store(digest, path, part_path)
+        return result, stored_path, digest
+
+    def _store(self, digest: str, path: str, part_path: str = None):
+        """
+        Store a path as the copy of a content, or link it to the stored copy if there is one.
+
+        The copy is registered before it is moved into place, so the downloads of the same
+        content wait for the move instead of linking to a file that does not exist yet.
+
+        Args:
+            digest (str): The SHA-256 of the content.
+            path (str): The path of the image file.
+            part_path (str): The downloaded file moved to the path, None if the path already has the content.
+
+        Returns:
+            tuple: The result of the download and the path of the stored copy.
+        """
+        while True:
+            with self._lock:
+                stored = self._by_hash.get(digest)
+                if stored is None:
+                    stored = self._by_hash[digest] = Future()
+                    break
+            try:
+                stored_path = stored.result()
+            except Exception:
+                # The other copy could not be stored, this one takes its place
+                continue
+            if part_path is not None:
+                os.remove(part_path)
+            return self._link(stored_path, path), stored_path
+
+        if part_path is None:
+            stored.set_result(path)
+            return SKIPPED, path
+        try:
+            # Replaced rather than rewritten, so the files linked to the old image keep their content
+            os.replace(part_path, path)
+        except BaseException as e:
+            with self._lock:
+                del self._by_hash[digest]
+            stored.set_exception(e)
+            raise
+        stored.set_result(path)
+        return DOWNLOADED, path
+
+    def _hash_file(self, path: str) -> str:
+        sha256 = hashlib.sha256()
+        with open(path, 'rb') as handler:
+            for chunk in iter(lambda: handler.read(self.chunk_size), b''):
+                sha256.update(chunk)
+        return sha256.hexdigest()
+
+    @staticmethod
+    def _link(stored_path: str, path: str) -> str:
+        """
+        Make a path point to the stored copy of an image.
+        """
+        if stored_path == path or (os.path.exists(path) and os.path.samefile(stored_path, path)):
+            return SKIPPED
+        if os.path.exists(path):
+            os.remove(path)
+        try:
+            os.link(stored_path, path)
+        except OSError:
+            shutil.copyfile(stored_path, path)
+        return LINKED
+
+    def close(self) -> None:
+        """
+        Wait for the running downloads and stop the download threads.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
@@ -0,0 +1,136 @@
+import time
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from src.common.utils import parse_retry_after
+from src.config.config import HOST_MAX_CONCURRENCY, HOST_REQUESTS_PER_SECOND, HOST_MAX_RETRIES, HOST_MAX_BACKOFF
+from src.domain.abstractions import PolitenessSchedulerProtocol
+
+THROTTLING_STATUS_CODES = (429, 503)
+
+class _HostState:
+    """
+    Rate limiting state of a single host.
+    """
+
+    def __init__(self, max_concurrency: int, rate: float):
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.rate = rate
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.backoff = 0.0
+
+class PolitenessScheduler(PolitenessSchedulerProtocol):
+    """
+    A scheduler shared by the network services to be polite with every host they contact.
+
+    Each host gets a maximum number of requests in flight and a token bucket that
+    limits the requests per second. When the host answers 429 or 503 the scheduler
+    pauses it (honouring Retry-After), halves its rate and retries the request;
+    successful responses bring the rate back to the configured value.
+    """
+
+    def __init__(self, max_concurrency: int = HOST_MAX_CONCURRENCY, requests_per_second: float = HOST_REQUESTS_PER_SECOND,
+                 max_retries: int = HOST_MAX_RETRIES, max_backoff: float = HOST_MAX_BACKOFF):
+        """
+        Initialize the PolitenessScheduler.
+
+        Args:
+            max_concurrency (int): Maximum number of requests in flight per host.
+            requests_per_second (float): Maximum sustained requests per second per host.
+            max_retries (int): Number of times a throttled request is retried.
+            max_backoff (float): Maximum number of seconds a host is paused after throttling.
+        """
+        self.max_concurrency = max_concurrency
+        self.requests_per_second = requests_per_second
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host_state(self, url: str) -> _HostState:
+        """
+        Get (or create) the state of the host of a URL.
+        """
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = _HostState(self.max_concurrency, self.requests_per_second)
+            return self._hosts[host]
+
+    def _wait_turn(self, state: _HostState) -> None:
+        """
+        Block until the host is not paused and its token bucket has a token available.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                burst = max(1.0, state.rate)
+                state.tokens = min(burst, state.tokens + (now - state.updated) * state.rate)
+                state.updated = now
+                if now >= state.blocked_until and state.tokens >= 1:
+                    state.tokens -= 1
+                    return
+                wait = max(state.blocked_until - now, (1 - state.tokens) / state.rate)
+            time.sleep(wait)
+
+    @contextmanager
+    def slot(self, url: str):
+        """
+        Hold one of the host's request slots for the duration of the block.
+
+        Args:
+            url (str): The URL about to be requested.
+        """
+        state = self._host_state(url)
+        with state.slots:
+            self._wait_turn(state)
+            yield
+
+    def record_response(self, url: str, response) -> float:
+        """
+        Adapt the host's rate to the response it returned.
+
+        Args:
+            url (str): The requested URL.
+            response (requests.Response): The response returned by the host.
+
+        Returns:
+            float: Seconds the host is paused for, 0 if the response was not throttled.
+        """
+        state = self._host_state(url)
+        with self._lock:
+            if response.status_code not in THROTTLING_STATUS_CODES:
+                state.backoff = 0.0
+                state.rate = min(self.requests_per_second, state.rate + self.requests_per_second / 10)
+                return 0.0
+
+            state.backoff = min(self.max_backoff, state.backoff * 2 if state.backoff else 1.0)
+            delay = parse_retry_after(response)
+            delay = state.backoff if delay is None else min(self.max_backoff, delay)
+            state.blocked_until = max(state.blocked_until, time.monotonic() + delay)
+            state.rate = max(self.requests_per_second / 16, state.rate / 2)
+            return delay
+
+    def request(self, url: str, send):
+        """
+        Perform a request respecting the host's limits, retrying it when the host throttles.
+
+        Args:
+            url (str): The requested URL.
+            send (callable): Function without arguments that performs the request and returns the response.
+
+        Returns:
+            requests.Response: The last response returned by the host.
+        """
+        attempt = 0
+        while True:
+            with self.slot(url):
+                response = send()
+            self.record_response(url, response)
+            if response.status_code not in THROTTLING_STATUS_CODES or attempt >= self.max_retries:
+                return response
+            # Released before waiting, so a streamed response gives its connection back to the pool
+            response.close()
+            attempt += 1
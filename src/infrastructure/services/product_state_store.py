@@ -0,0 +1,102 @@
+import json
+import sqlite3
+import pandas as pd
+from src.config.config import PRODUCT_STATE_DB
+from src.common.utils import files_output_path
+from src.domain.abstractions import ProductStateStoreProtocol
+
+class ProductStateStore(ProductStateStoreProtocol):
+    """
+    A SQLite store with the state of every scraped product URL: its sitemap lastmod,
+    the HTTP validators (ETag and Last-Modified) of the last response and the table
+    rows created from it, so unchanged products can be reused without scraping them.
+    """
+
+    def __init__(self, db_path: str = None):
+        """
+        Initialize the ProductStateStore and create its table if needed.
+
+        Args:
+            db_path (str): Path of the SQLite database. Defaults to PRODUCT_STATE_DB in files/state.
+        """
+        self.db_path = db_path or files_output_path('files\\state', PRODUCT_STATE_DB)
+        connection = self._connect()
+        try:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS products (
+                    url TEXT PRIMARY KEY,
+                    lastmod TEXT,
+                    etag TEXT,
+                    last_modified TEXT,
+                    columns TEXT,
+                    data TEXT
+                )
+            """)
+            connection.commit()
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # The scraping threads save their products at the same time
+        return sqlite3.connect(self.db_path, timeout=60)
+
+    def get(self, url: str) -> dict:
+        """
+        Get the state of a product URL.
+
+        Args:
+            url (str): The product URL.
+
+        Returns:
+            dict: The 'lastmod', 'etag' and 'last_modified' of the URL and its table rows as a
+            DataFrame in 'df', or None if the URL was never scraped.
+        """
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                'SELECT lastmod, etag, last_modified, columns, data FROM products WHERE url = ?', (url,)
+            ).fetchone()
+        finally:
+            connection.close()
+        if row is None:
+            return None
+        lastmod, etag, last_modified, columns, data = row
+        # Rebuilt from plain lists because the product columns have repeated names
+        df = pd.DataFrame(json.loads(data), columns=json.loads(columns))
+        return {'lastmod': lastmod, 'etag': etag, 'last_modified': last_modified, 'df': df}
+
+    def save(self, url: str, df: pd.DataFrame, lastmod: str = None, etag: str = None, last_modified: str = None) -> None:
+        """
+        Save the state of a scraped product URL.
+
+        Args:
+            url (str): The product URL.
+            df (pd.DataFrame): The table rows created from the product page.
+            lastmod (str): The lastmod of the URL in the sitemap.
+            etag (str): The ETag header of the response.
+            last_modified (str): The Last-Modified header of the response.
+        """
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute(
+                    'INSERT OR REPLACE INTO products VALUES (?, ?, ?, ?, ?, ?)',
+                    (url, lastmod, etag, last_modified, json.dumps(list(df.columns)), json.dumps(df.values.tolist()))
+                )
+        finally:
+            connection.close()
+
+    def touch(self, url: str, lastmod: str = None) -> None:
+        """
+        Record the new sitemap lastmod of a URL whose page did not change.
+
+        Args:
+            url (str): The product URL.
+            lastmod (str): The lastmod of the URL in the sitemap.
+        """
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute('UPDATE products SET lastmod = ? WHERE url = ?', (lastmod, url))
+        finally:
+            connection.close()
@@ -0,0 +1,160 @@
+import os
+import gzip
+import uuid
+from http import HTTPStatus
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from src.config.config import RESPONSE_ARCHIVE_FILE, RESPONSE_ARCHIVE_INDEX
+from src.common.utils import files_output_path
+from src.domain.abstractions import ResponseArchiveProtocol
+from src.domain.scraping import ScrapeResult
+
+class ResponseArchive(ResponseArchiveProtocol):
+    """
+    A compressed, append-only archive of the fetched product pages, to scrape them again without the network.
+
+    Every response is written as a WARC response record in its own gzip member, like
+    a .warc.gz file, so the archive can be read by the usual WARC tools. A SQLite index
+    keeps the offset of every record by URL and fetch time, so a record is read by
+    decompressing only its own member.
+    """
+
+    def __init__(self, archive_path: str = None, index_path: str = None):
+        """
+        Initialize the ResponseArchive and create its index if needed.
+
+        Args:
+            archive_path (str): Path of the archive. Defaults to RESPONSE_ARCHIVE_FILE in files/archive.
+            index_path (str): Path of the SQLite index. Defaults to RESPONSE_ARCHIVE_INDEX in files/archive.
+        """
+        self.archive_path = archive_path or files_output_path('files\\archive', RESPONSE_ARCHIVE_FILE)
+        self.index_path = index_path or files_output_path('files\\archive', RESPONSE_ARCHIVE_INDEX)
+        self._lock = threading.Lock()
+        connection = self._connect()
+        try:
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS records (
+                    id INTEGER PRIMARY KEY,
+                    url TEXT,
+                    fetched_at TEXT,
+                    offset INTEGER,
+                    length INTEGER,
+                    etag TEXT,
+                    last_modified TEXT
+                );
+                CREATE INDEX IF NOT EXISTS records_url ON records (url, id);
+            """)
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.index_path)
+
+    @staticmethod
+    def _warc_record(url: str, fetched_at: str, content: bytes, etag: str, last_modified: str, status_code: int) -> bytes:
+        """
+        Build the WARC response record of a page.
+        """
+        try:
+            reason = HTTPStatus(status_code).phrase
+        except ValueError:
+            reason = ''
+        http_headers = f'HTTP/1.1 {status_code} {reason}\r\n'
+        if etag:
+            http_headers += f'ETag: {etag}\r\n'
+        if last_modified:
+            http_headers += f'Last-Modified: {last_modified}\r\n'
+        block = (http_headers + '\r\n').encode('utf-8') + content
+        warc_headers = (
+            'WARC/1.0\r\n'
+            'WARC-Type: response\r\n'
+            f'WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n'
+            f'WARC-Date: {fetched_at}\r\n'
+            f'WARC-Target-URI: {url}\r\n'
+            'Content-Type: application/http; msgtype=response\r\n'
+            f'Content-Length: {len(block)}\r\n'
+            '\r\n'
+        )
+        return warc_headers.encode('utf-8') + block + b'\r\n\r\n'
+
+    def append(self, url: str, content: bytes, etag: str = None, last_modified: str = None, status_code: int = 200) -> None:
+        """
+        Append a fetched page to the archive.
+
+        Args:
+            url (str): The URL of the page.
+            content (bytes): The body of the response.
+            etag (str): The ETag header of the response.
+            last_modified (str): The Last-Modified header of the response.
+            status_code (int): The HTTP status of the response.
+        """
+        fetched_at = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        # Compressed out of the lock, so the threads only wait for each other to write
+        member = gzip.compress(self._warc_record(url, fetched_at, content, etag, last_modified, status_code))
+        with self._lock:
+            with open(self.archive_path, 'ab') as archive:
+                archive.seek(0, os.SEEK_END)
+                offset = archive.tell()
+                archive.write(member)
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.execute(
+                        'INSERT INTO records (url, fetched_at, offset, length, etag, last_modified) VALUES (?, ?, ?, ?, ?, ?)',
+                        (url, fetched_at, offset, len(member), etag, last_modified)
+                    )
+            finally:
+                connection.close()
+
+    def _read_content(self, offset: int, length: int) -> bytes:
+        """
+        Read the body of the response stored at an offset of the archive.
+        """
+        with open(self.archive_path, 'rb') as archive:
+            archive.seek(offset)
+            record = gzip.decompress(archive.read(length))
+        # Skip the WARC headers and the HTTP headers, and drop the record terminator
+        _, _, block = record.partition(b'\r\n\r\n')
+        _, _, content = block.partition(b'\r\n\r\n')
+        return content[:-4]
+
+    def latest(self, url: str) -> ScrapeResult:
+        """
+        Get the last archived response of a URL.
+
+        Args:
+            url (str): The URL of the page.
+
+        Returns:
+            ScrapeResult: The archived page in 'content', with its validators, or None if the URL is not archived.
+        """
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                'SELECT offset, length, etag, last_modified FROM records WHERE url = ? ORDER BY id DESC LIMIT 1', (url,)
+            ).fetchone()
+        finally:
+            connection.close()
+        if row is None:
+            return None
+        offset, length, etag, last_modified = row
+        return ScrapeResult(url, etag=etag, last_modified=last_modified, content=self._read_content(offset, length))
+
+    def iter_latest(self):
+        """
+        Stream the last archived response of every URL.
+
+        Yields:
+            ScrapeResult: The archived pages, in the order they were first archived.
+        """
+        connection = self._connect()
+        try:
+            rows = connection.execute("""
+                SELECT url, offset, length, etag, last_modified FROM records
+                WHERE id IN (SELECT MAX(id) FROM records GROUP BY url) ORDER BY id
+            """).fetchall()
+        finally:
+            connection.close()
+        for url, offset, length, etag, last_modified in rows:
+            yield ScrapeResult(url, etag=etag, last_modified=last_modified, content=self._read_content(offset, length))
@@ -0,0 +1,149 @@
+import sqlite3
+from src.config.config import SCRAPE_LEDGER_DB
+from src.common.utils import files_output_path
+from src.domain.abstractions import ScrapeLedgerProtocol
+
+class ScrapeLedger(ScrapeLedgerProtocol):
+    """
+    A SQLite ledger of the work completed by a scraping run, so an interrupted run can be resumed.
+
+    It records every product URL whose table was streamed, with the size of the products
+    stream after it, and every image downloaded. A resumed run skips the completed URLs
+    and images and truncates the stream to its last completed product, so a product
+    written when the run stopped is not saved twice.
+    """
+
+    def __init__(self, db_path: str = None):
+        """
+        Initialize the ScrapeLedger and create its tables if needed.
+
+        Args:
+            db_path (str): Path of the SQLite database. Defaults to SCRAPE_LEDGER_DB in files/state.
+        """
+        self.db_path = db_path or files_output_path('files\\state', SCRAPE_LEDGER_DB)
+        connection = self._connect()
+        try:
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS run_meta (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE IF NOT EXISTS completed (url TEXT PRIMARY KEY, stream_offset INTEGER);
+                CREATE TABLE IF NOT EXISTS images (path TEXT PRIMARY KEY, src TEXT);
+            """)
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # The scraping threads record their images at the same time
+        return sqlite3.connect(self.db_path, timeout=60)
+
+    def start(self, run_key: str, resume: bool = True) -> bool:
+        """
+        Start a scraping run, or resume the run in the ledger if it has the same key.
+
+        Args:
+            run_key (str): The key of the run, e.g. a hash of its URLs.
+            resume (bool): Whether a run with the same key is resumed instead of restarted.
+
+        Returns:
+            bool: True if an interrupted run was resumed, False if a new one was started.
+        """
+        connection = self._connect()
+        try:
+            with connection:
+                meta = dict(connection.execute('SELECT key, value FROM run_meta'))
+                if resume and meta.get('run_key') == run_key:
+                    return True
+                self._delete_all(connection)
+                connection.execute('INSERT INTO run_meta VALUES (?, ?)', ('run_key', run_key))
+                return False
+        finally:
+            connection.close()
+
+    def completed_urls(self) -> set:
+        """
+        Get the URLs completed by the run.
+
+        Returns:
+            set: The URLs whose tables were streamed.
+        """
+        connection = self._connect()
+        try:
+            return {url for url, in connection.execute('SELECT url FROM completed')}
+        finally:
+            connection.close()
+
+    def stream_offset(self) -> int:
+        """
+        Get the size of the products stream after the last completed URL.
+
+        Returns:
+            int: The size in bytes, 0 if no URL was completed.
+        """
+        connection = self._connect()
+        try:
+            row = connection.execute('SELECT MAX(stream_offset) FROM completed').fetchone()
+        finally:
+            connection.close()
+        return row[0] or 0
+
+    def complete(self, url: str, stream_offset: int) -> None:
+        """
+        Mark a URL as completed.
+
+        Args:
+            url (str): The product URL.
+            stream_offset (int): The size of the products stream after the table of the URL was appended.
+        """
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute('INSERT OR REPLACE INTO completed VALUES (?, ?)', (url, stream_offset))
+        finally:
+            connection.close()
+
+    def image_source(self, path: str) -> str:
+        """
+        Get the URL an image file was downloaded from by the run.
+
+        Args:
+            path (str): The path of the image file.
+
+        Returns:
+            str: The URL of the image, or None if the run did not download it.
+        """
+        connection = self._connect()
+        try:
+            row = connection.execute('SELECT src FROM images WHERE path = ?', (path,)).fetchone()
+        finally:
+            connection.close()
+        return row[0] if row else None
+
+    def record_image(self, path: str, src: str) -> None:
+        """
+        Record an image file downloaded by the run.
+
+        Args:
+            path (str): The path of the image file.
+            src (str): The URL the image was downloaded from.
+        """
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute('INSERT OR REPLACE INTO images VALUES (?, ?)', (path, src))
+        finally:
+            connection.close()
+
+    def clear(self) -> None:
+        """
+        Delete the run in the ledger, once its results are saved.
+        """
+        connection = self._connect()
+        try:
+            with connection:
+                self._delete_all(connection)
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _delete_all(connection: sqlite3.Connection) -> None:
+        for table in ('run_meta', 'completed', 'images'):
+            connection.execute(f'DELETE FROM {table}')
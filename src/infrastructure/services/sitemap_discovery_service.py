@@ -0,0 +1,161 @@
+import zlib
+import requests
+import xml.etree.ElementTree as ET
+from urllib.parse import urljoin
+from src.config.config import LOGGING_CRAWLING_FILE
+from src.common.utils import setup_logging
+from src.domain.abstractions import SitemapDiscoveryServiceProtocol, PolitenessSchedulerProtocol, HttpClientProtocol
+from src.infrastructure.services.politeness_scheduler import PolitenessScheduler
+from src.infrastructure.services.http_client import HttpClient
+
+GZIP_MAGIC = b'\x1f\x8b'
+SITEMAP_CHUNK_SIZE = 64 * 1024
+
+class SitemapDiscoveryService(SitemapDiscoveryServiceProtocol):
+    """
+    A service class for discovering the URLs of a website from its sitemaps.
+
+    Sitemaps are streamed and parsed incrementally, so sitemaps with thousands
+    of URLs are processed without loading them in memory. Sitemap indexes are
+    followed recursively, and gzip compressed sitemaps are decompressed on the fly.
+    """
+
+    def __init__(self, scheduler: PolitenessSchedulerProtocol = None, http_client: HttpClientProtocol = None):
+        """
+        Initialize the SitemapDiscoveryService.
+
+        Args:
+            scheduler (PolitenessSchedulerProtocol): Scheduler that rate limits the requests to each host.
+                A private one is created if not provided.
+            http_client (HttpClientProtocol): Pooled HTTP client used to fetch the sitemaps.
+                A private one is created if not provided.
+        """
+        self.logger = setup_logging(LOGGING_CRAWLING_FILE)
+        self.scheduler = scheduler or PolitenessScheduler()
+        self.http_client = http_client or HttpClient()
+
+    def sitemap_locations(self, start_url: str) -> list:
+        """
+        Find the sitemaps of a website, declared in its robots.txt or at the default /sitemap.xml.
+
+        Args:
+            start_url (str): Any URL of the website.
+
+        Returns:
+            list: The URLs of the sitemaps.
+        """
+        robots_url = urljoin(start_url, '/robots.txt')
+        try:
+            response = self.scheduler.request(robots_url, lambda: self.http_client.get(robots_url))
+            response.raise_for_status()
+            sitemaps = [
+                line.split(':', 1)[1].strip()
+                for line in response.text.splitlines()
+                if line.lower().startswith('sitemap:')
+            ]
+            if sitemaps:
+                return sitemaps
+        except requests.RequestException as e:
+            self.logger.debug(f"Could not read {robots_url}: {e}")
+        return [urljoin(start_url, '/sitemap.xml')]
+
+    def _iter_xml_chunks(self, response: requests.Response):
+        """
+        Stream the XML of a sitemap response, decompressing gzip payloads on the fly.
+        """
+        # Content-Encoding is decoded by requests, but .xml.gz files are sent as gzip payloads
+        decompressor = None
+        for chunk in response.iter_content(chunk_size=SITEMAP_CHUNK_SIZE):
+            if decompressor is None:
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if chunk[:2] == GZIP_MAGIC else False
+            yield decompressor.decompress(chunk) if decompressor else chunk
+
+    def _iter_sitemap(self, url: str, seen: set):
+        """
+        Stream one sitemap, yielding its page entries and following the child sitemaps of an index.
+        """
+        if url in seen:
+            return
+        seen.add(url)
+
+        try:
+            response = self.scheduler.request(url, lambda: self.http_client.get(url, stream=True))
+            response.raise_for_status()
+        except requests.RequestException as e:
+            self.logger.error(f"Error fetching sitemap {url}: {e}")
+            return
+
+        child_sitemaps = []
+        parser = ET.XMLPullParser(events=('start', 'end'))
+        root = None
+        loc = lastmod = None
+        try:
+            with response:
+                for chunk in self._iter_xml_chunks(response):
+                    parser.feed(chunk)
+                    for event, element in parser.read_events():
+                        if event == 'start':
+                            root = element if root is None else root
+                            continue
+                        tag = element.tag.rsplit('}', 1)[-1]
+                        # The first loc of an entry is the page; image and video extensions have their own loc
+                        if tag == 'loc' and loc is None:
+                            loc = (element.text or '').strip()
+                        elif tag == 'lastmod' and lastmod is None:
+                            lastmod = (element.text or '').strip()
+                        elif tag in ('url', 'sitemap'):
+                            if loc and tag == 'url':
+                                yield loc, lastmod
+                            elif loc:
+                                child_sitemaps.append(loc)
+                            loc = lastmod = None
+                            # Drop the parsed entries to keep the memory flat
+                            root.clear()
+        except (ET.ParseError, zlib.error, requests.RequestException) as e:
+            self.logger.error(f"Error parsing sitemap {url}: {e}")
+
+        self.logger.info(f"Parsed sitemap {url}, {len(child_sitemaps)} child sitemaps found.")
+        for child_url in child_sitemaps:
+            yield from self._iter_sitemap(child_url, seen)
+
+    def iter_sitemap_entries(self, start_url: str):
+        """
+        Stream the entries of all the sitemaps of a website.
+
+        Args:
+            start_url (str): Any URL of the website.
+
+        Yields:
+            tuple: The URL of a page and its lastmod date (None if the sitemap does not include it).
+        """
+        seen = set()
+        for sitemap_url in self.sitemap_locations(start_url):
+            yield from self._iter_sitemap(sitemap_url, seen)
+
+    def discover_entries(self, start_url: str) -> dict:
+        """
+        Collect the URLs of all the pages listed in the sitemaps of a website with their lastmod dates.
+
+        Args:
+            start_url (str): Any URL of the website.
+
+        Returns:
+            dict: The lastmod date (or None) of every URL found, empty if the website has no sitemap.
+        """
+        print('Looking for URLs in the sitemaps...')
+        self.logger.info('Looking for URLs in the sitemaps...')
+        entries = dict(self.iter_sitemap_entries(start_url))
+        self.logger.info(f"Sitemap discovery finished. Total URLs found: {len(entries)}")
+        return entries
+
+    def discover_urls(self, start_url: str) -> list:
+        """
+        Collect the URLs of all the pages listed in the sitemaps of a website.
+
+        Args:
+            start_url (str): Any URL of the website.
+
+        Returns:
+            list: The URLs found, empty if the website has no sitemap.
+        """
+        return list(self.discover_entries(start_url))
@@ -0,0 +1,72 @@
+import sqlite3
+from src.config.config import WP_UPLOAD_MANIFEST_DB
+from src.common.utils import files_output_path
+from src.domain.abstractions import UploadManifestProtocol
+
+class UploadManifest(UploadManifestProtocol):
+    """
+    A SQLite manifest of the images uploaded to WordPress, so a rerun of the upload stage
+    does not upload them again.
+
+    Every upload is keyed by the local path of the image and the SHA-256 of its content,
+    and keeps the WordPress media ID and source URL it got. The uploads are looked up by
+    content, so an image whose file changed since it was uploaded is uploaded again and
+    an image with the content of another one reuses its media.
+    """
+
+    def __init__(self, db_path: str = None):
+        """
+        Initialize the UploadManifest and create its table if needed.
+
+        Args:
+            db_path (str): Path of the SQLite database. Defaults to WP_UPLOAD_MANIFEST_DB in files/state.
+        """
+        self.db_path = db_path or files_output_path('files\\state', WP_UPLOAD_MANIFEST_DB)
+        connection = self._connect()
+        try:
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS uploads (
+                    path TEXT, sha256 TEXT, media_id INTEGER, source_url TEXT, PRIMARY KEY (path, sha256)
+                );
+                CREATE INDEX IF NOT EXISTS uploads_sha256 ON uploads (sha256);
+            """)
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # The upload threads record their images at the same time
+        return sqlite3.connect(self.db_path, timeout=60)
+
+    def uploaded_media(self, sha256: str) -> tuple:
+        """
+        Get the media an image content was uploaded to, from any of the paths it was uploaded from.
+
+        Args:
+            sha256 (str): The SHA-256 of the content of the image.
+
+        Returns:
+            tuple: The media ID and source URL of the uploaded image, or None if the content was not uploaded.
+        """
+        connection = self._connect()
+        try:
+            row = connection.execute('SELECT media_id, source_url FROM uploads WHERE sha256 = ? LIMIT 1', (sha256,)).fetchone()
+        finally:
+            connection.close()
+        return row
+
+    def record_upload(self, path: str, sha256: str, media_id: int, source_url: str) -> None:
+        """
+        Record an uploaded image.
+
+        Args:
+            path (str): The path of the image file.
+            sha256 (str): The SHA-256 of the content of the image.
+            media_id (int): The ID of the WordPress media, None if the response did not include it.
+            source_url (str): The source URL of the uploaded image.
+        """
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute('INSERT OR REPLACE INTO uploads VALUES (?, ?, ?, ?)', (path, sha256, media_id, source_url))
+        finally:
+            connection.close()
@@ -1,33 +1,176 @@
 import os
-import requests
-from urllib.parse import urljoin
-from src.config.config import WP_URL, WP_USERNAME, WP_PASSWORD
-from src.domain.abstractions import WPImagesServiceProtocol
+import re
 import time
+import random
+import hashlib
+import threading
+import requests
+from concurrent.futures import Future
+from urllib.parse import urljoin, urlparse
+from src.common.utils import parse_retry_after
+from src.config.config import (WP_URL, WP_USERNAME, WP_PASSWORD, WP_UPLOAD_TIMEOUT, WP_UPLOAD_RETRIES, WP_UPLOAD_BACKOFF,
+                               WP_UPLOAD_RESUME, HOST_MAX_BACKOFF)
+from src.domain.abstractions import WPImagesServiceProtocol, HttpClientProtocol, UploadManifestProtocol
+from src.infrastructure.services.http_client import HttpClient
+
+# Responses worth retrying: the server is throttling the uploads or failed to store one
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Characters WordPress removes from the names of the uploaded files (sanitize_file_name)
+WP_FILE_NAME_SPECIAL_CHARS = '?[]/\\=<>:;,\'"&$#*()|~`!{}%+\u2019\u00ab\u00bb\u201d\u201c\0'
 
 class WPImagesService(WPImagesServiceProtocol):
     """
     A service class for uploading images to a WordPress site.
+
+    The images are addressed by the SHA-256 of their content, so the same image shared
+    by several products is uploaded once and every product gets its URL. The images
+    uploaded by previous runs (from the manifest) or already in the WordPress media
+    library (after reconcile_library) are not uploaded again.
     """
 
-    def upload_image(self, image_path: str, retries=3, wait_time=2) -> str:
+    def __init__(self, http_client: HttpClientProtocol = None, manifest: UploadManifestProtocol = None,
+                 resume: bool = WP_UPLOAD_RESUME):
+        """
+        Initialize the WPImagesService.
+
+        Args:
+            http_client (HttpClientProtocol): Pooled HTTP client used to upload the images.
+                A private one is created if not provided.
+            manifest (UploadManifestProtocol): Manifest where the uploads are recorded. Without it the images
+                uploaded by previous runs are uploaded again.
+            resume (bool): Whether the images recorded in the manifest with the same content are skipped.
+        """
+        self.http_client = http_client or HttpClient()
+        self.manifest = manifest
+        self.resume = resume
+        self._lock = threading.Lock()
+        self._by_hash = {}
+        self._library = {}
+
+    def upload_image(self, image_path: str, retries: int = WP_UPLOAD_RETRIES, wait_time: float = WP_UPLOAD_BACKOFF) -> str:
         """
-        Upload an image to WordPress.
+        Upload an image to WordPress, unless an image with the same content was already uploaded.
+
+        Network errors, timeouts and 429 or 5xx responses are retried with exponential
+        backoff and jitter (honouring Retry-After); other responses are not retried.
+        The wait only blocks the calling thread, so concurrent uploads keep going.
 
         Args:
             image_path (str): The path to the image file to be uploaded.
-            retries (int): Number of times to retry the upload in case of failure.
-            wait_time (int): Number of seconds to wait between retries.
+            retries (int): Number of attempts of the upload.
+            wait_time (float): Number of seconds to wait before the first retry, doubled on every retry.
 
         Returns:
-            str: The URL of the uploaded image.
+            str: The URL of the uploaded image, or None if the upload failed.
+        """
+        try:
+            digest = self._hash_file(image_path)
+        except OSError as e:
+            print(f"An error occurred: {e}")
+            return None
+
+        with self._lock:
+            uploaded = self._by_hash.get(digest)
+            if uploaded is None:
+                uploaded = self._by_hash[digest] = Future()
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            # The same content is being uploaded or was uploaded for another product
+            media_id, source_url = uploaded.result()
+            if source_url is not None and self.manifest is not None:
+                self.manifest.record_upload(image_path, digest, media_id, source_url)
+            return source_url
+
+        try:
+            media_id, source_url = self._find_media(image_path, digest)
+            if source_url is None:
+                media_id, source_url = self._post(image_path, retries, wait_time)
+            if source_url is not None and self.manifest is not None:
+                self.manifest.record_upload(image_path, digest, media_id, source_url)
+        except BaseException as e:
+            with self._lock:
+                del self._by_hash[digest]
+            uploaded.set_exception(e)
+            raise
+        if source_url is None:
+            with self._lock:
+                # A later product retries the content
+                del self._by_hash[digest]
+        uploaded.set_result((media_id, source_url))
+        return source_url
 
-        Raises:
-            requests.exceptions.RequestException: An error occurred while making the HTTP request.
-            KeyError: The response does not contain the expected 'source_url'.
+    def reconcile_library(self, per_page: int = 100) -> int:
         """
+        Index the media already in the WordPress library, so the images uploaded outside
+        the manifest (e.g. by another machine) are not uploaded again.
+
+        The library is listed once, page by page. The media are matched to the images by
+        file name, as WordPress sanitizes it, and by file size: the names come back when the
+        images of a product change, so the media whose size WordPress does not report are
+        not indexed.
+
+        Args:
+            per_page (int): Number of media requested per page, 100 at most.
+
+        Returns:
+            int: The number of media indexed.
+        """
+        library = {}
+        page, pages = 1, 1
+        while page <= pages:
+            response = self.http_client.get(
+                urljoin(WP_URL, 'media'),
+                params={'per_page': per_page, 'page': page, 'media_type': 'image', '_fields': 'id,source_url,media_details'},
+                auth=(WP_USERNAME, WP_PASSWORD),
+                timeout=WP_UPLOAD_TIMEOUT
+            )
+            response.raise_for_status()
+            pages = int(response.headers.get('X-WP-TotalPages', 1))
+            for media in response.json():
+                details = media.get('media_details') or {}
+                if details.get('filesize') is None:
+                    continue
+                # original_image is the uploaded file of the images WordPress scaled down
+                name = details.get('original_image') or os.path.basename(urlparse(media['source_url']).path)
+                library.setdefault(self._media_name(name), []).append((media['id'], media['source_url'], details['filesize']))
+            page += 1
+        self._library = library
+        return sum(len(candidates) for candidates in library.values())
+
+    def _find_media(self, image_path: str, digest: str):
+        """
+        Find an image already uploaded with the same content, in the manifest or in the indexed library.
+
+        Returns:
+            tuple: The media ID and source URL of the image, (None, None) if it was not found.
+        """
+        if self.manifest is not None and self.resume:
+            uploaded = self.manifest.uploaded_media(digest)
+            if uploaded is not None:
+                return uploaded
+        candidates = self._library.get(self._media_name(os.path.basename(image_path)), [])
+        if candidates:
+            size = os.path.getsize(image_path)
+            for media_id, source_url, filesize in candidates:
+                if filesize == size:
+                    return media_id, source_url
+        return None, None
+
+    def _post(self, image_path: str, retries: int, wait_time: float):
+        """
+        Upload an image, retrying the network errors, timeouts and 429 or 5xx responses.
+
+        Returns:
+            tuple: The media ID and source URL of the uploaded image, (None, None) if the upload failed.
+        """
+        # No attempt is made when retries is 0
         attempt = 0
-        while attempt < retries:
+        for attempt in range(1, retries + 1):
+            retry_after = None
             try:
                 with open(image_path, 'rb') as img:
                     media = {
@@ -38,25 +181,58 @@ class WPImagesService(WPImagesServiceProtocol):
                     headers = {
                         'Content-Disposition': f'attachment; filename={os.path.basename(image_path)}'
                     }
-                    response = requests.post(
+                    response = self.http_client.post(
                         urljoin(WP_URL, 'media'),
                         headers=headers,
                         files=media,
                         auth=(WP_USERNAME, WP_PASSWORD),
-                        timeout=10  # Timeout for the request
+                        timeout=WP_UPLOAD_TIMEOUT
                     )
                     response.raise_for_status()
-                    return response.json()['source_url']
+                    uploaded = response.json()
+                    return uploaded.get('id'), uploaded['source_url']
+            except requests.exceptions.HTTPError as e:
+                print(f"HTTP error occurred: {e}")
+                if e.response is None or e.response.status_code not in RETRY_STATUS_CODES:
+                    break
+                retry_after = parse_retry_after(e.response)
             except requests.exceptions.RequestException as e:
                 print(f"HTTP error occurred: {e}")
-                attempt += 1
-                if attempt < retries:
-                    print(f"Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
             except KeyError as e:
                 print(f"Key error occurred: {e}")
                 break
             except Exception as e:
                 print(f"An error occurred: {e}")
                 break
-        print(f"Failed to upload image {image_path} after {retries} attempts.")
\ No newline at end of file
+            if attempt < retries:
+                delay = self._backoff(wait_time, attempt) if retry_after is None else min(HOST_MAX_BACKOFF, retry_after)
+                print(f"Retrying {image_path} in {delay:.1f} seconds...")
+                time.sleep(delay)
+        print(f"Failed to upload image {image_path} after {attempt} attempts.")
+        return None, None
+
+    @staticmethod
+    def _media_name(file_name: str) -> str:
+        """
+        Normalize a file name the way WordPress sanitizes the names of the uploaded files.
+        """
+        name = file_name.translate(str.maketrans('', '', WP_FILE_NAME_SPECIAL_CHARS))
+        name = re.sub(r'[\r\n\t -]+', '-', name)
+        return name.strip('.-_')
+
+    @staticmethod
+    def _hash_file(image_path: str) -> str:
+        sha256 = hashlib.sha256()
+        with open(image_path, 'rb') as handler:
+            for chunk in iter(lambda: handler.read(65536), b''):
+                sha256.update(chunk)
+        return sha256.hexdigest()
+
+    @staticmethod
+    def _backoff(wait_time: float, attempt: int) -> float:
+        """
+        Seconds to wait before retrying an attempt: exponential, capped, with jitter so the
+        concurrent uploads throttled together do not retry together.
+        """
+        delay = min(HOST_MAX_BACKOFF, wait_time * 2 ** (attempt - 1))
+        return random.uniform(delay / 2, delay)
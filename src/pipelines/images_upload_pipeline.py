@@ -1,6 +1,6 @@
-import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from src.common.utils import setup_logging
-from src.config.config import LOGGING_IMAGES_FILE
+from src.config.config import LOGGING_IMAGES_FILE, WP_UPLOAD_CONCURRENCY, WP_RECONCILE_MEDIA
 from src.domain.abstractions import ImagesUploadPipelineProtocol
 
 class ImagesUploadPipeline(ImagesUploadPipelineProtocol):
@@ -43,27 +43,23 @@ class ImagesUploadPipeline(ImagesUploadPipelineProtocol):
             self.logger.error(f"Error preparing data: {e}")
             return
         
-        print('\nUploading images...')
-        self.logger.info('Uploading images...')
-
-        counter = 0
-        image_urls = []
-        for index, row in paths_df.iterrows():
-            image_path = row['route']
+        if WP_RECONCILE_MEDIA:
+            print('\nIndexing the WordPress media library...')
+            self.logger.info('Indexing the WordPress media library...')
             try:
-                image_url = self.wp_images_service.upload_image(image_path)
-                image_urls.append((index, image_url))
-                self.logger.info(f'{image_url}')
+                media_count = self.wp_images_service.reconcile_library()
+                print(f'{media_count} media indexed.')
+                self.logger.info(f'{media_count} media indexed.')
             except Exception as e:
-                print(f'Error uploading {image_path}: {e}')
-                self.logger.error(f'Error uploading {image_path}: {e}')
-                image_urls.append((index, None))
-            
-            counter += 1
+                # The images are uploaded without reusing the library
+                print(f"Error indexing the media library: {e}")
+                self.logger.error(f"Error indexing the media library: {e}")
+
+        print('\nUploading images...')
+        self.logger.info('Uploading images...')
 
-            if counter % 50 == 0:
-                print(f'\n{counter} images uploaded.')
-                self.logger.info(f'{counter} images uploaded.')
+        image_urls = self.upload_images(paths_df)
+        uploaded = sum(1 for _, image_url in image_urls if image_url is not None)
 
         try:
             updated_csv = self.images_factory_service.update_wc_table(paths_df, image_urls)
@@ -73,5 +69,40 @@ class ImagesUploadPipeline(ImagesUploadPipelineProtocol):
             print(f"Error updating CSV: {e}")
             return
 
-        print(f'\n{counter} images have been successfully uploaded')
-        self.logger.info(f'{counter} images have been successfully uploaded')
\ No newline at end of file
+        print(f'\n{uploaded} images have been successfully uploaded')
+        self.logger.info(f'{uploaded} images have been successfully uploaded')
+        if uploaded < len(image_urls):
+            print(f'{len(image_urls) - uploaded} images could not be uploaded')
+            self.logger.warning(f'{len(image_urls) - uploaded} images could not be uploaded')
+
+    def upload_images(self, paths_df):
+        """
+        Upload the images of the paths table, WP_UPLOAD_CONCURRENCY at a time.
+
+        Every upload retries on its own, so a slow or throttled image does not stall the others.
+
+        Expected input:
+        - paths_df: The paths table, with the path of every image in the 'route' column.
+
+        Expected output:
+        - A list of (index, image_url) tuples in the order of the table, with None as the URL of the failed uploads.
+        """
+        with ThreadPoolExecutor(max_workers=WP_UPLOAD_CONCURRENCY) as executor:
+            futures = {executor.submit(self.wp_images_service.upload_image, image_path): (index, image_path)
+                       for index, image_path in paths_df['route'].items()}
+            image_urls = {}
+            for counter, future in enumerate(as_completed(futures), start=1):
+                index, image_path = futures[future]
+                try:
+                    image_urls[index] = future.result()
+                    self.logger.info(f'{image_urls[index]}')
+                except Exception as e:
+                    print(f'Error uploading {image_path}: {e}')
+                    self.logger.error(f'Error uploading {image_path}: {e}')
+                    image_urls[index] = None
+
+                if counter % 50 == 0:
+                    print(f'\n{counter} images uploaded.')
+                    self.logger.info(f'{counter} images uploaded.')
+
+        return [(index, image_urls[index]) for index, _ in futures.values()]
\ No newline at end of file
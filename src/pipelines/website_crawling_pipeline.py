@@ -1,6 +1,6 @@
 import os
 from src.common.utils import setup_logging
-from src.config.config import LOGGING_CRAWLING_FILE
+from src.config.config import LOGGING_CRAWLING_FILE, CRAWL_MODE, CRAWL_CONCURRENCY, CRAWL_USE_SITEMAP, CRAWL_SHARDS, CRAWL_SHARD_IDS
 from src.domain.abstractions import WebsiteCrawlingPipelineProtocol
 
 class WebsiteCrawlingPipeline(WebsiteCrawlingPipelineProtocol):
@@ -19,6 +19,51 @@ class WebsiteCrawlingPipeline(WebsiteCrawlingPipelineProtocol):
         self.container = container
         self.crawling_service = container.config('crawling_web_service')
         self.filtering_service = container.config('urls_factory_service')
+        self.sitemap_service = container.config('sitemap_discovery_service')
+        self.crawl_mode = CRAWL_MODE
+        self.crawl_concurrency = CRAWL_CONCURRENCY
+        self.crawl_shards = CRAWL_SHARDS
+        self.crawl_shard_ids = CRAWL_SHARD_IDS
+        self.use_sitemap = CRAWL_USE_SITEMAP
+
+    def discover_sitemap_urls(self):
+        """
+        Discover the URLs from the sitemaps of the website and filter them with the selected URL structure.
+
+        Returns:
+            pd.DataFrame: DataFrame with the filtered URLs and their sitemap 'Lastmod', or None if no
+            sitemap URL matches the structure.
+        """
+        entries = self.sitemap_service.discover_entries(self.crawling_service.start_url)
+        if not entries:
+            print("No sitemap found, crawling the website.")
+            self.logger.info("No sitemap found, crawling the website.")
+            return None
+
+        print("\nFiltering sitemap URLs with the selected URL structure...\n")
+        self.logger.info("Filtering sitemap URLs with the selected URL structure...")
+        df_unique = self.filtering_service.filter_urls(list(entries))
+        if df_unique.empty:
+            print("No sitemap URL matches the selected URL structure, crawling the website.")
+            self.logger.info("No sitemap URL matches the selected URL structure, crawling the website.")
+            return None
+
+        # The scraping stage compares the lastmod to scrape only the products that changed
+        df_unique['Lastmod'] = df_unique['URL'].map(entries)
+        return df_unique
+
+    def crawl(self) -> list:
+        """
+        Crawl the website with the configured crawl mode.
+
+        Returns:
+            list: A list of collected URLs.
+        """
+        if self.crawl_mode == 'async':
+            return self.crawling_service.crawling_web_async(self.crawl_concurrency)
+        if self.crawl_mode == 'sharded':
+            return self.crawling_service.crawling_web_sharded(self.crawl_shards, self.crawl_shard_ids)
+        return self.crawling_service.crawling_web()
 
     def run(self):
         """
@@ -33,33 +78,44 @@ class WebsiteCrawlingPipeline(WebsiteCrawlingPipelineProtocol):
         print("\n-----Web Crawling and URLs Saving Stage-----\n")
         self.logger.info("Starting Web Crawling and URLs Saving Stage")
 
-        # Perform web crawling
         try:
-            urls = self.crawling_service.crawling_web()
-            while not urls:
-                print("Empty URLs list, trying with immediate level:")
-                self.logger.info("Empty URLs list, testing with immediate level:")            
-                self.crawling_service.update_prefix()
-                urls = self.crawling_service.crawling_web()
-
-            if not urls:
-                error_message = "List of empty URLs for all versions of the prefix, try with another CATEGORIES_URL in config.py."
-                print(error_message)
-                self.logger.error(error_message)
-                raise ValueError(error_message)
-
-            print("\nFiltering URLs with the selected URL structure...\n")  
-            self.logger.info("Filtering URLs with the selected URL structure...")
-            df_unique = self.filtering_service.filter_urls(urls)
-
-            if df_unique.empty:
-                error_message = "URL not found in table, try with another CATEGORIES_URL in config.py."
-                print(error_message)
-                self.logger.error(error_message)
-                raise ValueError(error_message)
+            df_unique = self.discover_sitemap_urls() if self.use_sitemap else None
+
+            # Perform web crawling when the sitemaps are not available
+            if df_unique is None:
+                # An interrupted crawl may have fallen back to a broader prefix already
+                self.crawling_service.restore_prefix(self.crawl_mode == 'sharded')
+                urls = self.crawl()
+                while not urls:
+                    print("Empty URLs list, trying with immediate level:")
+                    self.logger.info("Empty URLs list, testing with immediate level:")            
+                    self.crawling_service.update_prefix()
+                    urls = self.crawl()
+
+                if not urls:
+                    error_message = "List of empty URLs for all versions of the prefix, try with another CATEGORIES_URL in config.py."
+                    print(error_message)
+                    self.logger.error(error_message)
+                    raise ValueError(error_message)
+
+                print("\nFiltering URLs with the selected URL structure...\n")  
+                self.logger.info("Filtering URLs with the selected URL structure...")
+                df_unique = self.filtering_service.filter_urls(urls)
+
+                if df_unique.empty:
+                    error_message = "URL not found in table, try with another CATEGORIES_URL in config.py."
+                    print(error_message)
+                    self.logger.error(error_message)
+                    raise ValueError(error_message)
 
             self.filtering_service.save_urls_csv(df_unique)
 
+            # The URLs are saved, the next run must crawl the website again
+            self.crawling_service.clear_checkpoint()
+
         except Exception as e:
             self.logger.error(f"An error occurred during the pipeline run: {e}")
-            print(f"An error occurred during the pipeline run: {e}")
\ No newline at end of file
+            print(f"An error occurred during the pipeline run: {e}")
+        finally:
+            # The pages cached for the prefix fallbacks are not needed anymore
+            self.crawling_service.clear_page_cache()
\ No newline at end of file
@@ -1,8 +1,12 @@
 import pandas as pd
 import os
-import requests
 import re
-from src.config.config import PRODUCT_URLS_CSV, LOGGING_SCRAPING_FILE
+import hashlib
+from collections import deque
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from src.config.config import (PRODUCT_URLS_CSV, LOGGING_SCRAPING_FILE, SCRAPE_INCREMENTAL, SCRAPE_WORKERS, SCRAPE_PARSE_PROCESSES,
+                               SCRAPE_ARCHIVE, SCRAPE_REPLAY, SCRAPE_RESUME)
 from src.common.utils import files_output_path, setup_logging
 from src.domain.abstractions import WebsiteScrapingPipelineProtocol
 
@@ -22,6 +26,17 @@ class WebsiteScrapingPipeline(WebsiteScrapingPipelineProtocol):
         self.container = container
         self.tables_factory_service = container.config('tables_factory_service')
         self.scraping_service = container.config('scraping_service')
+        self.product_state_store = container.config('product_state_store')
+        self.response_archive = container.config('response_archive')
+        self.scrape_ledger = container.config('scrape_ledger')
+        self.image_downloader = container.config('image_downloader')
+        self.archive = SCRAPE_ARCHIVE
+        self.replay = SCRAPE_REPLAY
+        self.incremental = SCRAPE_INCREMENTAL
+        self.resume = SCRAPE_RESUME
+        self.scrape_workers = SCRAPE_WORKERS
+        self.parse_processes = SCRAPE_PARSE_PROCESSES
+        self.parse_executor = None
 
     def run(self):
         """
@@ -29,14 +44,17 @@ class WebsiteScrapingPipeline(WebsiteScrapingPipelineProtocol):
         """
         print("\n\n-----Web scraping Stage-----\n")
         self.logger.info("Starting Web scraping Stage")
+        if self.replay:
+            print("Replay mode: scraping the archived pages, no page will be fetched.\n")
+            self.logger.info("Replay mode: scraping the archived pages.")
 
         urls_df = self.load_urls()
         if urls_df is None:
             return
 
-        scraped_dfs_list = self.scrape_urls(urls_df)
+        products_count = self.scrape_urls(urls_df)
 
-        self.save_scraped_data(scraped_dfs_list)
+        self.save_scraped_data(products_count)
 
     def load_urls(self):
         """
@@ -53,35 +71,173 @@ class WebsiteScrapingPipeline(WebsiteScrapingPipelineProtocol):
     def scrape_urls(self, urls_df):
         """
         Scrape data from the URLs in the DataFrame.
+
+        The URLs are fetched by SCRAPE_WORKERS threads and, if SCRAPE_PARSE_PROCESSES is
+        set, parsed by a pool of processes so parsing is not limited by the GIL. The
+        tables are streamed to the tables factory service in the order of the URLs as
+        soon as they are ready, so they are not kept in memory. In incremental mode the
+        products that did not change since the last run are taken from the product state
+        store instead of being scraped again.
+
+        Every streamed table is recorded in the scrape ledger. If the last run with the
+        same URLs was interrupted, it is resumed: the URLs it completed are skipped and
+        the new tables are streamed after theirs.
+
+        Returns:
+            int: The number of product tables streamed, including the ones of the resumed run.
         """
-        scraped_dfs_list = []
         counter = 0
+        unchanged_counter = 0
+        urls = list(urls_df['Cleaned_URL'])
+        lastmods = urls_df['Lastmod'] if 'Lastmod' in urls_df.columns else [None] * len(urls_df)
+        lastmods = [lastmod if isinstance(lastmod, str) else None for lastmod in lastmods]
+
+        run_key = hashlib.sha256('\n'.join(urls).encode('utf-8')).hexdigest()
+        products_count = 0
+        stream_offset = 0
+        if self.scrape_ledger.start(run_key, self.resume):
+            completed = self.scrape_ledger.completed_urls()
+            stream_offset = self.scrape_ledger.stream_offset()
+            products_count = len(completed)
+            pending = [(url, lastmod) for url, lastmod in zip(urls, lastmods) if url not in completed]
+            urls, lastmods = [url for url, _ in pending], [lastmod for _, lastmod in pending]
+            print(f'Resuming the interrupted scraping: {len(completed)} URLs already scraped, {len(urls)} remaining.\n')
+            self.logger.info(f'Resuming the interrupted scraping: {len(completed)} URLs already scraped, {len(urls)} remaining.')
+
+        self.tables_factory_service.start_products_stream(stream_offset)
+        with ExitStack() as stack:
+            if self.parse_processes:
+                self.parse_executor = stack.enter_context(ProcessPoolExecutor(max_workers=self.parse_processes))
+                stack.callback(setattr, self, 'parse_executor', None)
+            stack.callback(self.image_downloader.close)
+            executor = stack.enter_context(ThreadPoolExecutor(max_workers=self.scrape_workers))
+            for url, (scraped, scraped_df) in self._scrape_in_order(executor, urls, lastmods):
+                if scraped_df is not None:
+                    stream_offset = self.tables_factory_service.append_products(scraped_df)
+                    self.scrape_ledger.complete(url, stream_offset)
+                    products_count += 1
+                if scraped is False:
+                    unchanged_counter += 1
+                elif scraped:
+                    counter += 1
+                    if counter % 50 == 0:
+                        print(f'{counter} URLs have been scraped.\n')
+                        self.logger.info(f'{counter} URLs have been scraped.')
 
-        for url in urls_df['Cleaned_URL']:
-            scraped_data = self.scrape_url(url)
-            if scraped_data:
-                self.process_scraped_data(scraped_data, scraped_dfs_list, url)
-                counter += 1
-                if counter % 50 == 0:
-                    print(f'{counter} URLs have been scraped.\n')
-                    self.logger.info(f'{counter} URLs have been scraped.')
+        if self.incremental:
+            print(f'{unchanged_counter} unchanged products have been reused.\n')
+            self.logger.info(f'{unchanged_counter} unchanged products have been reused.')
 
-        return scraped_dfs_list
+        return products_count
 
-    def scrape_url(self, url):
+    def _scrape_in_order(self, executor, urls, lastmods):
         """
-        Scrape a single URL.
+        Scrape the URLs in the executor, yielding their results in the order of the URLs, whatever order they finish in.
+
+        At most twice as many URLs as workers are in flight, so a slow URL does not keep the
+        tables of all the URLs after it in memory, and the URLs are not all submitted at once.
+
+        Yields:
+            tuple: The URL and the result of scrape_product.
         """
+        in_flight = deque()
+        for url, lastmod in zip(urls, lastmods):
+            in_flight.append((url, executor.submit(self.scrape_product, url, lastmod)))
+            if len(in_flight) >= self.scrape_workers * 2:
+                url, future = in_flight.popleft()
+                yield url, future.result()
+        while in_flight:
+            url, future = in_flight.popleft()
+            yield url, future.result()
+
+    def scrape_product(self, url, lastmod=None):
+        """
+        Scrape a product URL and create its table.
+
+        In incremental mode the page is considered unchanged when its sitemap lastmod did
+        not change, or when a conditional request with the validators of the last response
+        returns 304. In both cases the table stored for the product is reused. In replay
+        mode the page is taken from the response archive instead of being fetched.
+
+        Args:
+            url (str): The URL of the product page.
+            lastmod (str): The lastmod date of the URL in the sitemap, if known.
+
+        Returns:
+            tuple: True if the URL was scraped, False if its stored table was reused, None if
+            scraping failed; and the table of the product (None if scraping failed).
+        """
+        if self.replay:
+            return self.replay_product(url)
+
+        state = self.product_state_store.get(url) if self.incremental else None
+        if state is not None and lastmod and state['lastmod'] == lastmod:
+            self.logger.debug(f"URL {url} unchanged since {lastmod}.")
+            return False, state['df']
+
+        validators = {'etag': state['etag'], 'last_modified': state['last_modified']} if state is not None else None
         try:
-            return self.scraping_service.scrape(url)
+            result = self.scraping_service.fetch_product(url, validators)
+            if result.not_modified:
+                self.logger.debug(f"URL {url} not modified.")
+                self.product_state_store.touch(url, lastmod)
+                return False, state['df']
+            if self.archive:
+                self.response_archive.append(url, result.content, result.etag, result.last_modified, result.status_code)
+            scraped_data = self.parse_product(result.content)
+            scraped_df = self.process_scraped_data(scraped_data, url)
+            if scraped_df is None:
+                return None, None
+            if self.incremental:
+                self.product_state_store.save(url, scraped_df, lastmod, result.etag, result.last_modified)
         except Exception as e:
+            # A failing URL costs its product only, the other threads keep scraping
             self.logger.error(f"Error scraping URL {url}: {e}")
             print(f"Error scraping URL {url}: {e}")
-            return None
+            return None, None
+        return True, scraped_df
+
+    def replay_product(self, url):
+        """
+        Scrape a product URL from its last archived page, without any network request.
 
-    def process_scraped_data(self, scraped_data, scraped_dfs_list, url):
+        Returns:
+            tuple: True if the URL was scraped, None if it is not archived or scraping failed;
+            and the table of the product (None if scraping failed).
+        """
+        result = self.response_archive.latest(url)
+        if result is None:
+            self.logger.error(f"URL {url} not found in the response archive.")
+            print(f"URL {url} not found in the response archive.")
+            return None, None
+
+        try:
+            scraped_data = self.parse_product(result.content)
+            scraped_df = self.process_scraped_data(scraped_data, url)
+        except Exception as e:
+            self.logger.error(f"Error scraping archived URL {url}: {e}")
+            print(f"Error scraping archived URL {url}: {e}")
+            return None, None
+        return (None, None) if scraped_df is None else (True, scraped_df)
+
+    def parse_product(self, content):
+        """
+        Parse the HTML of a product page, in the parsing processes if they are running.
+
+        The content is parsed as the scraping service fetched it, a page or the JSON of the
+        product endpoint. The fetching thread waits for the result, while the other threads keep fetching.
+        """
+        extraction = self.scraping_service.extraction
+        if self.parse_executor is None:
+            return self.scraping_service.parse_product(content, extraction)
+        return self.parse_executor.submit(self.scraping_service.parse_product, content, extraction).result()
+
+    def process_scraped_data(self, scraped_data, url):
         """
         Process the scraped data and save images.
+
+        Returns:
+            pd.DataFrame: The table created for the product, or None if it could not be created.
         """
         title = scraped_data["title"]
         cleaned_title = title.replace(' ', '_')
@@ -95,10 +251,11 @@ class WebsiteScrapingPipeline(WebsiteScrapingPipelineProtocol):
                 scraped_data["description"], scraped_data["brand"], 
                 scraped_data["tags"], image_names, scraped_data["attribute"]
             )
-            scraped_dfs_list.append(scraped_df)
+            return scraped_df
         except Exception as e:
             self.logger.error(f"Error creating tables for URL {url}: {e}")
             print(f"Error creating tables for URL {url}: {e}")
+            return None
 
     def create_product_path(self, cleaned_title: str) -> str:
         """
@@ -113,8 +270,8 @@ class WebsiteScrapingPipeline(WebsiteScrapingPipelineProtocol):
 
         product_path = os.path.join(base_path, cleaned_title)
         
-        if not os.path.exists(product_path):
-            os.makedirs(product_path)
+        # Several products may share the folder and be scraped at the same time
+        os.makedirs(product_path, exist_ok=True)
 
         return product_path    
 
@@ -122,18 +279,34 @@ class WebsiteScrapingPipeline(WebsiteScrapingPipelineProtocol):
     def download_images(self, images, product_path):
         """
         Download and save images.
+
+        The images are downloaded by the image downloader, which streams them to disk and
+        stores once the images shared by several products.
         """
-        image_names = []
+        if self.replay:
+            # The images were downloaded when the pages were archived
+            return [f'product_image_{idx}.jpg' for idx in range(1, len(images) + 1)
+                    if os.path.exists(os.path.join(product_path, f'product_image_{idx}.jpg'))]
+
+        downloads = []
         for idx, img in enumerate(images, start=1):
             img_url = img['src']
             if img_url.startswith("//"):
                 img_url = "https:" + img_url
 
+            full_path = os.path.join(product_path, f'product_image_{idx}.jpg')
+            # Downloaded by the interrupted run this one resumes
+            if self.scrape_ledger.image_source(full_path) == img_url and os.path.exists(full_path):
+                downloads.append((idx, img_url, full_path, None))
+                continue
+            downloads.append((idx, img_url, full_path, self.image_downloader.submit(img_url, full_path)))
+
+        image_names = []
+        for idx, img_url, full_path, download in downloads:
             try:
-                img_data = requests.get(img_url).content
-                full_path = os.path.join(product_path, f'product_image_{idx}.jpg')
-                with open(full_path, 'wb') as handler:
-                    handler.write(img_data)
+                if download is not None:
+                    download.result()
+                    self.scrape_ledger.record_image(full_path, img_url)
                 image_names.append(f'product_image_{idx}.jpg')
             except Exception as e:
                 self.logger.error(f"Error downloading/saving image {img_url}: {e}")
@@ -141,19 +314,25 @@ class WebsiteScrapingPipeline(WebsiteScrapingPipelineProtocol):
 
         return image_names
 
-    def save_scraped_data(self, scraped_dfs_list):
+    def save_scraped_data(self, products_count):
         """
-        Save the scraped data.
+        Save the scraped data, merging the stream of product tables into the CSV files.
+
+        The scrape ledger is cleared once the data is saved, so a failed save can be retried
+        by resuming the run.
         """
-        if scraped_dfs_list:
+        if products_count:
             try:
-                all_scraped_data = pd.concat(scraped_dfs_list, ignore_index=True)
-                self.tables_factory_service.save_products_csv(all_scraped_data)
+                self.tables_factory_service.save_products_stream()
                 path = files_output_path('files\\images', '')
                 print(f'The images have been saved to {path}')
             except Exception as e:
-                self.logger.error(f"Error saving concatenated data: {e}")
-                print(f"Error saving concatenated data: {e}")
+                self.logger.error(f"Error saving scraped data: {e}")
+                print(f"Error saving scraped data: {e}")
+                return
         else:
-            print("No dataframes to concatenate and save.")
-            self.logger.info("No dataframes to concatenate and save.")
\ No newline at end of file
+            print("No products to save.")
+            self.logger.info("No products to save.")
+
+        # The scraped data is saved, the next run must scrape the URLs again
+        self.scrape_ledger.clear()
\ No newline at end of file
@@ -40,6 +40,59 @@ def test_create_paths_table(mock_rename, mock_files_output_path, mock_read_csv):
     assert len(paths_df) == 2
     mock_rename.assert_called()
 
+@patch('src.application.services.images_factory_service.pd.read_csv')
+@patch('src.application.services.images_factory_service.files_output_path')
+def test_create_paths_table_renames_the_images_of_the_parent_folder(mock_files_output_path, mock_read_csv, tmpdir):
+    # Arrange
+    mock_files_output_path.return_value = str(tmpdir)
+    mock_read_csv.return_value = pd.DataFrame({
+        'name': ['Product 1', 'Product 1 - 1 kg', 'Product 2'],
+        'image_id/gallery_image_ids': ['product_image_1.jpg', 'product_image_2.jpg', float('nan')],
+        'sku': ['sku1', 'sku1-1', 'sku2'],
+        'parent_id': [float('nan'), 'sku1', float('nan')]
+    })
+    os.makedirs(os.path.join(tmpdir, 'Product_1'))
+    for name in ('product_image_1.jpg', 'product_image_2.jpg'):
+        open(os.path.join(tmpdir, 'Product_1', name), 'wb').close()
+    service = ImagesFactoryService()
+
+    # Act
+    paths_df = service.create_paths_table()
+    # The images were renamed by the first run
+    rerun_paths_df = service.create_paths_table()
+
+    # Assert
+    expected_routes = [os.path.join(tmpdir, 'Product_1', 'product_image_1_sku1.jpg'),
+                       os.path.join(tmpdir, 'Product_1', 'product_image_2_sku1-1.jpg')]
+    assert paths_df['name'].tolist() == ['Product 1', 'Product 1']
+    assert paths_df['route'].tolist() == expected_routes
+    assert rerun_paths_df['route'].tolist() == expected_routes
+    assert sorted(os.listdir(os.path.join(tmpdir, 'Product_1'))) == ['product_image_1_sku1.jpg', 'product_image_2_sku1-1.jpg']
+
+@patch('src.application.services.images_factory_service.pd.read_csv')
+@patch('src.application.services.images_factory_service.files_output_path')
+def test_create_paths_table_strips_the_names_of_the_gallery(mock_files_output_path, mock_read_csv, tmpdir):
+    # Arrange
+    mock_files_output_path.return_value = str(tmpdir)
+    mock_read_csv.return_value = pd.DataFrame({
+        'name': ['Product 1'],
+        'image_id/gallery_image_ids': ['product_image_1.jpg, product_image_2.jpg'],
+        'sku': ['sku1'],
+        'parent_id': [float('nan')]
+    })
+    os.makedirs(os.path.join(tmpdir, 'Product_1'))
+    for name in ('product_image_1.jpg', 'product_image_2.jpg'):
+        open(os.path.join(tmpdir, 'Product_1', name), 'wb').close()
+    service = ImagesFactoryService()
+
+    # Act
+    paths_df = service.create_paths_table()
+
+    # Assert
+    assert paths_df['image_id'].tolist() == ['product_image_1.jpg', 'product_image_2.jpg']
+    assert paths_df['route'].tolist() == [os.path.join(tmpdir, 'Product_1', 'product_image_1_sku1.jpg'),
+                                          os.path.join(tmpdir, 'Product_1', 'product_image_2_sku1.jpg')]
+
 @patch('src.application.services.images_factory_service.pd.read_csv')
 @patch('src.application.services.images_factory_service.files_output_path')
 def test_update_wc_table(mock_files_output_path, mock_read_csv):
@@ -56,6 +109,28 @@ def test_update_wc_table(mock_files_output_path, mock_read_csv):
     assert 'image_id/gallery_image_ids' in updated_df.columns
     assert updated_df.loc[updated_df['sku'] == 'sku1', 'image_id/gallery_image_ids'].values[0] == 'http://example.com/image1.jpg'
 
+@patch('src.application.services.images_factory_service.pd.read_csv')
+@patch('src.application.services.images_factory_service.files_output_path')
+def test_update_wc_table_with_partial_upload_results(mock_files_output_path, mock_read_csv):
+    # Arrange
+    mock_files_output_path.side_effect = lambda *args: 'mock/path/' + '/'.join(args)
+    mock_read_csv.return_value = pd.DataFrame({
+        'name': ['Product1', 'Product2', 'Product3'],
+        'image_id/gallery_image_ids': ['image1.jpg, image2.jpg', 'image3.jpg', 'image4.jpg'],
+        'sku': ['sku1', 'sku2', 'sku3'],
+        'parent_id': ['', '', '']
+    })
+    service = ImagesFactoryService()
+    paths_df = pd.DataFrame({'sku': ['sku1', 'sku1', 'sku2', 'sku3'], 'route': ['r1', 'r2', 'r3', 'r4']})
+    # The second image of sku1 failed, and the upload stopped before sku3
+    image_urls = [(2, None), (0, 'http://example.com/image1.jpg'), (1, None)]
+
+    # Act
+    updated_df = service.update_wc_table(paths_df, image_urls)
+
+    # Assert
+    assert updated_df['image_id/gallery_image_ids'].tolist() == ['http://example.com/image1.jpg', '', 'image4.jpg']
+
 @patch('src.application.services.images_factory_service.pd.read_csv')
 @patch('src.application.services.images_factory_service.files_output_path')
 @patch('src.application.services.images_factory_service.pd.DataFrame.to_csv')
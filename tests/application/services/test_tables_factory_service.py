@@ -1,7 +1,10 @@
+import os
 import pandas as pd
 import pytest
 from unittest.mock import patch, MagicMock
 from src.application.services import TablesFactoryService
+from src.domain.tables import ProductSchema
+from src.config.config import SCRAPED_PRODUCTS_CSV, SCRAPED_DESCRIPTIONS_CSV
 
 # Mock data for testing
 MOCK_PRODUCT_DATA = {
@@ -20,13 +23,13 @@ MOCK_TAGS = ["tag1", "tag2"]
 MOCK_IMAGE_NAMES = ["image1.jpg", "image2.jpg"]
 MOCK_ATTRIBUTE_NAME = "Color"
 
-@patch('src.application.services.tables_factory_service.TableDefinitions.product_table')
+@patch('src.application.services.tables_factory_service.TableDefinitions.product_schema')
 @patch('src.application.services.tables_factory_service.files_output_path')
 @patch('src.application.services.tables_factory_service.setup_logging')
-def test_create_tables(mock_setup_logging, mock_files_output_path, mock_product_table):
+def test_create_tables(mock_setup_logging, mock_files_output_path, mock_product_schema):
     # Arrange
     mock_files_output_path.return_value = 'mock/path'
-    mock_product_table.return_value = pd.DataFrame(columns=[
+    mock_product_schema.return_value = ProductSchema.from_columns([
         'type', 'featured', 'catalog_visibility', 'tax_status', 'stock_status',
         'backorders', 'sold_individually', 'sku', 'parent_id', 'name', 'price',
         'regular_price', 'description', 'tag_ids', 'image_id/gallery_image_ids',
@@ -53,6 +56,48 @@ def test_create_tables(mock_setup_logging, mock_files_output_path, mock_product_
     assert 'sku' in result_df.columns
     assert result_df.loc[0, 'sku'] == "sku1"
 
+@patch('src.application.services.tables_factory_service.TableDefinitions.product_schema')
+@patch('src.application.services.tables_factory_service.setup_logging')
+def test_create_table_builds_the_records_of_several_products_at_once(mock_setup_logging, mock_product_schema):
+    # Arrange
+    mock_product_schema.return_value = ProductSchema.from_columns([
+        'type', 'sku', 'name', 'description', 'price', 'attributes', 'attributes.1', 'image_id/gallery_image_ids', 'parent_id'
+    ])
+    service = TablesFactoryService()
+    records = service.create_records(MOCK_PRODUCT_DATA, MOCK_TITLE, MOCK_PRICE, MOCK_DESCRIPTION, MOCK_BRAND,
+                                     MOCK_TAGS, ['image1.jpg'], MOCK_ATTRIBUTE_NAME)
+    records += service.create_records({"product": {"variants": [{"sku": "sku3"}]}}, "Simple", 5.0, "Desc", MOCK_BRAND,
+                                      [], [], MOCK_ATTRIBUTE_NAME)
+
+    # Act
+    result_df = service.create_table(records)
+
+    # Assert
+    assert list(result_df.columns) == ['type', 'sku', 'name', 'description', 'price', 'attributes', 'attributes',
+                                       'image_id/gallery_image_ids', 'parent_id']
+    assert result_df['sku'].tolist() == ['sku1', 'sku2', 'sku3']
+    assert result_df['type'].tolist() == ['variable', 'variation', 'simple']
+    assert result_df['parent_id'].tolist() == ['', 'sku1', '']
+    # The variant without image and the columns the records do not fill are left empty
+    assert result_df['image_id/gallery_image_ids'].tolist() == ['image1.jpg', '', '']
+    assert result_df['price'].tolist() == [10.0, 20.0, 5.0]
+
+@patch('src.application.services.tables_factory_service.TableDefinitions.product_schema')
+@patch('src.application.services.tables_factory_service.setup_logging')
+def test_create_records_of_a_product_without_variants(mock_setup_logging, mock_product_schema):
+    # Arrange
+    mock_product_schema.return_value = ProductSchema.from_columns(['type', 'sku', 'name', 'price'])
+    service = TablesFactoryService()
+
+    # Act
+    records = service.create_records({"product": {}}, "Simple", 5.0, "Desc", MOCK_BRAND, [], [], MOCK_ATTRIBUTE_NAME)
+
+    # Assert
+    result_df = service.create_table(records)
+    assert result_df['type'].tolist() == ['simple']
+    assert result_df['sku'].tolist() == ['']
+    assert result_df['name'].tolist() == ['Simple']
+
 @patch('src.application.services.tables_factory_service.files_output_path')
 @patch('src.application.services.tables_factory_service.pd.DataFrame.to_csv')
 def test_save_products_csv(mock_to_csv, mock_files_output_path):
@@ -66,3 +111,51 @@ def test_save_products_csv(mock_to_csv, mock_files_output_path):
 
     # Assert
     mock_to_csv.assert_called_once_with('mock/path/files/tables/scraped-products.csv', index=False, encoding='utf-8')
+
+@patch('src.application.services.tables_factory_service.TableDefinitions.product_schema')
+@patch('src.application.services.tables_factory_service.files_output_path')
+def test_save_products_stream_writes_the_same_csv_files(mock_files_output_path, mock_product_schema, tmpdir):
+    # Arrange
+    mock_product_schema.return_value = ProductSchema.from_columns([])
+    mock_files_output_path.side_effect = lambda folder, name: os.path.join(tmpdir, name)
+    service = TablesFactoryService()
+    columns = ['sku', 'name', 'description', 'regular_price', 'attributes', 'attributes']
+    dfs = [
+        pd.DataFrame([['sku1', 'Producto ñ, "uno"', 'Desc\nline', 10.5, 'Color', 'Rojo']], columns=columns),
+        pd.DataFrame([['sku2', 'Product 2', '', '', 'Color', 'Azul'],
+                      ['sku3', 'Product 3', 'Desc 3', 20.0, '', '']], columns=columns)
+    ]
+    service.save_products_csv(pd.concat(dfs, ignore_index=True))
+    expected = {name: open(os.path.join(tmpdir, name), 'rb').read() for name in (SCRAPED_PRODUCTS_CSV, SCRAPED_DESCRIPTIONS_CSV)}
+
+    # Act
+    service.start_products_stream()
+    for df in dfs:
+        service.append_products(df)
+    saved_rows = service.save_products_stream(chunk_rows=2)
+
+    # Assert
+    assert saved_rows == 3
+    for name, content in expected.items():
+        assert open(os.path.join(tmpdir, name), 'rb').read() == content
+
+@patch('src.application.services.tables_factory_service.TableDefinitions.product_schema')
+@patch('src.application.services.tables_factory_service.files_output_path')
+def test_start_products_stream_resumes_from_the_offset(mock_files_output_path, mock_product_schema, tmpdir):
+    # Arrange
+    mock_files_output_path.side_effect = lambda folder, name: os.path.join(tmpdir, name)
+    mock_product_schema.return_value = ProductSchema.from_columns([])
+    service = TablesFactoryService()
+    service.start_products_stream()
+    offset = service.append_products(pd.DataFrame({'sku': ['sku1'], 'description': ['Desc 1']}))
+    # Written when the interrupted run stopped, before its URL was completed
+    service.append_products(pd.DataFrame({'sku': ['sku2'], 'description': ['Desc 2']}))
+
+    # Act
+    service.start_products_stream(offset)
+    service.append_products(pd.DataFrame({'sku': ['sku3'], 'description': ['Desc 3']}))
+    saved_rows = service.save_products_stream()
+
+    # Assert
+    assert saved_rows == 2
+    assert pd.read_csv(os.path.join(tmpdir, SCRAPED_PRODUCTS_CSV))['sku'].tolist() == ['sku1', 'sku3']
@@ -2,7 +2,8 @@ import os
 import logging
 import pytest
 from unittest.mock import patch, MagicMock
-from src.common.utils import files_output_path, setup_logging
+from src.common.utils import files_output_path, setup_logging, canonicalize_url, parse_retry_after
+
 
 def test_files_output_path(tmpdir):
     # Arrange
@@ -18,6 +19,7 @@ def test_files_output_path(tmpdir):
     assert output_path == expected_path
     assert os.path.exists(os.path.dirname(output_path))
 
+
 @patch('src.common.utils.files_output_path')
 @patch('src.common.utils.os.makedirs')
 @patch('src.common.utils.logging.getLogger')
@@ -43,4 +45,39 @@ def test_setup_logging(mock_file_handler, mock_get_logger, mock_makedirs, mock_f
     mock_logger.addHandler.assert_called_once_with(mock_handler)
     mock_logger.setLevel.assert_called_once_with(logging.DEBUG)
     mock_get_logger.assert_called_once_with(service_name)
-    assert logger == mock_logger
\ No newline at end of file
+    assert logger == mock_logger
+
+
+def test_canonicalize_url():
+    # Arrange
+    ignored_params = ('variant', 'utm_*')
+
+    # Act
+    canonical_urls = {
+        canonicalize_url(url, ignored_params) for url in (
+            'https://www.example.com/collections/all/products/product1',
+            'https://www.example.com/collections/all/products/product1/',
+            'https://www.example.com/collections/all/products/product1?variant=123',
+            'https://www.example.com/collections/all/products/product1#reviews',
+            'HTTPS://WWW.EXAMPLE.COM:443/collections/all/products/product1?utm_source=newsletter',
+        )
+    }
+
+    # Assert
+    assert canonical_urls == {'https://www.example.com/collections/all/products/product1'}
+    assert canonicalize_url('https://www.example.com/collections/all?page=2&sort_by=price', ignored_params) == \
+        'https://www.example.com/collections/all?page=2&sort_by=price'
+    assert canonicalize_url('https://www.example.com/products/Product1') == 'https://www.example.com/products/Product1'
+    assert canonicalize_url('https://www.example.com/products/Product1', lowercase_path=True) == 'https://www.example.com/products/product1'
+
+
+def test_parse_retry_after():
+    # Arrange
+    responses = [MagicMock(headers=headers) for headers in
+                 ({'Retry-After': '5'}, {'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'}, {'Retry-After': 'soon'}, {})]
+
+    # Act
+    delays = [parse_retry_after(response) for response in responses]
+
+    # Assert
+    assert delays == [5.0, 0.0, None, None]
@@ -0,0 +1,46 @@
+import pytest
+from src.common.visited_index import url_fingerprint, FingerprintIndex, BloomFilterIndex, create_visited_index
+
+def test_url_fingerprint():
+    # Act
+    fingerprint = url_fingerprint('https://www.example.com/products/product1')
+
+    # Assert
+    assert 0 <= fingerprint < 2 ** 64
+    assert fingerprint == url_fingerprint('https://www.example.com/products/product1')
+    assert fingerprint != url_fingerprint('https://www.example.com/products/product2')
+
+def test_fingerprint_index():
+    # Arrange
+    index = FingerprintIndex()
+
+    # Act
+    index.add('https://www.example.com/products/product1')
+    index.add('https://www.example.com/products/product1')
+
+    # Assert
+    assert 'https://www.example.com/products/product1' in index
+    assert 'https://www.example.com/products/product2' not in index
+    assert len(index) == 1
+
+def test_bloom_filter_index_error_rate():
+    # Arrange
+    index = BloomFilterIndex(capacity=5000, error_rate=0.01)
+    added = [f'https://www.example.com/products/product{n}' for n in range(5000)]
+
+    # Act
+    for url in added:
+        index.add(url)
+    false_positives = sum(f'https://www.example.com/pages/page{n}' in index for n in range(5000))
+
+    # Assert
+    assert all(url in index for url in added)
+    assert false_positives < 5000 * 0.02
+    assert len(index._bits) < 8000
+
+def test_create_visited_index():
+    # Act & Assert
+    assert isinstance(create_visited_index('fingerprint'), FingerprintIndex)
+    assert isinstance(create_visited_index('bloom', 1000, 0.01), BloomFilterIndex)
+    with pytest.raises(ValueError):
+        create_visited_index('other')
@@ -2,7 +2,7 @@ import pytest
 from src.config.ioc import IoCContainer
 from src.config.ioc import ioc_config
 from src.application.services import TablesFactoryService, URLsFactoryService, ImagesFactoryService, DataPreparationService
-from src.infrastructure.services import BSScrapingService, WPImagesService, BSCrawlingWebService, WCUploadService
+from src.infrastructure.services import BSScrapingService, WPImagesService, BSCrawlingWebService, WCUploadService, HttpClient
 
 def test_ioc_config():
     # Act
@@ -17,4 +17,9 @@ def test_ioc_config():
     assert isinstance(container.config('images_factory_service'), ImagesFactoryService)
     assert isinstance(container.config('wp_images_service'), WPImagesService)
     assert isinstance(container.config('data_preparation_service'), DataPreparationService)
-    assert isinstance(container.config('wc_upload_service'), WCUploadService)
\ No newline at end of file
+    assert isinstance(container.config('wc_upload_service'), WCUploadService)
+    assert isinstance(container.config('http_client'), HttpClient)
+    assert container.config('crawling_web_service').http_client is container.config('http_client')
+    assert container.config('scraping_service').http_client is container.config('http_client')
+    assert container.config('image_downloader').http_client is container.config('http_client')
+    assert container.config('wp_images_service').manifest is container.config('upload_manifest')
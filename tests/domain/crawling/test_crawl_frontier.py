@@ -0,0 +1,33 @@
+from src.domain.crawling import CrawlFrontier, FrontierEntry
+
+def test_frontier_is_fifo_with_equal_priorities():
+    # Arrange
+    frontier = CrawlFrontier()
+
+    # Act
+    for n in range(5):
+        frontier.push(f'https://www.example.com/page{n}')
+
+    # Assert
+    assert [frontier.pop().url for _ in range(5)] == [f'https://www.example.com/page{n}' for n in range(5)]
+    assert not frontier
+
+def test_frontier_pops_by_priority_then_depth():
+    # Arrange
+    frontier = CrawlFrontier([
+        FrontierEntry('https://www.example.com/collections/all?page=2', 1, 1),
+        FrontierEntry('https://www.example.com/products/deep', 3, 0),
+        FrontierEntry('https://www.example.com/products/shallow', 1, 0),
+    ])
+
+    # Act
+    entries = frontier.entries()
+
+    # Assert
+    assert [entry.url for entry in entries] == [
+        'https://www.example.com/products/shallow',
+        'https://www.example.com/products/deep',
+        'https://www.example.com/collections/all?page=2',
+    ]
+    assert frontier.pop() == FrontierEntry('https://www.example.com/products/shallow', 1, 0)
+    assert len(frontier) == 2
@@ -9,6 +9,13 @@ from src.domain.tables import TableDefinitions
 MOCK_CSV_COLUMNS = ['column1', 'column2', 'column3']
 MOCK_URLS = ['http://example.com', 'http://example.org']
 
+@pytest.fixture(autouse=True)
+def clear_product_schema():
+    # The schema is memoized, every test reads its own sample CSV
+    TableDefinitions.product_schema.cache_clear()
+    yield
+    TableDefinitions.product_schema.cache_clear()
+
 @patch('src.common.utils.files_output_path')
 @patch('pandas.read_csv')
 def test_product_table(mock_read_csv, mock_files_output_path):
@@ -23,6 +30,24 @@ def test_product_table(mock_read_csv, mock_files_output_path):
     assert product_df.empty
     assert list(product_df.columns) == MOCK_CSV_COLUMNS
 
+@patch('src.domain.tables.table_definitions.files_output_path')
+@patch('pandas.read_csv')
+def test_product_schema_is_read_once(mock_read_csv, mock_files_output_path):
+    # Arrange
+    mock_files_output_path.return_value = 'mock/path/to/sample.csv'
+    mock_read_csv.return_value = pd.DataFrame(columns=['sku', 'attributes', 'attributes.1', 'downloads', 'downloads.1'])
+
+    # Act
+    schema = TableDefinitions.product_schema()
+    TableDefinitions.product_table()
+
+    # Assert
+    mock_read_csv.assert_called_once()
+    assert TableDefinitions.product_schema() is schema
+    assert schema.columns == ('sku', 'attributes', 'attributes.1', 'downloads', 'downloads.1')
+    assert schema.header == ('sku', 'attributes', 'attributes', 'downloads', 'downloads')
+    assert schema.row({'sku': 'sku1', 'attributes.1': None, 'downloads': float('nan'), 'other': 'x'}) == ['sku1', '', '', '', '']
+
 def test_urls_table():
     # Act
     urls_df = TableDefinitions.urls_table(MOCK_URLS)
@@ -1,8 +1,34 @@
+import os
 import pytest
 from unittest.mock import patch, MagicMock
-from src.infrastructure.services.bs_crawling_service import BSCrawlingWebService
+from bs4 import BeautifulSoup
+from src.infrastructure.services.bs_crawling_service import BSCrawlingWebService, extract_hrefs
+from concurrent.futures import ThreadPoolExecutor
+from src.infrastructure.services.crawl_frontier_store import CrawlFrontierStore
+from src.infrastructure.services.crawl_shard_queue import CrawlShardQueue
 
-@patch('src.infrastructure.services.bs_crawling_service.requests.get')
+
+def fake_response(content: str):
+    mock_response = MagicMock()
+    mock_response.content = content.encode('utf-8')
+    mock_response.status_code = 200
+    return mock_response
+
+
+@pytest.fixture
+def pages():
+    # The HTML of the pages of the fake site, by URL
+    return {}
+
+
+@pytest.fixture
+def mock_get(pages):
+    with patch('src.infrastructure.services.http_client.HttpClient.get') as mock_get:
+        mock_get.side_effect = lambda url: fake_response(pages[url])
+        yield mock_get
+
+
+@patch('src.infrastructure.services.http_client.HttpClient.get')
 def test_crawling_web(mock_get):
     # Arrange
     service = BSCrawlingWebService()
@@ -31,6 +57,7 @@ def test_crawling_web(mock_get):
     assert isinstance(urls, list)
     assert all(url in urls for url in expected_urls)
 
+
 def test_url_validator():
     # Arrange
     service = BSCrawlingWebService()
@@ -47,6 +74,7 @@ def test_url_validator():
     assert is_valid is True
     assert is_invalid is False
 
+
 def test_update_prefix():
     # Arrange
     service = BSCrawlingWebService()
@@ -58,4 +86,348 @@ def test_update_prefix():
 
     # Assert
     expected_prefix = "https://www.petmarkt.com.mx/collections/all/"
-    assert service.prefix == expected_prefix
\ No newline at end of file
+    assert service.prefix == expected_prefix
+
+
+def test_crawling_web_async(pages, mock_get):
+    # Arrange
+    service = BSCrawlingWebService()
+    service.start_url = "https://www.petmarkt.com.mx/collections/all"
+    service.prefix = "https://www.petmarkt.com.mx/collections/all/products"
+    pages.update({
+        "https://www.petmarkt.com.mx/collections/all": '<a href="/collections/all/products/product1">1</a><a href="/pages/about">About</a>',
+        "https://www.petmarkt.com.mx/collections/all/products/product1": '<a href="/collections/all/products/product2">2</a>',
+        "https://www.petmarkt.com.mx/collections/all/products/product2": '<a href="/collections/all/products/product1">1</a>',
+    })
+
+    # Act
+    urls = service.crawling_web_async(concurrency=4)
+
+    # Assert
+    assert set(urls) == {
+        "https://www.petmarkt.com.mx/collections/all/products/product1",
+        "https://www.petmarkt.com.mx/collections/all/products/product2"
+    }
+    assert mock_get.call_count == 3
+
+
+def test_crawling_web_resumes_from_checkpoint(pages, mock_get, tmpdir):
+    # Arrange
+    store = CrawlFrontierStore(os.path.join(tmpdir, 'crawl.sqlite3'))
+    service = BSCrawlingWebService(frontier_store=store)
+    service.start_url = "https://www.petmarkt.com.mx/collections/all"
+    service.prefix = "https://www.petmarkt.com.mx/collections/all/products"
+    pages.update({
+        "https://www.petmarkt.com.mx/collections/all": '<a href="/collections/all/products/product1">1</a><a href="/collections/all/products/product2">2</a>',
+        "https://www.petmarkt.com.mx/collections/all/products/product1": '',
+        "https://www.petmarkt.com.mx/collections/all/products/product2": '',
+    })
+
+    fake_get = mock_get.side_effect
+
+    def interrupted_get(url):
+        if url.endswith('product2'):
+            raise KeyboardInterrupt
+        return fake_get(url)
+
+    mock_get.side_effect = interrupted_get
+    with pytest.raises(KeyboardInterrupt):
+        service.crawling_web()
+
+    # Act
+    mock_get.reset_mock()
+    mock_get.side_effect = fake_get
+    urls = service.crawling_web()
+
+    # Assert
+    mock_get.assert_called_once_with("https://www.petmarkt.com.mx/collections/all/products/product2")
+    assert urls == [
+        "https://www.petmarkt.com.mx/collections/all/products/product1",
+        "https://www.petmarkt.com.mx/collections/all/products/product2"
+    ]
+
+
+def test_crawling_web_resumes_the_fallback_prefix(pages, mock_get, tmpdir):
+    # Arrange
+    store = CrawlFrontierStore(os.path.join(tmpdir, 'crawl.sqlite3'))
+    service = BSCrawlingWebService(frontier_store=store)
+    service.start_url = "https://www.petmarkt.com.mx/collections/all"
+    service.prefix = "https://www.petmarkt.com.mx/collections/all/products/dogs"
+    pages.update({
+        "https://www.petmarkt.com.mx/collections/all": '<a href="/collections/all/products/cats/product1">1</a><a href="/collections/all/products/cats/product2">2</a>',
+        "https://www.petmarkt.com.mx/collections/all/products/cats/product1": '',
+        "https://www.petmarkt.com.mx/collections/all/products/cats/product2": '',
+    })
+
+    fake_get = mock_get.side_effect
+
+    def interrupted_get(url):
+        if url.endswith('product2'):
+            raise KeyboardInterrupt
+        return fake_get(url)
+
+    mock_get.side_effect = interrupted_get
+    service.update_prefix()
+    with pytest.raises(KeyboardInterrupt):
+        service.crawling_web()
+    # The next run starts again from the configured prefix
+    service = BSCrawlingWebService(frontier_store=store)
+    service.start_url = "https://www.petmarkt.com.mx/collections/all"
+    service.prefix = "https://www.petmarkt.com.mx/collections/all/products/dogs"
+    mock_get.reset_mock()
+    mock_get.side_effect = fake_get
+
+    # Act
+    restored = service.restore_prefix()
+    urls = service.crawling_web()
+
+    # Assert
+    assert restored is True
+    assert service.prefix == "https://www.petmarkt.com.mx/collections/all/products/"
+    mock_get.assert_called_once_with("https://www.petmarkt.com.mx/collections/all/products/cats/product2")
+    assert len(urls) == 2
+
+
+def test_crawling_web_reuses_cached_pages_after_update_prefix(pages, mock_get):
+    # Arrange
+    service = BSCrawlingWebService()
+    service.start_url = "https://www.petmarkt.com.mx/collections/all"
+    service.prefix = "https://www.petmarkt.com.mx/collections/all/products/dogs"
+    pages.update({
+        "https://www.petmarkt.com.mx/collections/all": '<a href="/collections/all/products/dogs/product1">1</a><a href="/collections/all/products/cats/product2">2</a>',
+        "https://www.petmarkt.com.mx/collections/all/products/dogs/product1": '',
+        "https://www.petmarkt.com.mx/collections/all/products/cats/product2": '',
+    })
+    service.crawling_web()
+
+    # Act
+    mock_get.reset_mock()
+    service.update_prefix()
+    urls = service.crawling_web()
+
+    # Assert
+    mock_get.assert_called_once_with("https://www.petmarkt.com.mx/collections/all/products/cats/product2")
+    assert len(urls) == 2
+
+
+def test_crawling_web_visits_url_variants_once(pages, mock_get):
+    # Arrange
+    service = BSCrawlingWebService()
+    service.start_url = "https://www.petmarkt.com.mx/collections/all"
+    service.prefix = "https://www.petmarkt.com.mx/collections/all/products"
+    pages.update({
+        "https://www.petmarkt.com.mx/collections/all": (
+            '<a href="/collections/all/products/product1">1</a>'
+            '<a href="/collections/all/products/product1/">1</a>'
+            '<a href="/collections/all/products/product1?variant=42">1</a>'
+            '<a href="/collections/all/products/product1#reviews">1</a>'
+            '<a href="HTTPS://WWW.PETMARKT.COM.MX/collections/all/products/product1?utm_source=mail">1</a>'
+        ),
+        "https://www.petmarkt.com.mx/collections/all/products/product1": '',
+    })
+
+    # Act
+    urls = service.crawling_web()
+
+    # Assert
+    assert set(urls) == {"https://www.petmarkt.com.mx/collections/all/products/product1"}
+    assert mock_get.call_count == 2
+
+
+def test_crawling_web_fetches_the_urls_as_found(pages, mock_get):
+    # Arrange
+    service = BSCrawlingWebService()
+    service.start_url = "https://www.petmarkt.com.mx/collections/all"
+    service.prefix = "https://www.petmarkt.com.mx/collections/all/products/"
+    pages.update({
+        "https://www.petmarkt.com.mx/collections/all": (
+            '<a href="/collections/all/products/Dog-Food">1</a>'
+            '<a href="/collections/all/products/cat-food?variant=1">2</a>'
+        ),
+        # The product found twice before it is visited is queued once
+        "https://www.petmarkt.com.mx/collections/all/products/Dog-Food": '<a href="/collections/all/products/cat-food">2</a>',
+        "https://www.petmarkt.com.mx/collections/all/products/cat-food?variant=1": '',
+    })
+
+    # Act
+    urls = service.crawling_web()
+
+    # Assert
+    assert urls == ["https://www.petmarkt.com.mx/collections/all/products/Dog-Food",
+                    "https://www.petmarkt.com.mx/collections/all/products/cat-food?variant=1"]
+    assert mock_get.call_count == 3
+
+
+def test_crawling_web_with_case_insensitive_paths(pages, mock_get):
+    # Arrange
+    service = BSCrawlingWebService()
+    service.start_url = "https://www.petmarkt.com.mx/collections/all"
+    service.prefix = "https://www.petmarkt.com.mx/Collections/All/Products/"
+    service.lowercase_paths = True
+    pages.update({
+        "https://www.petmarkt.com.mx/collections/all": (
+            '<a href="/collections/all/products/Dog-Food">1</a>'
+            '<a href="/collections/all/products/dog-food">1</a>'
+        ),
+        "https://www.petmarkt.com.mx/collections/all/products/Dog-Food": '',
+    })
+
+    # Act
+    urls = service.crawling_web()
+
+    # Assert
+    assert urls == ["https://www.petmarkt.com.mx/collections/all/products/Dog-Food"]
+    assert mock_get.call_count == 2
+
+
+# The shard workers run in threads so they share the patched HttpClient.get
+@patch('src.infrastructure.services.bs_crawling_service.ProcessPoolExecutor', ThreadPoolExecutor)
+def test_crawling_web_sharded(pages, mock_get, tmpdir):
+    # Arrange
+    queue = CrawlShardQueue(os.path.join(tmpdir, 'shards.sqlite3'))
+    service = BSCrawlingWebService(shard_queue=queue)
+    service.start_url = "https://www.petmarkt.com.mx/collections/all"
+    service.prefix = "https://www.petmarkt.com.mx/collections/all/products"
+    products = [f"https://www.petmarkt.com.mx/collections/all/products/product{n}" for n in range(8)]
+    pages[service.start_url] = ''.join(f'<a href="{url}">{n}</a>' for n, url in enumerate(products[:4]))
+    for n, url in enumerate(products):
+        pages[url] = f'<a href="{products[(n + 4) % 8]}">next</a><a href="/pages/about">About</a>'
+
+    # Act
+    urls = service.crawling_web_sharded(shards=3)
+
+    # Assert
+    assert sorted(urls) == sorted(products)
+    assert sorted(call.args[0] for call in mock_get.call_args_list) == sorted([service.start_url] + products)
+
+
+# The shard workers run in threads so they share the patched HttpClient.get
+@patch('src.infrastructure.services.bs_crawling_service.ProcessPoolExecutor', ThreadPoolExecutor)
+def test_crawling_web_sharded_warns_that_the_page_limits_are_not_applied(pages, mock_get, tmpdir):
+    # Arrange
+    queue = CrawlShardQueue(os.path.join(tmpdir, 'shards.sqlite3'))
+    service = BSCrawlingWebService(shard_queue=queue)
+    service.logger = MagicMock()
+    service.start_url = "https://www.petmarkt.com.mx/collections/all"
+    service.prefix = "https://www.petmarkt.com.mx/collections/all/products"
+    service.max_pages = 1
+    pages.update({
+        service.start_url: '<a href="/collections/all/products/product1">1</a>',
+        "https://www.petmarkt.com.mx/collections/all/products/product1": '',
+    })
+
+    # Act
+    urls = service.crawling_web_sharded(shards=2)
+
+    # Assert
+    assert 'CRAWL_MAX_PAGES (1)' in service.logger.warning.call_args.args[0]
+    assert urls == ["https://www.petmarkt.com.mx/collections/all/products/product1"]
+    assert mock_get.call_count == 2
+
+
+# The shard workers run in threads so they share the patched HttpClient.get
+@patch('src.infrastructure.services.bs_crawling_service.ProcessPoolExecutor', ThreadPoolExecutor)
+def test_crawling_web_sharded_with_a_mixed_case_start_host(pages, mock_get, tmpdir):
+    # Arrange
+    queue = CrawlShardQueue(os.path.join(tmpdir, 'shards.sqlite3'))
+    service = BSCrawlingWebService(shard_queue=queue)
+    service.start_url = "https://WWW.PetMarkt.com.mx:443/collections/all"
+    service.prefix = "https://www.petmarkt.com.mx/collections/all/products"
+    pages.update({
+        service.start_url: '<a href="/collections/all/products/product1">1</a>',
+        "https://WWW.PetMarkt.com.mx:443/collections/all/products/product1": '',
+    })
+
+    # Act
+    urls = service.crawling_web_sharded(shards=2)
+
+    # Assert
+    assert urls == ["https://WWW.PetMarkt.com.mx:443/collections/all/products/product1"]
+    assert mock_get.call_count == 2
+
+
+def listing_pages():
+    # A listing with two pages of products and a pagination link
+    return {
+        "https://www.petmarkt.com.mx/collections/all": (
+            '<a href="/collections/all?page=2">2</a>'
+            '<a href="/collections/all/products/product1">1</a>'
+            '<a href="/collections/all/products/product2">2</a>'
+        ),
+        "https://www.petmarkt.com.mx/collections/all?page=2": (
+            '<a href="/collections/all/products/product3">3</a>'
+            '<a href="/collections/all/products/product4">4</a>'
+        ),
+        "https://www.petmarkt.com.mx/collections/all/products/product1": '<a href="/collections/all/products/product5">5</a>',
+        "https://www.petmarkt.com.mx/collections/all/products/product2": '',
+        "https://www.petmarkt.com.mx/collections/all/products/product3": '',
+        "https://www.petmarkt.com.mx/collections/all/products/product4": '',
+        "https://www.petmarkt.com.mx/collections/all/products/product5": '',
+    }
+
+
+def test_crawling_web_fetches_products_before_listings_within_the_page_budget(pages, mock_get):
+    # Arrange
+    service = BSCrawlingWebService()
+    service.start_url = "https://www.petmarkt.com.mx/collections/all"
+    service.prefix = "https://www.petmarkt.com.mx/collections/all"
+    service.product_prefix = "https://www.petmarkt.com.mx/collections/all/products"
+    service.max_pages = 3
+    pages.update(listing_pages())
+
+    # Act
+    urls = service.crawling_web()
+
+    # Assert
+    assert [call.args[0] for call in mock_get.call_args_list] == [
+        "https://www.petmarkt.com.mx/collections/all",
+        "https://www.petmarkt.com.mx/collections/all/products/product1",
+        "https://www.petmarkt.com.mx/collections/all/products/product2",
+    ]
+    assert "https://www.petmarkt.com.mx/collections/all/products/product5" in urls
+
+
+def test_crawling_web_async_respects_the_max_depth(pages, mock_get):
+    # Arrange
+    service = BSCrawlingWebService()
+    service.start_url = "https://www.petmarkt.com.mx/collections/all"
+    service.prefix = "https://www.petmarkt.com.mx/collections/all"
+    service.max_depth = 1
+    pages.update(listing_pages())
+
+    # Act
+    urls = service.crawling_web_async(concurrency=2)
+
+    # Assert
+    assert mock_get.call_count == 4
+    assert set(urls) == {
+        "https://www.petmarkt.com.mx/collections/all?page=2",
+        "https://www.petmarkt.com.mx/collections/all/products/product1",
+        "https://www.petmarkt.com.mx/collections/all/products/product2",
+        "https://www.petmarkt.com.mx/collections/all/products/product3",
+        "https://www.petmarkt.com.mx/collections/all/products/product4",
+        "https://www.petmarkt.com.mx/collections/all/products/product5",
+    }
+
+
+def test_extract_hrefs_matches_full_parse():
+    # Arrange
+    html_content = '''
+        <html>
+            <head><a href="/head-link"></a></head>
+            <body>
+                <a href="/collections/all/products/product1?variant=1&amp;ref=home">Product 1</a>
+                <a name="anchor">No href</a>
+                <A HREF='/collections/all/products/product2'>Product 2</A>
+                <script>var html = '<a href="/not-a-link">';</script>
+                <a href>Empty</a>
+            </body>
+        </html>
+    '''.encode('utf-8')
+
+    # Act
+    hrefs = extract_hrefs(html_content)
+
+    # Assert
+    soup = BeautifulSoup(html_content, 'html.parser')
+    assert hrefs == [a.get('href') for a in soup.find_all('a', href=True)]
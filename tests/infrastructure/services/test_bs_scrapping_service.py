@@ -1,9 +1,11 @@
+import json
 import pytest
+import requests
 from unittest.mock import patch, MagicMock
 from src.infrastructure.services.bs_scraping_service import BSScrapingService
 
-@patch('src.infrastructure.services.bs_scraping_service.requests.get')
-def test_scrape(mock_get):
+@patch('src.infrastructure.services.http_client.HttpClient.get')
+def test_scrape_product(mock_get):
     # Arrange
     service = BSScrapingService()
     url = "https://www.example.com/product"
@@ -38,7 +40,7 @@ def test_scrape(mock_get):
     mock_get.return_value = mock_response
 
     # Act
-    result = service.scrape(url)
+    result = service.scrape_product(url).data
 
     # Assert
     expected_keys = {"title", "price", "brand", "description", "tags", "product_data", "attribute", "images"}
@@ -54,3 +56,158 @@ def test_scrape(mock_get):
     assert isinstance(result["product_data"], dict)
     assert isinstance(result["attribute"], str)
     assert isinstance(result["images"], list)
+
+@patch('src.infrastructure.services.http_client.HttpClient.get')
+def test_scrape_product_not_modified(mock_get):
+    # Arrange
+    service = BSScrapingService()
+    mock_response = MagicMock()
+    mock_response.status_code = 304
+    mock_get.return_value = mock_response
+
+    # Act
+    result = service.scrape_product("https://www.example.com/product", {'etag': '"abc"', 'last_modified': 'Wed, 01 May 2024 10:00:00 GMT'})
+
+    # Assert
+    assert result.not_modified is True
+    assert result.data is None
+    headers = mock_get.call_args.kwargs['headers']
+    assert headers['If-None-Match'] == '"abc"'
+    assert headers['If-Modified-Since'] == 'Wed, 01 May 2024 10:00:00 GMT'
+
+@patch('src.infrastructure.services.http_client.HttpClient.get')
+def test_fetch_product_raises_on_an_error_page(mock_get):
+    # Arrange
+    service = BSScrapingService()
+    mock_response = MagicMock()
+    mock_response.status_code = 404
+    mock_response.content = b'<html>Page not found</html>'
+    mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError('404 Client Error')
+    mock_get.return_value = mock_response
+
+    # Act & Assert
+    with pytest.raises(requests.exceptions.HTTPError):
+        service.fetch_product("https://www.example.com/product")
+
+@patch('src.infrastructure.services.http_client.HttpClient.get')
+def test_scrape_product_returns_the_validators(mock_get):
+    # Arrange
+    service = BSScrapingService()
+    mock_response = MagicMock()
+    mock_response.content = b"""
+        <script data-section-type="static-product">{"product": {"tags": ["tag1"]}}</script>
+        <label class="form-field-title">Size</label>
+    """
+    mock_response.status_code = 200
+    mock_response.headers = {'ETag': '"abc"', 'Last-Modified': 'Wed, 01 May 2024 10:00:00 GMT'}
+    mock_get.return_value = mock_response
+
+    # Act
+    result = service.scrape_product("https://www.example.com/product")
+
+    # Assert
+    assert result.url == "https://www.example.com/product"
+    assert result.data["tags"] == ["tag1"]
+    assert result.data["attribute"] == "Size"
+    assert (result.etag, result.last_modified) == ('"abc"', 'Wed, 01 May 2024 10:00:00 GMT')
+    assert result.not_modified is False
+    assert not hasattr(service, 'soup')
+
+PRODUCT_JSON = {
+    "product": {
+        "title": "Dog Food",
+        "vendor": "Brand Name",
+        "description": "<p>Food for <b>adult</b> dogs &amp; puppies</p>",
+        "compare_at_price": 123450,
+        "tags": ["dogs", "food"],
+        "options": ["Size"],
+        "images": ["//cdn.example.com/food1.jpg", "//cdn.example.com/food2.jpg"],
+        "variants": [{"sku": "sku1", "public_title": "1 kg", "compare_at_price": 123450}]
+    }
+}
+
+def test_parse_product_reads_the_product_json():
+    # Arrange
+    content = f"""
+        <html><body>
+            <script type="application/json" data-section-type='static-product'>{json.dumps(PRODUCT_JSON)}</script>
+        </body></html>
+    """.encode('utf-8')
+
+    # Act
+    with patch('src.infrastructure.services.bs_scraping_service.BeautifulSoup') as mock_soup:
+        result = BSScrapingService.parse_product(content, 'json')
+
+    # Assert
+    mock_soup.assert_not_called()
+    assert result["title"] == "Dog Food"
+    assert result["price"] == "1234.50"
+    assert result["brand"] == "Brand Name"
+    assert result["description"] == "Food for adult dogs & puppies"
+    assert result["attribute"] == "Size"
+    assert result["images"] == [{'src': "//cdn.example.com/food1.jpg"}, {'src': "//cdn.example.com/food2.jpg"}]
+    assert result["tags"] == ["dogs", "food"]
+    assert result["product_data"] == PRODUCT_JSON
+
+def test_parse_product_falls_back_to_the_selectors_for_missing_fields():
+    # Arrange
+    product_json = {"product": dict(PRODUCT_JSON["product"], vendor=None, compare_at_price=None)}
+    content = f"""
+        <html><body>
+            <div id="shopify-section-static-product"><section><article><div class="product-main"><div class="product-details">
+                <div class="product-vendor"><a title="Page Brand">Brand</a></div>
+            </div></div></article></section></div>
+            <div class="full_block_nb medic_price price--compare-at"><div class="money">$1,000.00</div></div>
+            <script data-section-type="static-product">{json.dumps(product_json)}</script>
+        </body></html>
+    """.encode('utf-8')
+
+    # Act
+    result = BSScrapingService.parse_product(content, 'json')
+
+    # Assert
+    assert result["brand"] == "Page Brand"
+    assert result["price"] == "1000.00"
+    assert result["title"] == "Dog Food"
+
+@patch('src.infrastructure.services.http_client.HttpClient.get')
+def test_scrape_product_from_the_product_endpoint(mock_get):
+    # Arrange
+    service = BSScrapingService()
+    service.extraction = 'endpoint'
+    product = dict(PRODUCT_JSON["product"], options=[{"name": "Size", "position": 1, "values": ["1 kg"]}])
+    mock_response = MagicMock()
+    mock_response.content = json.dumps(product).encode('utf-8')
+    mock_response.status_code = 200
+    mock_get.return_value = mock_response
+
+    # Act
+    result = service.fetch_product("https://www.example.com/products/dog-food/")
+    data = BSScrapingService.parse_product(result.content, 'endpoint')
+
+    # Assert
+    assert mock_get.call_args.args[0] == "https://www.example.com/products/dog-food.js"
+    assert data["attribute"] == "Size"
+    assert data["product_data"] == {"product": product}
+
+
+@patch('src.infrastructure.services.http_client.HttpClient.get')
+def test_scrape_product_parses_the_endpoint_json_of_a_product_not_on_sale(mock_get):
+    # Arrange
+    service = BSScrapingService()
+    service.extraction = 'endpoint'
+    product = dict(PRODUCT_JSON["product"], compare_at_price=None, price=99900, vendor="",
+                   options=[{"name": "Size", "position": 1, "values": ["1 kg"]}])
+    mock_response = MagicMock()
+    mock_response.content = json.dumps(product).encode('utf-8')
+    mock_response.status_code = 200
+    mock_get.return_value = mock_response
+
+    # Act
+    result = service.scrape_product("https://www.example.com/products/dog-food")
+
+    # Assert
+    assert mock_get.call_args.args[0] == "https://www.example.com/products/dog-food.js"
+    assert result.data["price"] == "999.00"
+    assert result.data["brand"] == ""
+    assert result.data["title"] == "Dog Food"
@@ -0,0 +1,89 @@
+import os
+import pytest
+from src.domain.crawling import CrawlState
+from src.infrastructure.services.crawl_frontier_store import CrawlFrontierStore
+
+START_URL = 'https://www.example.com/collections/all'
+PREFIX = 'https://www.example.com/collections/all/products'
+
+def test_save_and_load(tmpdir):
+    # Arrange
+    store = CrawlFrontierStore(os.path.join(tmpdir, 'crawl.sqlite3'))
+    state = CrawlState(START_URL, PREFIX, persistent=True)
+    state.mark_visited(state.next_entry())
+    state.add_url(PREFIX + '/product1')
+    state.add_url(PREFIX + '/product2')
+    state.complete(START_URL)
+    state.mark_visited(state.next_entry())
+
+    # Act
+    store.save(state)
+    loaded = store.load(START_URL, PREFIX)
+
+    # Assert
+    assert START_URL in loaded.visited and len(loaded.visited) == 1
+    assert list(loaded.frontier) == [PREFIX + '/product1', PREFIX + '/product2']
+    assert loaded.urls == [PREFIX + '/product1', PREFIX + '/product2']
+    assert loaded.finished is False
+
+def test_incremental_checkpoints(tmpdir):
+    # Arrange
+    store = CrawlFrontierStore(os.path.join(tmpdir, 'crawl.sqlite3'))
+    state = CrawlState(START_URL, PREFIX, persistent=True)
+    state.mark_visited(state.next_entry())
+    state.add_url(PREFIX + '/product1')
+    state.complete(START_URL)
+    store.save(state)
+
+    # Act
+    state.mark_visited(state.next_entry())
+    state.complete(PREFIX + '/product1')
+    state.finished = True
+    store.save(state)
+    loaded = store.load(START_URL, PREFIX)
+
+    # Assert
+    assert START_URL in loaded.visited and PREFIX + '/product1' in loaded.visited
+    assert not loaded.frontier
+    assert loaded.urls == [PREFIX + '/product1']
+    assert loaded.finished is True
+
+def test_save_and_load_keeps_depth_and_priority(tmpdir):
+    # Arrange
+    store = CrawlFrontierStore(os.path.join(tmpdir, 'crawl.sqlite3'))
+    state = CrawlState(START_URL, PREFIX, persistent=True)
+    state.mark_visited(state.next_entry())
+    state.add_url(START_URL + '?page=2', 1, 1)
+    state.add_url(PREFIX + '/product1', 1, 0)
+    state.add_url(PREFIX + '/product2', 2, 0)
+
+    # Act
+    store.save(state)
+    loaded = store.load(START_URL, PREFIX)
+
+    # Assert
+    assert [tuple(entry) for entry in loaded.pending_frontier()] == [
+        (START_URL, 0, 0),
+        (PREFIX + '/product1', 1, 0),
+        (PREFIX + '/product2', 2, 0),
+        (START_URL + '?page=2', 1, 1),
+    ]
+
+def test_load_other_crawl_and_clear(tmpdir):
+    # Arrange
+    store = CrawlFrontierStore(os.path.join(tmpdir, 'crawl.sqlite3'))
+    store.save(CrawlState(START_URL, PREFIX))
+
+    # Act & Assert
+    assert store.load(START_URL, 'https://www.example.com/collections/') is None
+    store.clear()
+    assert store.load(START_URL, PREFIX) is None
+
+def test_saved_prefix(tmpdir):
+    # Arrange
+    store = CrawlFrontierStore(os.path.join(tmpdir, 'crawl.sqlite3'))
+    store.save(CrawlState(START_URL, PREFIX))
+
+    # Act & Assert
+    assert store.saved_prefix(START_URL) == PREFIX
+    assert store.saved_prefix('https://www.example.com/') is None
@@ -0,0 +1,124 @@
+import os
+import time
+from unittest.mock import patch
+from src.infrastructure.services.crawl_shard_queue import CrawlShardQueue
+
+START_URL = 'https://www.example.com/collections/all'
+PREFIX = 'https://www.example.com/collections/all/products'
+
+def shard_urls(shard, shards, count):
+    # URLs of the catalog that belong to a given shard
+    urls = (f'{PREFIX}/product{n}' for n in range(1000))
+    return [url for url in urls if CrawlShardQueue.shard_of(url, shards) == shard][:count]
+
+def pairs(urls):
+    # The links of the tests are their own keys
+    return [(url, url) for url in urls]
+
+def test_links_are_claimed_by_their_shard_only_once(tmpdir):
+    # Arrange
+    queue = CrawlShardQueue(os.path.join(tmpdir, 'shards.sqlite3'))
+    queue.start(START_URL, PREFIX, 2)
+    start_shard = CrawlShardQueue.shard_of(START_URL, 2)
+    links = shard_urls(0, 2, 2) + shard_urls(1, 2, 2)
+
+    # Act
+    assert queue.claim(start_shard, 10) == [(START_URL, START_URL)]
+    queue.complete(START_URL, pairs(links + links[:1]), 2)
+    claimed = {shard: queue.claim(shard, 10) for shard in (0, 1)}
+
+    # Assert
+    assert claimed == {0: pairs(links[:2]), 1: pairs(links[2:])}
+    assert queue.claim(0, 10) == []
+    assert queue.has_pending()
+    assert queue.collected_urls() == links
+
+def test_links_are_enqueued_by_key_and_fetched_as_found(tmpdir):
+    # Arrange
+    queue = CrawlShardQueue(os.path.join(tmpdir, 'shards.sqlite3'))
+    queue.start(START_URL, PREFIX, 1)
+    links = [(PREFIX + '/product1', PREFIX + '/product1?variant=1'), (PREFIX + '/product1', PREFIX + '/product1/')]
+
+    # Act
+    queue.complete(queue.claim(0, 10)[0][0], links, 1)
+
+    # Assert
+    assert queue.claim(0, 10) == [(PREFIX + '/product1', PREFIX + '/product1?variant=1')]
+    assert queue.collected_urls() == [PREFIX + '/product1?variant=1']
+
+def test_has_pending_is_false_when_all_urls_are_completed(tmpdir):
+    # Arrange
+    queue = CrawlShardQueue(os.path.join(tmpdir, 'shards.sqlite3'))
+    queue.start(START_URL, PREFIX, 1)
+
+    # Act
+    queue.complete(queue.claim(0, 10)[0][0], [], 1)
+
+    # Assert
+    assert not queue.has_pending()
+
+def test_start_joins_the_same_crawl_and_release_requeues_claimed_urls(tmpdir):
+    # Arrange
+    queue = CrawlShardQueue(os.path.join(tmpdir, 'shards.sqlite3'))
+    queue.start(START_URL, PREFIX, 1)
+    queue.claim(0, 10)
+
+    # Act
+    joined = queue.start(START_URL, PREFIX, 1)
+    queue.release(0)
+
+    # Assert
+    assert joined is True
+    assert queue.crawl() == {'start_url': START_URL, 'prefix': PREFIX, 'shards': 1}
+    assert queue.claim(0, 10) == [(START_URL, START_URL)]
+
+def test_start_replaces_a_different_crawl(tmpdir):
+    # Arrange
+    queue = CrawlShardQueue(os.path.join(tmpdir, 'shards.sqlite3'))
+    queue.start(START_URL, PREFIX, 1)
+    queue.complete(queue.claim(0, 10)[0][0], pairs([PREFIX + '/product1']), 1)
+
+    # Act
+    joined = queue.start(START_URL, PREFIX, 2)
+
+    # Assert
+    assert joined is False
+    assert queue.collected_urls() == []
+    assert queue.crawl()['shards'] == 2
+
+def test_claim_takes_over_the_urls_of_an_expired_lease(tmpdir):
+    # Arrange
+    queue = CrawlShardQueue(os.path.join(tmpdir, 'shards.sqlite3'), lease=60)
+    queue.start(START_URL, PREFIX, 2)
+    start_shard = CrawlShardQueue.shard_of(START_URL, 2)
+    other_shard = 1 - start_shard
+    links = shard_urls(start_shard, 2, 2)
+    queue.complete(queue.claim(start_shard, 10)[0][0], pairs(links), 2)
+    # The worker of the shard claims its links and dies
+    assert queue.claim(start_shard, 1) == pairs(links[:1])
+
+    # Act
+    claimed_alive = queue.claim(other_shard, 10)
+    with patch('src.infrastructure.services.crawl_shard_queue.time.time', return_value=time.time() + 61):
+        claimed_expired = queue.claim(other_shard, 10)
+
+    # Assert
+    assert claimed_alive == []
+    assert sorted(claimed_expired) == sorted(pairs(links))
+    for url_key, _ in claimed_expired:
+        queue.complete(url_key, [], 2)
+    assert not queue.has_pending()
+
+def test_claim_takes_over_a_shard_no_worker_joined(tmpdir):
+    # Arrange
+    queue = CrawlShardQueue(os.path.join(tmpdir, 'shards.sqlite3'), lease=60)
+    queue.start(START_URL, PREFIX, 2)
+    other_shard = 1 - CrawlShardQueue.shard_of(START_URL, 2)
+
+    # Act
+    with patch('src.infrastructure.services.crawl_shard_queue.time.time', return_value=time.time() + 61):
+        claimed = queue.claim(other_shard, 10)
+
+    # Assert
+    assert claimed == [(START_URL, START_URL)]
+
@@ -0,0 +1,125 @@
+import socket
+import threading
+from unittest.mock import patch
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import urllib3.util.connection
+from src.infrastructure.services.http_client import HttpClient, DNSCache
+
+class CountingHandler(BaseHTTPRequestHandler):
+    """
+    Answer every request and count the TCP connections opened by the clients.
+    """
+    protocol_version = 'HTTP/1.1'
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        CountingHandler.connections += 1
+
+    def do_GET(self):
+        body = b'ok'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def test_requests_reuse_the_pooled_connection():
+    # Arrange
+    server = ThreadingHTTPServer(('127.0.0.1', 0), CountingHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    CountingHandler.connections = 0
+    client = HttpClient(dns_cache_ttl=0)
+
+    # Act
+    responses = [client.get(f'http://127.0.0.1:{server.server_address[1]}/page{n}') for n in range(5)]
+
+    # Assert
+    assert [response.text for response in responses] == ['ok'] * 5
+    assert CountingHandler.connections == 1
+    client.close()
+    server.shutdown()
+
+def test_request_applies_the_default_timeout_and_headers():
+    # Arrange
+    client = HttpClient(timeout=(1, 2), dns_cache_ttl=0)
+
+    with patch.object(client.session, 'request') as mock_request:
+        # Act
+        client.get('https://www.example.com/')
+        client.post('https://www.example.com/media', timeout=60)
+
+    # Assert
+    assert mock_request.call_args_list[0].kwargs['timeout'] == (1, 2)
+    assert mock_request.call_args_list[1].kwargs['timeout'] == 60
+    assert 'gzip' in client.session.headers['Accept-Encoding']
+
+def test_host_pool_sizes_mount_a_dedicated_adapter():
+    # Act
+    client = HttpClient(pool_maxsize=4, host_pool_sizes={'www.example.com': 32}, dns_cache_ttl=0)
+
+    # Assert
+    assert client.session.get_adapter('https://www.example.com/products')._pool_maxsize == 32
+    assert client.session.get_adapter('https://www.other.com/products')._pool_maxsize == 4
+
+@patch('src.infrastructure.services.http_client.socket.getaddrinfo')
+def test_dns_cache_resolves_each_host_once(mock_getaddrinfo):
+    # Arrange
+    mock_getaddrinfo.return_value = [(socket.AF_INET, socket.SOCK_STREAM, 6, '', ('93.184.216.34', 443))]
+    cache = DNSCache(ttl=300)
+
+    # Act
+    addresses = [cache.resolve('www.example.com', 443) for _ in range(3)]
+
+    # Assert
+    assert addresses == [mock_getaddrinfo.return_value] * 3
+    mock_getaddrinfo.assert_called_once()
+
+def test_dns_cache_connects_to_the_next_address_when_one_refuses():
+    # Arrange
+    server = ThreadingHTTPServer(('127.0.0.1', 0), CountingHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    closed = socket.socket()
+    closed.bind(('127.0.0.1', 0))
+    closed_port = closed.getsockname()[1]
+    closed.close()
+    addresses = [(socket.AF_INET, socket.SOCK_STREAM, 6, '', ('127.0.0.1', closed_port)),
+                 (socket.AF_INET, socket.SOCK_STREAM, 6, '', server.server_address)]
+    cache = DNSCache(ttl=300)
+
+    with patch('src.infrastructure.services.http_client.socket.getaddrinfo', return_value=addresses):
+        # Act
+        sock = cache.create_connection(('www.example.com', 80), 5)
+
+    # Assert
+    assert sock.getpeername() == server.server_address
+    sock.close()
+    server.shutdown()
+
+def test_dns_cache_is_scoped_to_the_client():
+    # Arrange
+    server = ThreadingHTTPServer(('127.0.0.1', 0), CountingHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    create_connection = urllib3.util.connection.create_connection
+    client = HttpClient(dns_cache_ttl=300)
+    other_client = HttpClient(dns_cache_ttl=60)
+    addresses = [(socket.AF_INET, socket.SOCK_STREAM, 6, '', ('127.0.0.1', port))]
+
+    with patch('src.infrastructure.services.http_client.socket.getaddrinfo', return_value=addresses) as mock_getaddrinfo:
+        # Act
+        responses = [client.get(f'http://www.example.com:{port}/', headers={'Connection': 'close'}) for _ in range(3)]
+
+    # Assert
+    assert [response.text for response in responses] == ['ok'] * 3
+    mock_getaddrinfo.assert_called_once()
+    assert urllib3.util.connection.create_connection is create_connection
+    assert other_client.dns_cache is not client.dns_cache and other_client.dns_cache.ttl == 60
+    client.close()
+    other_client.close()
+    server.shutdown()
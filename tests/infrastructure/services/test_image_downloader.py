@@ -0,0 +1,119 @@
+import os
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from src.infrastructure.services.image_downloader import ImageDownloader
+
+def mock_response(content: bytes):
+    response = MagicMock()
+    response.headers = {'Content-Length': str(len(content))}
+    response.iter_content.side_effect = lambda chunk_size: (content[i:i + chunk_size] for i in range(0, len(content), chunk_size))
+    return response
+
+def test_download_streams_the_image_once_per_url(tmpdir):
+    # Arrange
+    http_client = MagicMock()
+    http_client.get.side_effect = lambda url, stream: mock_response(b'image-data' * 10)
+    downloader = ImageDownloader(http_client, workers=4, chunk_size=16)
+    paths = [os.path.join(tmpdir, f'product_image_{n}.jpg') for n in range(3)]
+
+    # Act
+    futures = [downloader.submit('https://cdn.example.com/shared.jpg', path) for path in paths]
+    results = sorted(future.result() for future in futures)
+    downloader.close()
+
+    # Assert
+    http_client.get.assert_called_once_with('https://cdn.example.com/shared.jpg', stream=True)
+    assert results == ['downloaded', 'linked', 'linked']
+    assert all(open(path, 'rb').read() == b'image-data' * 10 for path in paths)
+    assert os.path.samefile(paths[0], paths[1]) and os.path.samefile(paths[0], paths[2])
+    assert not [name for name in os.listdir(tmpdir) if name.endswith('.part')]
+
+def test_download_links_the_images_with_the_same_content(tmpdir):
+    # Arrange
+    http_client = MagicMock()
+    http_client.get.side_effect = lambda url, stream: mock_response(b'same-image')
+    downloader = ImageDownloader(http_client, workers=1)
+    first_path, second_path = os.path.join(tmpdir, 'first.jpg'), os.path.join(tmpdir, 'second.jpg')
+
+    # Act
+    first = downloader.download('https://cdn.example.com/a.jpg', first_path)
+    second = downloader.download('https://cdn.example.com/b.jpg', second_path)
+
+    # Assert
+    assert (first, second) == ('downloaded', 'linked')
+    assert http_client.get.call_count == 2
+    assert os.path.samefile(first_path, second_path)
+
+def test_download_links_the_same_content_downloaded_concurrently(tmpdir):
+    # Arrange
+    http_client = MagicMock()
+    http_client.get.side_effect = lambda url, stream: mock_response(b'same-image')
+    downloader = ImageDownloader(http_client, workers=2)
+    paths = [os.path.join(tmpdir, 'first.jpg'), os.path.join(tmpdir, 'second.jpg')]
+    replace = os.replace
+
+    def slow_replace(source, destination):
+        # The other download finishes while the first one is moved into place
+        time.sleep(0.1)
+        replace(source, destination)
+
+    # Act
+    with patch('src.infrastructure.services.image_downloader.os.replace', side_effect=slow_replace):
+        futures = [downloader.submit(f'https://cdn.example.com/{n}.jpg', path) for n, path in enumerate(paths)]
+        results = sorted(future.result() for future in futures)
+    downloader.close()
+
+    # Assert
+    assert results == ['downloaded', 'linked']
+    assert os.path.samefile(paths[0], paths[1])
+    assert not [name for name in os.listdir(tmpdir) if name.endswith('.part')]
+
+def test_download_skips_the_file_with_the_same_size(tmpdir):
+    # Arrange
+    path = os.path.join(tmpdir, 'product_image_1.jpg')
+    with open(path, 'wb') as image:
+        image.write(b'old-image')
+    response = mock_response(b'new-image')
+    http_client = MagicMock()
+    http_client.get.return_value = response
+    downloader = ImageDownloader(http_client)
+
+    # Act
+    result = downloader.download('https://cdn.example.com/1.jpg', path)
+
+    # Assert
+    assert result == 'skipped'
+    response.iter_content.assert_not_called()
+    assert open(path, 'rb').read() == b'old-image'
+
+def test_download_failure_is_retried_by_the_next_request(tmpdir):
+    # Arrange
+    path = os.path.join(tmpdir, 'product_image_1.jpg')
+    failing = mock_response(b'image')
+    failing.iter_content.side_effect = ConnectionError('connection reset')
+    http_client = MagicMock()
+    http_client.get.side_effect = [failing, mock_response(b'image')]
+    downloader = ImageDownloader(http_client)
+
+    # Act
+    with pytest.raises(ConnectionError):
+        downloader.download('https://cdn.example.com/1.jpg', path)
+    result = downloader.download('https://cdn.example.com/1.jpg', path)
+
+    # Assert
+    assert result == 'downloaded'
+    assert os.listdir(tmpdir) == ['product_image_1.jpg']
+
+def test_download_failure_is_raised_when_the_partial_file_cannot_be_removed(tmpdir):
+    # Arrange
+    failing = mock_response(b'image')
+    failing.iter_content.side_effect = ConnectionError('connection reset')
+    http_client = MagicMock()
+    http_client.get.return_value = failing
+    downloader = ImageDownloader(http_client)
+
+    with patch('src.infrastructure.services.image_downloader.os.remove', side_effect=PermissionError('file in use')):
+        # Act & Assert
+        with pytest.raises(ConnectionError):
+            downloader.download('https://cdn.example.com/1.jpg', os.path.join(tmpdir, 'product_image_1.jpg'))
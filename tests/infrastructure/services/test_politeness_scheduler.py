@@ -0,0 +1,82 @@
+import time
+import threading
+import pytest
+from unittest.mock import patch, MagicMock
+from src.infrastructure.services.politeness_scheduler import PolitenessScheduler
+
+def make_response(status_code, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+def test_request_retries_throttled_response_honouring_retry_after():
+    # Arrange
+    clock = {'now': 0.0}
+    mock_sleep = MagicMock(side_effect=lambda seconds: clock.update(now=clock['now'] + seconds))
+    scheduler = PolitenessScheduler(requests_per_second=1000)
+    throttled, ok = make_response(429, {'Retry-After': '3'}), make_response(200)
+    send = MagicMock(side_effect=[throttled, ok])
+
+    # Act
+    with patch('src.infrastructure.services.politeness_scheduler.time.monotonic', side_effect=lambda: clock['now']), \
+         patch('src.infrastructure.services.politeness_scheduler.time.sleep', mock_sleep):
+        response = scheduler.request('https://www.example.com/products/1', send)
+
+    # Assert
+    assert response.status_code == 200
+    assert send.call_count == 2
+    assert mock_sleep.call_args_list[0].args[0] == pytest.approx(3, abs=0.1)
+    throttled.close.assert_called_once()
+    ok.close.assert_not_called()
+
+def test_request_gives_up_after_max_retries():
+    # Arrange
+    scheduler = PolitenessScheduler(requests_per_second=1000, max_retries=2, max_backoff=0)
+    send = MagicMock(return_value=make_response(503))
+
+    # Act
+    response = scheduler.request('https://www.example.com/products/1', send)
+
+    # Assert
+    assert response.status_code == 503
+    assert send.call_count == 3
+
+def test_slot_limits_concurrency_per_host():
+    # Arrange
+    scheduler = PolitenessScheduler(max_concurrency=2, requests_per_second=1000)
+    active = {'now': 0, 'max': 0}
+    lock = threading.Lock()
+
+    def send():
+        with lock:
+            active['now'] += 1
+            active['max'] = max(active['max'], active['now'])
+        time.sleep(0.02)
+        with lock:
+            active['now'] -= 1
+        return make_response(200)
+
+    # Act
+    threads = [threading.Thread(target=scheduler.request, args=('https://www.example.com/', send)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Assert
+    assert active['max'] == 2
+
+def test_rate_is_limited_per_host():
+    # Arrange
+    scheduler = PolitenessScheduler(requests_per_second=20)
+    send = MagicMock(return_value=make_response(200))
+
+    # Act
+    start = time.monotonic()
+    for _ in range(6):
+        scheduler.request('https://www.example.com/', send)
+    elapsed = time.monotonic() - start
+
+    # Assert
+    assert elapsed >= 0.2
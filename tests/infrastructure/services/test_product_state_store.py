@@ -0,0 +1,35 @@
+import os
+import pandas as pd
+import pytest
+from src.infrastructure.services.product_state_store import ProductStateStore
+
+URL = 'https://www.example.com/collections/all/products/product1'
+
+def test_save_and_get(tmpdir):
+    # Arrange
+    store = ProductStateStore(os.path.join(tmpdir, 'products.sqlite3'))
+    df = pd.DataFrame([['variable', 'sku1', 'Color', 'Red, Blue'], ['variation', 'sku2', 'Color', 'Blue']],
+                      columns=['type', 'sku', 'attributes', 'attributes'])
+
+    # Act
+    store.save(URL, df, lastmod='2024-05-01', etag='"abc"', last_modified='Wed, 01 May 2024 10:00:00 GMT')
+    state = store.get(URL)
+
+    # Assert
+    assert state['lastmod'] == '2024-05-01'
+    assert state['etag'] == '"abc"'
+    assert state['last_modified'] == 'Wed, 01 May 2024 10:00:00 GMT'
+    assert list(state['df'].columns) == ['type', 'sku', 'attributes', 'attributes']
+    assert state['df'].values.tolist() == df.values.tolist()
+
+def test_touch_and_missing_url(tmpdir):
+    # Arrange
+    store = ProductStateStore(os.path.join(tmpdir, 'products.sqlite3'))
+    store.save(URL, pd.DataFrame({'sku': ['sku1']}), lastmod='2024-05-01')
+
+    # Act
+    store.touch(URL, '2024-06-01')
+
+    # Assert
+    assert store.get(URL)['lastmod'] == '2024-06-01'
+    assert store.get('https://www.example.com/other') is None
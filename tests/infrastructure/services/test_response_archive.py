@@ -0,0 +1,38 @@
+import os
+import gzip
+from src.infrastructure.services.response_archive import ResponseArchive
+
+URL = 'https://www.example.com/products/product1'
+
+def test_append_and_read_the_latest_response(tmpdir):
+    # Arrange
+    archive = ResponseArchive(os.path.join(tmpdir, 'pages.warc.gz'), os.path.join(tmpdir, 'index.sqlite3'))
+    archive.append(URL, b'<html>old</html>', etag='"v1"')
+    archive.append('https://www.example.com/products/product2', b'<html>other</html>')
+
+    # Act
+    archive.append(URL, b'<html>\r\n\r\nnew</html>', etag='"v2"', last_modified='Wed, 01 May 2024 10:00:00 GMT')
+    result = archive.latest(URL)
+
+    # Assert
+    assert result.content == b'<html>\r\n\r\nnew</html>'
+    assert (result.etag, result.last_modified) == ('"v2"', 'Wed, 01 May 2024 10:00:00 GMT')
+    assert archive.latest('https://www.example.com/products/product3') is None
+    assert [record.url for record in archive.iter_latest()] == ['https://www.example.com/products/product2', URL]
+
+def test_archive_is_a_gzip_stream_of_warc_records(tmpdir):
+    # Arrange
+    archive_path = os.path.join(tmpdir, 'pages.warc.gz')
+    archive = ResponseArchive(archive_path, os.path.join(tmpdir, 'index.sqlite3'))
+
+    # Act
+    archive.append(URL, b'<html>product1</html>', etag='"v1"')
+    archive.append(URL, b'<html>product1 v2</html>', status_code=203)
+    with gzip.open(archive_path, 'rb') as warc:
+        records = warc.read()
+
+    # Assert
+    assert records.count(b'WARC/1.0\r\nWARC-Type: response\r\n') == 2
+    assert f'WARC-Target-URI: {URL}\r\n'.encode('utf-8') in records
+    assert b'HTTP/1.1 200 OK\r\nETag: "v1"\r\n\r\n<html>product1</html>\r\n\r\n' in records
+    assert b'HTTP/1.1 203 Non-Authoritative Information\r\n\r\n<html>product1 v2</html>' in records
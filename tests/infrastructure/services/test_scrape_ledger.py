@@ -0,0 +1,52 @@
+import os
+from src.infrastructure.services.scrape_ledger import ScrapeLedger
+
+URLS = ['https://www.example.com/products/product1', 'https://www.example.com/products/product2']
+
+def test_start_resumes_the_run_with_the_same_key(tmpdir):
+    # Arrange
+    ledger = ScrapeLedger(os.path.join(tmpdir, 'ledger.sqlite3'))
+    ledger.start('run1')
+    ledger.complete(URLS[0], 120)
+    ledger.complete(URLS[1], 250)
+    ledger.record_image('files/images/Product_1/product_image_1.jpg', 'https://cdn.example.com/1.jpg')
+
+    # Act
+    resumed = ledger.start('run1')
+
+    # Assert
+    assert resumed is True
+    assert ledger.completed_urls() == set(URLS)
+    assert ledger.stream_offset() == 250
+    assert ledger.image_source('files/images/Product_1/product_image_1.jpg') == 'https://cdn.example.com/1.jpg'
+
+def test_start_restarts_a_different_run(tmpdir):
+    # Arrange
+    ledger = ScrapeLedger(os.path.join(tmpdir, 'ledger.sqlite3'))
+    ledger.start('run1')
+    ledger.complete(URLS[0], 120)
+    ledger.record_image('files/images/Product_1/product_image_1.jpg', 'https://cdn.example.com/1.jpg')
+
+    # Act
+    resumed_other = ledger.start('run2')
+    ledger.complete(URLS[1], 80)
+    resumed_disabled = ledger.start('run2', resume=False)
+
+    # Assert
+    assert (resumed_other, resumed_disabled) == (False, False)
+    assert ledger.completed_urls() == set()
+    assert ledger.stream_offset() == 0
+    assert ledger.image_source('files/images/Product_1/product_image_1.jpg') is None
+
+def test_clear_deletes_the_run(tmpdir):
+    # Arrange
+    ledger = ScrapeLedger(os.path.join(tmpdir, 'ledger.sqlite3'))
+    ledger.start('run1')
+    ledger.complete(URLS[0], 120)
+
+    # Act
+    ledger.clear()
+
+    # Assert
+    assert ledger.completed_urls() == set()
+    assert ledger.start('run1') is False
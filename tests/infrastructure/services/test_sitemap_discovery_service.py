@@ -0,0 +1,61 @@
+import gzip
+import pytest
+import requests
+from unittest.mock import patch, MagicMock
+from src.infrastructure.services.sitemap_discovery_service import SitemapDiscoveryService
+
+SITEMAP_INDEX = b'''<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://www.example.com/sitemap_products_1.xml.gz</loc></sitemap>
+</sitemapindex>'''
+
+PRODUCTS_SITEMAP = b'''<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">
+  <url>
+    <loc>https://www.example.com/products/product1</loc>
+    <lastmod>2024-05-01T10:00:00-06:00</lastmod>
+    <image:image><image:loc>https://cdn.example.com/product1.jpg</image:loc></image:image>
+  </url>
+  <url><loc>https://www.example.com/products/product2</loc></url>
+</urlset>'''
+
+def make_response(content=b'', text=''):
+    response = MagicMock()
+    response.text = text
+    # Stream the body in small chunks to exercise the incremental parser
+    response.iter_content.side_effect = lambda chunk_size: (content[i:i + 16] for i in range(0, len(content), 16))
+    return response
+
+@patch('src.infrastructure.services.http_client.HttpClient.get')
+def test_iter_sitemap_entries(mock_get):
+    # Arrange
+    responses = {
+        'https://www.example.com/robots.txt': make_response(text='User-agent: *\nSitemap: https://www.example.com/sitemap.xml'),
+        'https://www.example.com/sitemap.xml': make_response(SITEMAP_INDEX),
+        'https://www.example.com/sitemap_products_1.xml.gz': make_response(gzip.compress(PRODUCTS_SITEMAP)),
+    }
+    mock_get.side_effect = lambda url, **kwargs: responses[url]
+    service = SitemapDiscoveryService()
+
+    # Act
+    entries = list(service.iter_sitemap_entries('https://www.example.com/collections/all'))
+
+    # Assert
+    assert entries == [
+        ('https://www.example.com/products/product1', '2024-05-01T10:00:00-06:00'),
+        ('https://www.example.com/products/product2', None)
+    ]
+
+@patch('src.infrastructure.services.http_client.HttpClient.get')
+def test_discover_urls_without_sitemap(mock_get):
+    # Arrange
+    not_found = MagicMock()
+    not_found.raise_for_status.side_effect = requests.HTTPError('404')
+    mock_get.return_value = not_found
+    service = SitemapDiscoveryService()
+
+    # Act
+    urls = service.discover_urls('https://www.example.com/collections/all')
+
+    # Assert
+    assert urls == []
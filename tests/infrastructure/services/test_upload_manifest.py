@@ -0,0 +1,26 @@
+import os
+from src.infrastructure.services.upload_manifest import UploadManifest
+
+IMAGE_PATH = 'files/images/Product_1/product_image_1_sku1.jpg'
+
+def test_uploaded_media_of_a_recorded_upload(tmpdir):
+    # Arrange
+    manifest = UploadManifest(os.path.join(tmpdir, 'manifest.sqlite3'))
+    manifest.record_upload(IMAGE_PATH, 'hash1', 15, 'https://example.com/media/product_image_1_sku1.jpg')
+
+    # Act
+    reopened = UploadManifest(manifest.db_path)
+
+    # Assert
+    assert reopened.uploaded_media('hash1') == (15, 'https://example.com/media/product_image_1_sku1.jpg')
+
+def test_uploaded_media_of_a_content_not_uploaded(tmpdir):
+    # Arrange
+    manifest = UploadManifest(os.path.join(tmpdir, 'manifest.sqlite3'))
+    manifest.record_upload(IMAGE_PATH, 'hash1', 15, 'https://example.com/media/product_image_1_sku1.jpg')
+
+    # Act
+    result = manifest.uploaded_media('hash2')
+
+    # Assert
+    assert result is None
@@ -1,6 +1,10 @@
 import pytest
+import os
+import requests
 from unittest.mock import patch, mock_open, MagicMock
+from concurrent.futures import ThreadPoolExecutor
 from src.infrastructure.services.wp_images_service import WPImagesService
+from src.infrastructure.services.upload_manifest import UploadManifest
 
 def test_upload_image():
     # Arrange
@@ -12,10 +16,173 @@ def test_upload_image():
     mock_response.raise_for_status = MagicMock()
 
     with patch('builtins.open', mock_open(read_data=b'file_content')), \
-         patch('src.infrastructure.services.wp_images_service.requests.post', return_value=mock_response) as mock_post:
+         patch('src.infrastructure.services.http_client.HttpClient.post', return_value=mock_response) as mock_post:
         # Act
         result = service.upload_image(image_path)
 
         # Assert
         mock_post.assert_called_once()
-        assert result == expected_url
\ No newline at end of file
+        assert result == expected_url
+
+def _http_error(status_code, headers=None):
+    response = MagicMock(status_code=status_code, headers=headers or {})
+    return requests.exceptions.HTTPError(f'{status_code} Error', response=response)
+
+def test_upload_image_retries_throttled_uploads_with_backoff():
+    # Arrange
+    service = WPImagesService(http_client=MagicMock())
+    throttled, failed, uploaded = MagicMock(), MagicMock(), MagicMock()
+    throttled.raise_for_status.side_effect = _http_error(429, {'Retry-After': '7'})
+    failed.raise_for_status.side_effect = _http_error(503)
+    uploaded.json.return_value = {'source_url': 'https://example.com/media/test_image.jpg'}
+    service.http_client.post.side_effect = [throttled, failed, uploaded]
+
+    with patch('builtins.open', mock_open(read_data=b'file_content')), \
+         patch('src.infrastructure.services.wp_images_service.time.sleep') as mock_sleep:
+        # Act
+        result = service.upload_image('test_image.jpg', retries=3, wait_time=2)
+
+    # Assert
+    assert result == 'https://example.com/media/test_image.jpg'
+    assert service.http_client.post.call_count == 3
+    # The first wait is the Retry-After of the response, the second the jittered backoff of the second attempt
+    assert mock_sleep.call_args_list[0].args == (7.0,)
+    assert 2 <= mock_sleep.call_args_list[1].args[0] <= 4
+
+def test_upload_image_does_not_retry_rejected_uploads():
+    # Arrange
+    service = WPImagesService(http_client=MagicMock())
+    rejected = MagicMock()
+    rejected.raise_for_status.side_effect = _http_error(400)
+    service.http_client.post.return_value = rejected
+
+    with patch('builtins.open', mock_open(read_data=b'file_content')), \
+         patch('src.infrastructure.services.wp_images_service.time.sleep') as mock_sleep:
+        # Act
+        result = service.upload_image('test_image.jpg', retries=3)
+
+    # Assert
+    assert result is None
+    service.http_client.post.assert_called_once()
+    mock_sleep.assert_not_called()
+
+def test_upload_image_without_attempts_returns_none(tmpdir):
+    # Arrange
+    image_path = os.path.join(tmpdir, 'product_image_1_sku1.jpg')
+    with open(image_path, 'wb') as handler:
+        handler.write(b'file_content')
+    service = WPImagesService(http_client=MagicMock())
+
+    # Act
+    result = service.upload_image(image_path, retries=0)
+
+    # Assert
+    assert result is None
+    service.http_client.post.assert_not_called()
+
+def test_upload_image_skips_the_images_in_the_manifest(tmpdir):
+    # Arrange
+    image_path = os.path.join(tmpdir, 'test_image.jpg')
+    with open(image_path, 'wb') as handler:
+        handler.write(b'file_content')
+    manifest = UploadManifest(os.path.join(tmpdir, 'manifest.sqlite3'))
+    service = WPImagesService(http_client=MagicMock(), manifest=manifest)
+    service.http_client.post.return_value.json.return_value = {'id': 15, 'source_url': 'https://example.com/media/test_image.jpg'}
+
+    # Act
+    first = service.upload_image(image_path)
+    rerun = WPImagesService(http_client=service.http_client, manifest=manifest).upload_image(image_path)
+    with open(image_path, 'wb') as handler:
+        handler.write(b'new_content')
+    changed = service.upload_image(image_path)
+
+    # Assert
+    assert first == rerun == changed == 'https://example.com/media/test_image.jpg'
+    # The rerun is answered by the manifest, the changed file is uploaded again
+    assert service.http_client.post.call_count == 2
+
+def test_upload_image_uploads_the_same_content_once(tmpdir):
+    # Arrange
+    image_paths = [os.path.join(tmpdir, f'product_image_1_sku{n}.jpg') for n in range(1, 4)]
+    for image_path in image_paths:
+        with open(image_path, 'wb') as handler:
+            handler.write(b'shared_content')
+    manifest = UploadManifest(os.path.join(tmpdir, 'manifest.sqlite3'))
+    service = WPImagesService(http_client=MagicMock(), manifest=manifest)
+    service.http_client.post.return_value.json.return_value = {'id': 15, 'source_url': 'https://example.com/media/product_image_1_sku1.jpg'}
+
+    # Act
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = list(executor.map(service.upload_image, image_paths))
+
+    # Assert
+    assert results == ['https://example.com/media/product_image_1_sku1.jpg'] * 3
+    service.http_client.post.assert_called_once()
+
+def test_reconcile_library_reuses_the_media_of_the_library(tmpdir):
+    # Arrange
+    image_path = os.path.join(tmpdir, 'product_image_1_sku1.jpg')
+    with open(image_path, 'wb') as handler:
+        handler.write(b'file_content')
+    service = WPImagesService(http_client=MagicMock())
+    first_page, second_page = MagicMock(headers={'X-WP-TotalPages': '2'}), MagicMock(headers={'X-WP-TotalPages': '2'})
+    first_page.json.return_value = [
+        {'id': 7, 'source_url': 'https://example.com/media/other.jpg', 'media_details': {'filesize': 5}},
+        # Without its size the media cannot be told apart from an older image with the same name
+        {'id': 6, 'source_url': 'https://example.com/media/product_image_1_sku1.jpg', 'media_details': {}},
+    ]
+    second_page.json.return_value = [{'id': 8, 'source_url': 'https://example.com/media/product_image_1_sku1-scaled.jpg',
+                                      'media_details': {'original_image': 'product_image_1_sku1.jpg', 'filesize': 12}}]
+    service.http_client.get.side_effect = [first_page, second_page]
+
+    # Act
+    indexed = service.reconcile_library()
+    result = service.upload_image(image_path)
+
+    # Assert
+    assert indexed == 2
+    assert service.http_client.get.call_count == 2
+    assert result == 'https://example.com/media/product_image_1_sku1-scaled.jpg'
+    service.http_client.post.assert_not_called()
+
+def test_reconcile_library_matches_the_file_names_as_wordpress_sanitizes_them(tmpdir):
+    # Arrange
+    image_path = os.path.join(tmpdir, ' product image (2)_sku1.jpg')
+    with open(image_path, 'wb') as handler:
+        handler.write(b'file_content')
+    service = WPImagesService(http_client=MagicMock())
+    page = MagicMock(headers={'X-WP-TotalPages': '1'})
+    page.json.return_value = [{'id': 9, 'source_url': 'https://example.com/media/product-image-2_sku1.jpg',
+                               'media_details': {'filesize': 12}}]
+    service.http_client.get.return_value = page
+
+    # Act
+    service.reconcile_library()
+    result = service.upload_image(image_path)
+
+    # Assert
+    assert result == 'https://example.com/media/product-image-2_sku1.jpg'
+    service.http_client.post.assert_not_called()
+
+def test_reconcile_library_uploads_the_image_whose_size_changed(tmpdir):
+    # Arrange
+    image_path = os.path.join(tmpdir, 'product_image_1_sku1.jpg')
+    with open(image_path, 'wb') as handler:
+        handler.write(b'new_file_content')
+    service = WPImagesService(http_client=MagicMock())
+    page = MagicMock(headers={'X-WP-TotalPages': '1'})
+    page.json.return_value = [{'id': 9, 'source_url': 'https://example.com/media/product_image_1_sku1.jpg',
+                               'media_details': {'filesize': 12}}]
+    service.http_client.get.return_value = page
+    service.http_client.post.return_value.json.return_value = {
+        'id': 10, 'source_url': 'https://example.com/media/product_image_1_sku1-1.jpg'
+    }
+
+    # Act
+    indexed = service.reconcile_library()
+    result = service.upload_image(image_path)
+
+    # Assert
+    assert indexed == 1
+    assert result == 'https://example.com/media/product_image_1_sku1-1.jpg'
+    service.http_client.post.assert_called_once()
@@ -1,4 +1,6 @@
 import pytest
+import threading
+import pandas as pd
 from unittest.mock import MagicMock, patch
 from src.pipelines.images_upload_pipeline import ImagesUploadPipeline
 
@@ -31,4 +33,34 @@ def test_run():
     logger_mock.info.assert_any_call('Data prepared.')
     logger_mock.info.assert_any_call('http://example.com/image1.jpg')
     logger_mock.info.assert_any_call('http://example.com/image2.jpg')
-    logger_mock.info.assert_any_call('2 images have been successfully uploaded')
\ No newline at end of file
+    logger_mock.info.assert_any_call('2 images have been successfully uploaded')
+
+def test_run_uploads_the_images_concurrently_keeping_their_indexes():
+    # Arrange
+    container_mock = MagicMock()
+    services = {'images_factory_service': MagicMock(), 'wp_images_service': MagicMock()}
+    container_mock.config.side_effect = services.get
+    paths_df = pd.DataFrame({'route': ['image1.jpg', 'image2.jpg', 'image3.jpg']}, index=[10, 20, 30])
+    services['images_factory_service'].create_paths_table.return_value = paths_df
+    # Two uploads must be in flight at the same time to get through the barrier
+    barrier = threading.Barrier(2, timeout=5)
+
+    def upload_image(image_path):
+        if image_path == 'image3.jpg':
+            return None
+        barrier.wait()
+        return f'http://example.com/{image_path}'
+
+    services['wp_images_service'].upload_image.side_effect = upload_image
+
+    with patch('src.pipelines.images_upload_pipeline.setup_logging'):
+        pipeline = ImagesUploadPipeline(container_mock)
+
+        # Act
+        pipeline.run()
+
+    # Assert
+    services['images_factory_service'].update_wc_table.assert_called_once_with(paths_df, [
+        (10, 'http://example.com/image1.jpg'), (20, 'http://example.com/image2.jpg'), (30, None)
+    ])
+    services['images_factory_service'].save_updated_csv.assert_called_once()
@@ -1,4 +1,6 @@
 import pytest
+import pandas as pd
+from unittest.mock import MagicMock
 from src.pipelines.website_crawling_pipeline import WebsiteCrawlingPipeline
 from src.config.ioc import ioc_config
 from src.infrastructure.services.bs_crawling_service import BSCrawlingWebService
@@ -74,3 +76,57 @@ def test_run_with_real_services(setup_container):
     print("Pipeline run complete.")
 
     assert True
+
+def test_run_uses_sitemap_urls():
+    # Arrange
+    container = MagicMock()
+    services = {name: MagicMock() for name in ('crawling_web_service', 'urls_factory_service', 'sitemap_discovery_service')}
+    container.config.side_effect = lambda name: services[name]
+    services['sitemap_discovery_service'].discover_entries.return_value = {'https://www.example.com/collections/all/products/product1': '2024-05-01'}
+    services['urls_factory_service'].filter_urls.return_value = pd.DataFrame({'URL': ['https://www.example.com/collections/all/products/product1']})
+    pipeline = WebsiteCrawlingPipeline(container)
+    pipeline.use_sitemap = True
+
+    # Act
+    pipeline.run()
+
+    # Assert
+    services['crawling_web_service'].crawling_web.assert_not_called()
+    saved_df = services['urls_factory_service'].save_urls_csv.call_args.args[0]
+    assert saved_df['Lastmod'].tolist() == ['2024-05-01']
+
+def test_run_crawls_when_there_is_no_sitemap():
+    # Arrange
+    container = MagicMock()
+    services = {name: MagicMock() for name in ('crawling_web_service', 'urls_factory_service', 'sitemap_discovery_service')}
+    container.config.side_effect = lambda name: services[name]
+    services['sitemap_discovery_service'].discover_entries.return_value = {}
+    services['crawling_web_service'].crawling_web.return_value = ['https://www.example.com/collections/all/products/product1']
+    services['urls_factory_service'].filter_urls.return_value = pd.DataFrame({'URL': ['https://www.example.com/collections/all/products/product1']})
+    pipeline = WebsiteCrawlingPipeline(container)
+    pipeline.use_sitemap = True
+    pipeline.crawl_mode = 'sync'
+
+    # Act
+    pipeline.run()
+
+    # Assert
+    services['crawling_web_service'].restore_prefix.assert_called_once_with(False)
+    services['crawling_web_service'].crawling_web.assert_called_once()
+    services['urls_factory_service'].save_urls_csv.assert_called_once()
+
+
+def test_crawl_runs_the_sharded_crawl():
+    # Arrange
+    container = MagicMock()
+    pipeline = WebsiteCrawlingPipeline(container)
+    pipeline.crawl_mode = 'sharded'
+    pipeline.crawl_shards = 4
+    pipeline.crawl_shard_ids = [0, 1]
+
+    # Act
+    pipeline.crawl()
+
+    # Assert
+    pipeline.crawling_service.crawling_web_sharded.assert_called_once_with(4, [0, 1])
+    pipeline.crawling_service.crawling_web.assert_not_called()
\ No newline at end of file
@@ -1,15 +1,41 @@
 import pytest
+import os
+import time
+import hashlib
 import pandas as pd
+from unittest.mock import MagicMock, patch
+from src.domain.scraping import ScrapeResult
+from src.infrastructure.services.bs_scraping_service import BSScrapingService
+from src.infrastructure.services.response_archive import ResponseArchive
+from src.infrastructure.services.scrape_ledger import ScrapeLedger
+from src.infrastructure.services.image_downloader import ImageDownloader
 from src.config.config import TEST_SCRAPE_URLS
 from src.common.utils import files_output_path
 from src.pipelines.website_scraping_pipeline import WebsiteScrapingPipeline
 from src.config.ioc import ioc_config
 
+
 @pytest.fixture
 def setup_container():
     container = ioc_config()
     return container
 
+
+@pytest.fixture
+def services():
+    services = {name: MagicMock() for name in ('tables_factory_service', 'scraping_service', 'product_state_store',
+                                               'http_client', 'response_archive', 'scrape_ledger', 'image_downloader')}
+    services['scrape_ledger'].start.return_value = False
+    return services
+
+
+@pytest.fixture
+def container(services):
+    container = MagicMock()
+    container.config.side_effect = lambda name: services[name]
+    return container
+
+
 def test_run_with_real_services(setup_container):
     
     pipeline = WebsiteScrapingPipeline(setup_container)
@@ -26,4 +52,219 @@ def test_run_with_real_services(setup_container):
     pipeline.run()
     print("Pipeline run complete.")
 
-    assert True
\ No newline at end of file
+    assert True
+
+
+def test_scrape_urls_reuses_unchanged_products(services, container):
+    # Arrange
+    stored_df = pd.DataFrame({'sku': ['sku1']})
+    services['product_state_store'].get.side_effect = lambda url: {
+        'lastmod': '2024-05-01', 'etag': '"abc"', 'last_modified': None, 'df': stored_df
+    }
+    services['scraping_service'].fetch_product.side_effect = lambda url, validators: ScrapeResult(url, not_modified=True)
+    pipeline = WebsiteScrapingPipeline(container)
+    pipeline.incremental = True
+    pipeline.parse_processes = 0
+    urls_df = pd.DataFrame({
+        'Cleaned_URL': ['https://www.example.com/products/product1', 'https://www.example.com/products/product2'],
+        'Lastmod': ['2024-05-01', '2024-06-01']
+    })
+
+    # Act
+    products_count = pipeline.scrape_urls(urls_df)
+
+    # Assert
+    scraped_dfs_list = [call.args[0] for call in services['tables_factory_service'].append_products.call_args_list]
+    assert products_count == 2
+    services['scraping_service'].fetch_product.assert_called_once_with(
+        'https://www.example.com/products/product2', {'etag': '"abc"', 'last_modified': None}
+    )
+    services['product_state_store'].touch.assert_called_once_with('https://www.example.com/products/product2', '2024-06-01')
+    assert scraped_dfs_list == [stored_df, stored_df]
+
+
+def test_scrape_urls_concurrently_keeps_the_url_order(services, container):
+    # Arrange
+    urls = [f'https://www.example.com/products/product{n}' for n in range(6)]
+
+    def slow_fetch(url, validators):
+        # The first URLs take the longest, so they finish last
+        time.sleep(0.01 * (6 - int(url[-1])))
+        return ScrapeResult(url, content=url.encode('utf-8'))
+
+    services['scraping_service'].fetch_product.side_effect = slow_fetch
+    services['scraping_service'].parse_product.side_effect = lambda content, extraction: {'title': content.decode('utf-8')}
+    pipeline = WebsiteScrapingPipeline(container)
+    pipeline.incremental = False
+    pipeline.scrape_workers = 4
+    pipeline.parse_processes = 0
+
+    # Act
+    with patch.object(pipeline, 'process_scraped_data', side_effect=lambda data, url: pd.DataFrame({'URL': [data['title']]})):
+        pipeline.scrape_urls(pd.DataFrame({'Cleaned_URL': urls}))
+
+    # Assert
+    scraped_dfs_list = [call.args[0] for call in services['tables_factory_service'].append_products.call_args_list]
+    assert [df['URL'][0] for df in scraped_dfs_list] == urls
+    services['product_state_store'].get.assert_not_called()
+
+
+def test_scrape_urls_keeps_a_bounded_number_of_urls_in_flight(services, container):
+    # Arrange
+    urls = [f'https://www.example.com/products/product{n}' for n in range(12)]
+    started = []
+    in_flight = []
+
+    def scrape_product(url, lastmod):
+        started.append(url)
+        if url == urls[0]:
+            # The first URL is slow, the results after it wait for it to be streamed
+            time.sleep(0.1)
+        return True, pd.DataFrame({'URL': [url]})
+
+    services['tables_factory_service'].append_products.side_effect = lambda df: in_flight.append(
+        len(started) - len(in_flight))
+    pipeline = WebsiteScrapingPipeline(container)
+    pipeline.scrape_workers = 2
+    pipeline.parse_processes = 0
+
+    # Act
+    with patch.object(pipeline, 'scrape_product', side_effect=scrape_product):
+        products_count = pipeline.scrape_urls(pd.DataFrame({'Cleaned_URL': urls}))
+
+    # Assert
+    scraped_dfs_list = [call.args[0] for call in services['tables_factory_service'].append_products.call_args_list]
+    assert products_count == 12
+    assert [df['URL'][0] for df in scraped_dfs_list] == urls
+    assert max(in_flight) <= 4
+
+
+@patch('src.infrastructure.services.http_client.HttpClient.get')
+def test_scrape_urls_parses_in_the_process_pool(mock_get, services, container):
+    # Arrange
+    services['scraping_service'] = BSScrapingService()
+
+    def fake_get(url, headers):
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.content = f"""
+            <script data-section-type="static-product">{{"product": {{"tags": ["{url[-1]}"]}}}}</script>
+            <label class="form-field-title">Size</label>
+            <img data-rimg="lazy" src="//cdn.example.com/{url[-1]}.jpg">
+        """.encode('utf-8')
+        return mock_response
+
+    mock_get.side_effect = fake_get
+    pipeline = WebsiteScrapingPipeline(container)
+    pipeline.incremental = False
+    pipeline.parse_processes = 2
+    urls = [f'https://www.example.com/products/product{n}' for n in range(4)]
+
+    # Act
+    with patch.object(pipeline, 'process_scraped_data', side_effect=lambda data, url: pd.DataFrame({
+        'tag': data['tags'], 'image': [data['images'][0]['src']]
+    })):
+        pipeline.scrape_urls(pd.DataFrame({'Cleaned_URL': urls}))
+
+    # Assert
+    scraped_dfs_list = [call.args[0] for call in services['tables_factory_service'].append_products.call_args_list]
+    assert [df['tag'][0] for df in scraped_dfs_list] == ['0', '1', '2', '3']
+    assert scraped_dfs_list[0]['image'][0] == '//cdn.example.com/0.jpg'
+    assert pipeline.parse_executor is None
+
+
+def test_scrape_urls_skips_the_products_that_fail_to_be_saved(services, container):
+    # Arrange
+    urls = [f'https://www.example.com/products/product{n}' for n in range(3)]
+    services['product_state_store'].get.return_value = None
+    services['product_state_store'].save.side_effect = lambda url, *args: url.endswith('1') and 1 / 0
+    services['scraping_service'].fetch_product.side_effect = lambda url, validators: ScrapeResult(url, content=url.encode('utf-8'))
+    services['scraping_service'].parse_product.side_effect = lambda content, extraction: {'title': content.decode('utf-8')}
+    pipeline = WebsiteScrapingPipeline(container)
+    pipeline.incremental = True
+    pipeline.archive = False
+    pipeline.parse_processes = 0
+
+    # Act
+    with patch.object(pipeline, 'process_scraped_data', side_effect=lambda data, url: pd.DataFrame({'URL': [data['title']]})):
+        products_count = pipeline.scrape_urls(pd.DataFrame({'Cleaned_URL': urls}))
+
+    # Assert
+    scraped_dfs_list = [call.args[0] for call in services['tables_factory_service'].append_products.call_args_list]
+    assert products_count == 2
+    assert [df['URL'][0] for df in scraped_dfs_list] == [urls[0], urls[2]]
+
+
+def test_scrape_product_archives_the_page_and_replays_it(services, container, tmpdir):
+    # Arrange
+    services['response_archive'] = ResponseArchive(os.path.join(tmpdir, 'pages.warc.gz'), os.path.join(tmpdir, 'index.sqlite3'))
+    url = 'https://www.example.com/products/product1'
+    services['scraping_service'].fetch_product.return_value = ScrapeResult(url, etag='"abc"', content=b'<html>product1</html>')
+    services['scraping_service'].parse_product.side_effect = lambda content, extraction: {'title': content.decode('utf-8')}
+    pipeline = WebsiteScrapingPipeline(container)
+    pipeline.incremental = False
+    pipeline.archive = True
+    pipeline.parse_processes = 0
+
+    # Act
+    with patch.object(pipeline, 'process_scraped_data', side_effect=lambda data, url: pd.DataFrame({'title': [data['title']]})):
+        pipeline.scrape_product(url)
+        services['scraping_service'].fetch_product.reset_mock()
+        pipeline.replay = True
+        scraped, scraped_df = pipeline.scrape_product(url)
+        missing = pipeline.scrape_product('https://www.example.com/products/product2')
+
+    # Assert
+    services['scraping_service'].fetch_product.assert_not_called()
+    assert scraped is True
+    assert scraped_df['title'][0] == '<html>product1</html>'
+    assert missing == (None, None)
+
+
+def test_scrape_urls_resumes_the_interrupted_run(services, container, tmpdir):
+    # Arrange
+    services['scrape_ledger'] = ScrapeLedger(os.path.join(tmpdir, 'ledger.sqlite3'))
+    urls = [f'https://www.example.com/products/product{n}' for n in range(3)]
+    services['scraping_service'].fetch_product.side_effect = lambda url, validators: ScrapeResult(url, content=url.encode('utf-8'))
+    services['scraping_service'].parse_product.side_effect = lambda content, extraction: {'title': content.decode('utf-8')}
+    services['tables_factory_service'].append_products.side_effect = [200, 300]
+    pipeline = WebsiteScrapingPipeline(container)
+    pipeline.incremental = False
+    pipeline.archive = False
+    pipeline.parse_processes = 0
+    pipeline.scrape_workers = 2
+    # The interrupted run completed the first URL
+    services['scrape_ledger'].start(hashlib.sha256('\n'.join(urls).encode('utf-8')).hexdigest())
+    services['scrape_ledger'].complete(urls[0], 100)
+
+    # Act
+    with patch.object(pipeline, 'process_scraped_data', side_effect=lambda data, url: pd.DataFrame({'URL': [data['title']]})):
+        products_count = pipeline.scrape_urls(pd.DataFrame({'Cleaned_URL': urls}))
+    pipeline.save_scraped_data(products_count)
+
+    # Assert
+    assert [call.args[0] for call in services['scraping_service'].fetch_product.call_args_list] == urls[1:]
+    services['tables_factory_service'].start_products_stream.assert_called_once_with(100)
+    assert products_count == 3
+    assert services['scrape_ledger'].completed_urls() == set()
+
+
+def test_download_images_skips_the_images_of_the_interrupted_run(services, container, tmpdir):
+    # Arrange
+    services['scrape_ledger'] = ScrapeLedger(os.path.join(tmpdir, 'ledger.sqlite3'))
+    services['image_downloader'] = ImageDownloader(services['http_client'])
+    services['http_client'].get.return_value.headers = {}
+    services['http_client'].get.return_value.iter_content.return_value = [b'image']
+    pipeline = WebsiteScrapingPipeline(container)
+    downloaded_path = os.path.join(tmpdir, 'product_image_1.jpg')
+    with open(downloaded_path, 'wb') as image:
+        image.write(b'image')
+    services['scrape_ledger'].record_image(downloaded_path, 'https://cdn.example.com/1.jpg')
+
+    # Act
+    image_names = pipeline.download_images([{'src': '//cdn.example.com/1.jpg'}, {'src': '//cdn.example.com/2.jpg'}], str(tmpdir))
+
+    # Assert
+    assert image_names == ['product_image_1.jpg', 'product_image_2.jpg']
+    services['http_client'].get.assert_called_once_with('https://cdn.example.com/2.jpg', stream=True)
+    assert services['scrape_ledger'].image_source(os.path.join(tmpdir, 'product_image_2.jpg')) == 'https://cdn.example.com/2.jpg'